@@ -13,6 +13,8 @@ from pathlib import Path
 import webbrowser
 import os
 
+from kocur_files import SYSTEM_FILES
+
 def load_env_file():
     """Załaduj zmienne z pliku .env"""
     env_file = Path(".env")
@@ -183,8 +185,7 @@ def create_github_release(version, token, username, repo):
 
 def upload_release_assets(release_info, token):
     """Upload plików do release"""
-    files_to_upload = [
-        "kocur_dos.py",
+    files_to_upload = SYSTEM_FILES + [
         "updater.py", 
         "install.py",
         "example_program.py",
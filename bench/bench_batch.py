@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark skryptów wsadowych KocurDOS
+Porównuje skompilowany skrypt .kbat z wykonywaniem tych samych komend
+pojedynczo przez process_command (jak przy wpisywaniu w terminalu)
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kocur_batch import compile_script, run_script
+from kocur_core import KocurShell, ShellOutput
+
+
+class NullOutput(ShellOutput):
+    """Wyjście liczące linie i zapisy (bez wypisywania)"""
+
+    def __init__(self):
+        self.writes = 0
+        self.chars = 0
+        self.exit_requested = False
+
+    def write(self, text):
+        self.writes += 1
+        self.chars += len(text)
+
+
+def make_script(count):
+    """Skrypt z count komendami: set, echo ze zmienną, if errorlevel, ver"""
+    lines = ["@echo off"]
+    for i in range(count // 4):
+        lines.append(f"set I={i}")
+        lines.append("echo linia %I%")
+        lines.append("if errorlevel 1 goto blad")
+        lines.append("ver")
+    lines.append("goto :eof")
+    lines.append(":blad")
+    lines.append("echo blad")
+    return "\n".join(lines) + "\n"
+
+
+def main(count=100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        disk = Path(tmp) / "KocurDOS-diskC"
+        script = make_script(count)
+        script_path = disk / "bench.kbat"
+
+        output = NullOutput()
+        shell = KocurShell(disk, output)
+        script_path.write_text(script, encoding='utf-8')
+
+        start = time.perf_counter()
+        compile_script(script, shell)
+        compile_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_script(shell, script_path)
+        batch_time = time.perf_counter() - start
+        batch_writes = output.writes
+
+        # Drugie uruchomienie: program z pamięci podręcznej (bez kompilacji)
+        start = time.perf_counter()
+        run_script(shell, script_path)
+        cached_time = time.perf_counter() - start
+
+        # Te same komendy pojedynczo (bez kompilacji)
+        output = NullOutput()
+        shell = KocurShell(disk, output)
+        commands = script.splitlines()[1:count + 1]
+        start = time.perf_counter()
+        for command in commands:
+            if not command.startswith(("if ", "goto", ":")):
+                shell.process_command(command)
+        single_time = time.perf_counter() - start
+
+    print(f"Komendy:                 {count}")
+    print(f"Kompilacja skryptu:      {compile_time * 1000:.1f} ms")
+    print(f"Skrypt (z kompilacją):   {batch_time * 1000:.1f} ms "
+          f"({count / batch_time:,.0f} komend/s, zapisów wyjścia: {batch_writes})")
+    print(f"Skrypt z pamięci podr.:  {cached_time * 1000:.1f} ms "
+          f"({count / cached_time:,.0f} komend/s)")
+    print(f"Komendy pojedynczo:      {single_time * 1000:.1f} ms "
+          f"(zapisów wyjścia: {output.writes})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
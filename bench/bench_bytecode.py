@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark pamięci podręcznej kodu bajtowego KocurDOS
+Duży skrypt uruchamiany zwykłym python (kompilacja przy każdym starcie)
+i z kodu skompilowanego wcześniej przez BytecodeCache
+"""
+
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kocur_core import KocurShell, ShellOutput
+
+
+class NullOutput(ShellOutput):
+    """Wyjście bez wypisywania"""
+
+    def __init__(self):
+        self.exit_requested = False
+
+    def write(self, text):
+        pass
+
+
+def make_script(functions):
+    """Skrypt z wieloma funkcjami (jak duże narzędzie), wywołujący jedną"""
+    lines = []
+    for i in range(functions):
+        lines.append(f"def funkcja_{i}(dane, prog={i}):")
+        lines.append(f"    wynik = [x * {i} for x in dane if x > prog]")
+        lines.append(f"    return {{'n': len(wynik), 'suma': sum(wynik), 'nazwa': 'funkcja_{i}'}}")
+        lines.append("")
+    lines.append("print(funkcja_0(range(10)))")
+    return "\n".join(lines) + "\n"
+
+
+def measure(command, cwd, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(functions=5000, runs=20):
+    with tempfile.TemporaryDirectory() as tmp:
+        disk = Path(tmp) / "KocurDOS-diskC"
+        shell = KocurShell(disk, NullOutput())
+        script = disk / "narzedzie.py"
+        script.write_text(make_script(functions), encoding='utf-8')
+
+        start = time.perf_counter()
+        shell.bytecode.compile(script)
+        compile_time = (time.perf_counter() - start) * 1000
+
+        plain = measure([sys.executable, script.name], disk, runs)
+        cached = measure(shell.python_command(script, []), disk, runs)
+
+    print(f"Skrypt:                  {functions * 4} linii")
+    print(f"Kompilacja do pamięci:   {compile_time:.1f} ms (raz, w tle po zapisie)")
+    print(f"python (kompilacja):     mediana {plain:.1f} ms")
+    print(f"python (kod z pamięci):  mediana {cached:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
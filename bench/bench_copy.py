@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark kopiowania drzew KocurDOS
+xcopy (kopiowanie w jądrze, pula wątków) w porównaniu z shutil.copytree:
+wiele małych plików oraz kilka bardzo dużych
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kocur_core import KocurShell, ShellOutput
+
+
+class NullOutput(ShellOutput):
+    """Wyjście bez wypisywania"""
+
+    def write(self, text):
+        pass
+
+
+def make_small_tree(root, count, size=4096, per_dir=100):
+    data = os.urandom(size)
+    for i in range(count):
+        directory = root / f"d{i // per_dir:03}"
+        if i % per_dir == 0:
+            directory.mkdir(parents=True)
+        (directory / f"plik{i:05}.dat").write_bytes(data)
+
+
+def make_huge_tree(root, count, size_mb):
+    root.mkdir(parents=True)
+    block = os.urandom(1024 * 1024)
+    for i in range(count):
+        with open(root / f"duzy{i}.bin", 'wb') as f:
+            for _ in range(size_mb):
+                f.write(block)
+
+
+def warm_cache(root):
+    """Przeczytaj źródło, żeby obie metody startowały z tym samym cache"""
+    for directory, _, files in os.walk(root):
+        for name in files:
+            with open(os.path.join(directory, name), 'rb') as f:
+                while f.read(1024 * 1024):
+                    pass
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def compare(label, disk, source):
+    name = source.name
+    shell = KocurShell(disk, NullOutput())
+
+    def xcopy(target, switches=""):
+        code = shell.process_command(f"xcopy {source.name} {target} /e {switches}")
+        if code or shell.wait_for_job():
+            raise RuntimeError(f"xcopy nie powiodło się: {target}")
+
+    warm_cache(source)
+    copytree_time = timed(lambda: shutil.copytree(source, disk / f"{name}-copytree"))
+    xcopy_time = timed(lambda: xcopy(f"{name}-xcopy"))
+    verify_time = timed(lambda: xcopy(f"{name}-verify", "/v"))
+    resume_time = timed(lambda: xcopy(f"{name}-xcopy", "/z"))
+
+    print(f"{label}:")
+    print(f"  shutil.copytree:      {copytree_time * 1000:9.1f} ms")
+    print(f"  xcopy /e:             {xcopy_time * 1000:9.1f} ms ({copytree_time / xcopy_time:.2f}x)")
+    print(f"  xcopy /e /v:          {verify_time * 1000:9.1f} ms")
+    print(f"  xcopy /e /z (wznow.): {resume_time * 1000:9.1f} ms (wszystko już skopiowane)")
+
+    for path in disk.iterdir():
+        if path.name.startswith(name + "-"):
+            shutil.rmtree(path)
+
+
+def main(small_count=5000, huge_count=4, huge_mb=64):
+    with tempfile.TemporaryDirectory() as tmp:
+        disk = Path(tmp) / "KocurDOS-diskC"
+        disk.mkdir()
+
+        make_small_tree(disk / "male", small_count)
+        compare(f"{small_count} plików po 4 KB", disk, disk / "male")
+        shutil.rmtree(disk / "male")
+
+        make_huge_tree(disk / "duze", huge_count, huge_mb)
+        compare(f"{huge_count} pliki po {huge_mb} MB", disk, disk / "duze")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark programów w tle KocurDOS
+Uruchamia wiele programów naraz (start python) i mierzy czas do końca
+ostatniego oraz liczbę wątków powłoki - wyjście wszystkich czyta jeden wątek
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kocur_core import KocurShell, ShellOutput
+
+# Program: kilka linii na stdout i stderr, potem pauza (wszystkie działają naraz)
+JOB_SCRIPT = """\
+import sys, time
+for i in range(20):
+    print("linia", i, sys.argv[1])
+print("koniec", file=sys.stderr)
+time.sleep(3)
+"""
+
+
+class CountingOutput(ShellOutput):
+    """Wyjście liczące znaki (bez wypisywania)"""
+
+    def __init__(self):
+        self.chars = 0
+        self.exit_requested = False
+
+    def write(self, text):
+        self.chars += len(text) + 1
+
+    def write_raw(self, text):
+        self.chars += len(text)
+
+
+def main(count=200):
+    with tempfile.TemporaryDirectory() as tmp:
+        disk = Path(tmp) / "KocurDOS-diskC"
+        output = CountingOutput()
+        shell = KocurShell(disk, output)
+        (disk / "job.py").write_text(JOB_SCRIPT, encoding='utf-8')
+
+        threads_before = threading.active_count()
+        start = time.perf_counter()
+        for i in range(count):
+            shell.process_command(f"start python job.py {i}")
+        started = time.perf_counter() - start
+        peak_threads = threading.active_count()
+        peak_jobs = len(shell.background_jobs)
+
+        while shell.background_jobs:
+            peak_threads = max(peak_threads, threading.active_count())
+            time.sleep(0.01)
+        total = time.perf_counter() - start
+
+    print(f"Programy:                {count}")
+    print(f"Uruchomienie wszystkich: {started * 1000:.0f} ms (jednocześnie działało: {peak_jobs})")
+    print(f"Koniec ostatniego:       {total * 1000:.0f} ms")
+    print(f"Wątki (przed / maks.):   {threads_before} / {peak_threads}")
+    print(f"Odebrane wyjście:        {output.chars:,} znaków")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark uruchamiania programów Python w KocurDOS
+Czas od komendy python do końca krótkiego skryptu: nowy interpreter
+(Popen) w porównaniu z pulą rozgrzanych interpreterów (workers on)
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kocur_core import KocurShell, ShellOutput
+from kocur_workers import WORKERS_SUPPORTED
+
+# Typowy krótki skrypt narzędziowy: kilka importów i trochę pracy
+SCRIPT = """\
+import json, re, sys
+from pathlib import Path
+from collections import Counter
+words = re.findall(r"\\w+", Path(__file__).read_text())
+print(json.dumps(Counter(words).most_common(3)))
+"""
+
+
+class NullOutput(ShellOutput):
+    """Wyjście bez wypisywania"""
+
+    def __init__(self):
+        self.exit_requested = False
+
+    def write(self, text):
+        pass
+
+    def write_raw(self, text):
+        pass
+
+
+def measure(shell, runs):
+    """Czasy (ms) kolejnych uruchomień python skrypt.py"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        shell.process_command("python skrypt.py")
+        shell.wait_for_job()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(label, times):
+    times = sorted(times)
+    p95 = times[int(len(times) * 0.95) - 1]
+    print(f"{label:<22} średnio {statistics.mean(times):6.1f} ms, "
+          f"mediana {statistics.median(times):6.1f} ms, p95 {p95:6.1f} ms")
+
+
+def main(runs=50):
+    with tempfile.TemporaryDirectory() as tmp:
+        disk = Path(tmp) / "KocurDOS-diskC"
+        shell = KocurShell(disk, NullOutput())
+        (disk / "skrypt.py").write_text(SCRIPT, encoding='utf-8')
+
+        cold = measure(shell, runs)
+        report("Nowy interpreter:", cold)
+        if not WORKERS_SUPPORTED:
+            print("Pula interpreterów niedostępna w tym systemie")
+            return
+
+        shell.process_command("workers on")
+        # Poczekaj, aż procesy puli zaimportują moduły
+        while len(shell.worker_pool.idle) < shell.worker_pool.size:
+            time.sleep(0.01)
+        warm = measure(shell, runs)
+        report("Pula interpreterów:", warm)
+        print(f"Przyspieszenie (mediana): {statistics.median(cold) / statistics.median(warm):.1f}x")
+        shell.process_command("workers off")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
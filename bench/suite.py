@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Zestaw benchmarków KocurDOS
+Wyjście terminala, dir i Explorer na drzewach 1k/10k/100k plików, type
+dużych plików, start programów i pobieranie aktualizacji z lokalnego
+serwera HTTP. Wyniki trafiają do JSON; z --baseline porównanie ze
+wzorcem (kod wyjścia 1 przy pogorszeniu ponad próg).
+
+Bez ekranu działa rdzeń bez tkinter; przypadki GUI (Tk) wymagają
+ekranu, np. xvfb-run python bench/suite.py
+
+    python bench/suite.py [--quick] [--only dir,type] [--output wynik.json]
+                          [--baseline wzorzec.json] [--save-baseline wzorzec.json]
+                          [--threshold 10]
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from kocur_core import KocurShell, ShellOutput
+
+# Liczba plików w drzewach dla dir i Explorera (--quick: bez największego)
+TREE_SIZES = (1000, 10000, 100000)
+QUICK_TREE_SIZES = (1000, 10000)
+
+# Rozmiar pliku dla type i wyjścia programu (MB)
+LARGE_FILE_MB = 50
+QUICK_FILE_MB = 10
+
+# Powtórzenia każdego pomiaru (wynik: mediana)
+REPEATS = 5
+
+# Pogorszenie względem wzorca (%), od którego porównanie zgłasza regresję
+REGRESSION_THRESHOLD = 10.0
+
+# Program zapisujący dużo linii (przepustowość wyjścia do terminala)
+OUTPUT_SCRIPT = """\
+import sys
+line = "x" * 99 + "\\n"
+count = int(sys.argv[1]) // len(line)
+write = sys.stdout.write
+for _ in range(count):
+    write(line)
+"""
+
+LAUNCH_SCRIPT = "print('ok')\n"
+
+
+class CountingOutput(ShellOutput):
+    """Wyjście liczące znaki (bez wypisywania)"""
+
+    def __init__(self):
+        self.chars = 0
+        self.exit_requested = False
+
+    def write(self, text):
+        self.chars += len(text) + 1
+
+    def write_raw(self, text):
+        self.chars += len(text)
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def median_time(function, repeats=REPEATS):
+    """Mediana czasu wywołania (sekundy)"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def result(name, value, unit, better='lower'):
+    return {'name': name, 'value': round(value, 4), 'unit': unit, 'better': better}
+
+
+def make_tree(root, count):
+    """Katalog z count pustymi plikami (dir i Explorer pokazują jeden katalog)"""
+    root.mkdir(parents=True)
+    for i in range(count):
+        (root / f"plik{i:06}.txt").touch()
+    return root
+
+
+def make_text_file(path, size_mb):
+    line = "Zażółć gęślą jaźń - linia testowa KocurDOS 0123456789\n"
+    block = line * (1024 * 1024 // len(line))
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(size_mb):
+            f.write(block)
+    return path.stat().st_size
+
+
+def run_command(shell, command):
+    shell.process_command(command)
+    shell.wait_for_job()
+
+
+def bench_terminal_output(context):
+    """Wyjście programu przez pętlę procesów do wyjścia powłoki (MB/s)"""
+    shell = context['shell']
+    (shell.disk_c / "wyjscie.py").write_text(OUTPUT_SCRIPT, encoding='utf-8')
+    size = context['file_mb'] * 1024 * 1024
+    seconds = median_time(lambda: run_command(shell, f"python wyjscie.py {size}"), 3)
+    return [result('terminal_output_core', size / seconds / 1e6, 'MB/s', 'higher')]
+
+
+def bench_dir(context):
+    shell = context['shell']
+    results = []
+    for count, flat in context['trees'].items():
+        shell.current_dir = flat
+        seconds = median_time(lambda: run_command(shell, "dir"))
+        results.append(result(f'dir_{count // 1000}k', seconds * 1000, 'ms'))
+    shell.current_dir = shell.disk_c
+    return results
+
+
+def bench_type(context):
+    shell = context['shell']
+    path = shell.disk_c / "duzy.txt"
+    size = make_text_file(path, context['file_mb'])
+    seconds = median_time(lambda: run_command(shell, "type duzy.txt"), 3)
+    path.unlink()
+    return [result('type_large', size / seconds / 1e6, 'MB/s', 'higher')]
+
+
+def bench_launch(context):
+    """Czas python skrypt.py od komendy do końca: nowy interpreter i pula"""
+    from kocur_workers import WORKERS_SUPPORTED
+    shell = context['shell']
+    (shell.disk_c / "start.py").write_text(LAUNCH_SCRIPT, encoding='utf-8')
+    launch = functools.partial(run_command, shell, "python start.py")
+    results = [result('launch_cold', median_time(launch, 20) * 1000, 'ms')]
+    if WORKERS_SUPPORTED:
+        run_command(shell, "workers on")
+        while len(shell.worker_pool.idle) < shell.worker_pool.size:
+            time.sleep(0.01)
+        results.append(result('launch_pool', median_time(launch, 20) * 1000, 'ms'))
+        run_command(shell, "workers off")
+    return results
+
+
+def bench_update(context):
+    """Pobranie wszystkich plików systemu przez updater z lokalnego serwera HTTP"""
+    try:
+        from kocur_files import SYSTEM_FILES
+        from updater import download_release
+    except ImportError as e:
+        raise SkipBenchmark(f"brak modułu {e.name}")
+    directory = BENCH_DIR.parent
+    handler = functools.partial(QuietHandler, directory=str(directory))
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    target = context['tmp'] / "aktualizacja"
+    target.mkdir()
+    size = sum((directory / name).stat().st_size for name in SYSTEM_FILES)
+    try:
+        seconds = median_time(lambda: download_release(base_url, target_dir=str(target)), 3)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return [result('update_download', seconds * 1000, 'ms'),
+            result('update_download_rate', size / seconds / 1e6, 'MB/s', 'higher')]
+
+
+class SkipBenchmark(Exception):
+    """Przypadek niemożliwy w tym środowisku (brak ekranu, modułu)"""
+
+
+def gui_app(context):
+    """Okno KocurDOS (jedno na cały zestaw); wymaga ekranu"""
+    if 'app' not in context:
+        if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+            raise SkipBenchmark("brak ekranu (uruchom przez xvfb-run)")
+        try:
+            import kocur_dos
+        except ImportError as e:
+            raise SkipBenchmark(f"brak modułu {e.name}")
+
+        class BenchApp(kocur_dos.KocurDOS):
+            def check_for_updates(self):
+                # Bez zapytań do GitHub i okien dialogowych w trakcie pomiarów
+                pass
+
+        # Dysk C okna w katalogu tymczasowym (KocurDOS-diskC względem katalogu roboczego)
+        previous = os.getcwd()
+        os.chdir(context['tmp'])
+        try:
+            context['app'] = BenchApp()
+        finally:
+            os.chdir(previous)
+    return context['app']
+
+
+def bench_terminal_tk(context):
+    """Wstawianie wyjścia do widżetu terminala (MB/s)"""
+    app = gui_app(context)
+    chunk = ("x" * 99 + "\n") * 100
+    size = context['file_mb'] * 1024 * 1024 // 10
+
+    def insert():
+        for _ in range(size // len(chunk)):
+            app.insert_terminal_text(chunk)
+        app.root.update()
+        app.clear_terminal()
+
+    seconds = median_time(insert, 3)
+    return [result('terminal_output_tk', size / seconds / 1e6, 'MB/s', 'higher')]
+
+
+def bench_explorer(context):
+    app = gui_app(context)
+    app.show_explorer()
+    results = []
+    for count, flat in context['trees'].items():
+        app.current_dir = flat
+
+        def refresh():
+            app.refresh_explorer()
+            app.root.update()
+
+        seconds = median_time(refresh, 3)
+        results.append(result(f'explorer_refresh_{count // 1000}k', seconds * 1000, 'ms'))
+    app.current_dir = app.disk_c
+    return results
+
+
+BENCHMARKS = {
+    'terminal': bench_terminal_output,
+    'terminal_tk': bench_terminal_tk,
+    'dir': bench_dir,
+    'explorer': bench_explorer,
+    'type': bench_type,
+    'launch': bench_launch,
+    'update': bench_update,
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR.parent,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Linie porównania ze wzorcem i liczba regresji"""
+    previous = {entry['name']: entry for entry in baseline['results']}
+    lines = []
+    regressions = 0
+    for entry in results:
+        old = previous.get(entry['name'])
+        if not old or not old['value']:
+            lines.append(f"  {entry['name']:<26} {entry['value']:>12.2f} {entry['unit']:<5}  (brak we wzorcu)")
+            continue
+        change = (entry['value'] - old['value']) / old['value'] * 100
+        worse = -change if entry['better'] == 'higher' else change
+        mark = ''
+        if worse > threshold:
+            mark = '  ⚠️ gorzej'
+            regressions += 1
+        elif worse < -threshold:
+            mark = '  ✅ lepiej'
+        lines.append(f"  {entry['name']:<26} {old['value']:>12.2f} -> {entry['value']:>12.2f} {entry['unit']:<5} "
+                     f"{change:+7.1f}%{mark}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zestaw benchmarków KocurDOS")
+    parser.add_argument('--quick', action='store_true', help="mniejsze drzewa i pliki")
+    parser.add_argument('--only', help="przypadki po przecinku: " + ", ".join(BENCHMARKS))
+    parser.add_argument('--output', help="plik JSON z wynikami (domyślnie bench/results/<data>.json)")
+    parser.add_argument('--baseline', help="porównaj z wynikami z tego pliku")
+    parser.add_argument('--save-baseline', help="zapisz wyniki także jako wzorzec")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="próg regresji w procentach")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"nieznane przypadki: {', '.join(unknown)}")
+
+    results = []
+    skipped = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        output = CountingOutput()
+        context = {
+            'tmp': tmp,
+            'output': output,
+            'shell': KocurShell(tmp / "KocurDOS-diskC-bench", output),
+            'file_mb': QUICK_FILE_MB if args.quick else LARGE_FILE_MB,
+            'trees': {},
+        }
+        if {'dir', 'explorer'} & set(names):
+            for count in QUICK_TREE_SIZES if args.quick else TREE_SIZES:
+                context['trees'][count] = make_tree(tmp / f"drzewo{count}", count)
+
+        for name in names:
+            print(f"{name}...", flush=True)
+            try:
+                entries = BENCHMARKS[name](context)
+            except SkipBenchmark as e:
+                skipped[name] = str(e)
+                print(f"  pominięty: {e}")
+                continue
+            for entry in entries:
+                print(f"  {entry['name']:<26} {entry['value']:>12.2f} {entry['unit']}")
+            results.extend(entries)
+
+        if 'app' in context:
+            context['app'].root.destroy()
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'quick': args.quick,
+        'results': results,
+        'skipped': skipped,
+    }
+    output_path = Path(args.output) if args.output else (
+        BENCH_DIR / "results" / f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding='utf-8')
+    print(f"Wyniki: {output_path}")
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n",
+                                            encoding='utf-8')
+        print(f"Wzorzec: {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        lines, regressions = compare(results, baseline, args.threshold)
+        print(f"Porównanie ze wzorcem {args.baseline} (rewizja {baseline.get('revision')}):")
+        for line in lines:
+            print(line)
+        if regressions:
+            print(f"Regresje ponad {args.threshold:g}%: {regressions}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
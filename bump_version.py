@@ -88,7 +88,6 @@ def update_version_json(new_version):
         }
         
         with open("version.json", "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)  "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
         
         return True
@@ -169,6 +168,12 @@ def main():
     else:
         success = False
     
+    # Aktualizuj kocur_core.py (wersja powłoki bez GUI)
+    if update_version_in_file("kocur_core.py", current_version, new_version):
+        print("✅ kocur_core.py zaktualizowany")
+    else:
+        success = False
+    
     # Aktualizuj version.json
     if update_version_json(new_version):
         print("✅ version.json zaktualizowany")
@@ -10,6 +10,8 @@ import re
 from pathlib import Path
 import webbrowser
 
+from kocur_files import SYSTEM_FILES
+
 def run_command(command, capture_output=True):
     """Uruchom komendę shell i zwróć wynik"""
     try:
@@ -122,8 +124,8 @@ def show_release_info(version, repo_url):
             print("\n⚠️  Przerwano przez użytkownika")
     
     print(f"\n📋 Pliki do załączenia do release:")
-    files_to_attach = [
-        "kocur_dos.py",
+    # Te same pliki, które pobiera updater, oraz narzędzia instalacji
+    files_to_attach = SYSTEM_FILES + [
         "updater.py", 
         "install.py",
         "example_program.py",
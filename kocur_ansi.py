@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - sekwencje ANSI w wyjściu programów
+Kolory (SGR), \\r i \\b, czyszczenie linii; pozostałe sekwencje są
+pomijane. Parser nie zależy od tkinter - zwraca operacje, które
+terminal GUI wykonuje na widżecie.
+"""
+
+import re
+
+# Kolory podstawowe (30-37) i jasne (90-97) na czarnym tle terminala
+ANSI_COLORS = [
+    '#000000', '#cd3131', '#0dbc79', '#e5e510', '#2472c8', '#bc3fbc', '#11a8cd', '#e5e5e5',
+    '#666666', '#f14c4c', '#23d18b', '#f5f543', '#3b8eea', '#d670d6', '#29b8db', '#ffffff',
+]
+
+# Znaki, bez których tekst można wstawić wprost (szybka ścieżka)
+CONTROL_CHARS = '\x1b\r\b'
+
+TOKEN_RE = re.compile(r"""
+    \x1b\[(?P<params>[0-9;?]*)(?P<command>[@-~])     # CSI
+  | \x1b\][^\x07\x1b]*(?:\x07|\x1b\\)                # OSC (np. tytuł okna)
+  | \x1b[@-Z\\-_]                                    # inne sekwencje dwuznakowe
+  | (?P<control>[\r\b])
+""", re.VERBOSE)
+
+# Niedokończona sekwencja na końcu porcji - czeka na resztę
+INCOMPLETE_RE = re.compile(r'\x1b(?:\[[0-9;?]*|\][^\x07\x1b]*)?$')
+
+
+def tag_style(tag):
+    """Opcje tagu Tk dla nazwy z AnsiParser (fg3, bg12, bold)"""
+    if tag == 'bold':
+        return {'font': ('Courier', 10, 'bold')}
+    option = 'foreground' if tag.startswith('fg') else 'background'
+    return {option: ANSI_COLORS[int(tag[2:])]}
+
+
+class AnsiParser:
+    """Zamiana wyjścia programu na operacje terminala
+
+    feed() zwraca listę krotek:
+      ('text', tekst, tagi)  - wstaw tekst (może zawierać \\n)
+      ('cr',)                - kursor na początek linii
+      ('bs',)                - kursor o znak w lewo
+      ('erase', tryb)        - czyść linię: 0 od kursora, 1 do kursora, 2 całą
+    """
+
+    def __init__(self):
+        self.pending = ''
+        self.foreground = None
+        self.background = None
+        self.bold = False
+
+    @property
+    def tags(self):
+        tags = []
+        if self.foreground is not None:
+            tags.append(f'fg{self.foreground}')
+        if self.background is not None:
+            tags.append(f'bg{self.background}')
+        if self.bold:
+            tags.append('bold')
+        return tuple(tags)
+
+    def feed(self, text):
+        text = self.pending + text
+        self.pending = ''
+        incomplete = INCOMPLETE_RE.search(text)
+        if incomplete:
+            self.pending = text[incomplete.start():]
+            text = text[:incomplete.start()]
+
+        operations = []
+        position = 0
+        for match in TOKEN_RE.finditer(text):
+            if match.start() > position:
+                operations.append(('text', text[position:match.start()], self.tags))
+            position = match.end()
+
+            control = match.group('control')
+            command = match.group('command')
+            if control == '\r':
+                operations.append(('cr',))
+            elif control == '\b':
+                operations.append(('bs',))
+            elif command == 'm':
+                self.select_graphic_rendition(match.group('params'))
+            elif command == 'K':
+                operations.append(('erase', int(match.group('params') or 0)))
+        if position < len(text):
+            operations.append(('text', text[position:], self.tags))
+        return operations
+
+    def select_graphic_rendition(self, params):
+        codes = [int(code) for code in params.split(';') if code.isdigit()] or [0]
+        i = 0
+        while i < len(codes):
+            code = codes[i]
+            if code == 0:
+                self.foreground = self.background = None
+                self.bold = False
+            elif code == 1:
+                self.bold = True
+            elif code == 22:
+                self.bold = False
+            elif 30 <= code <= 37:
+                self.foreground = code - 30
+            elif 90 <= code <= 97:
+                self.foreground = code - 90 + 8
+            elif code == 39:
+                self.foreground = None
+            elif 40 <= code <= 47:
+                self.background = code - 40
+            elif 100 <= code <= 107:
+                self.background = code - 100 + 8
+            elif code == 49:
+                self.background = None
+            elif code in (38, 48) and i + 1 < len(codes):
+                # 256 kolorów / RGB: pomijamy parametry, kolory podstawowe zostają
+                if codes[i + 1] == 5 and i + 2 < len(codes):
+                    value = codes[i + 2]
+                    if value < 16:
+                        if code == 38:
+                            self.foreground = value
+                        else:
+                            self.background = value
+                    i += 2
+                elif codes[i + 1] == 2:
+                    i += 4
+            i += 1
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - skrypty wsadowe (.kbat)
+Skrypt jest kompilowany raz do listy gotowych kroków, a potem wykonywany
+w jednym przebiegu; wyjście komend trafia od razu do wyjścia powłoki
+"""
+
+import os
+import re
+import time
+
+from kocur_cmdline import OPERATOR_CHARS, Arguments, CommandLineError, Stage, parse_command_line, read_word
+from kocur_log import log_enabled
+
+VARIABLE_RE = re.compile(r"%%|%(\d)|%([A-Za-z_][\w]*)%")
+IF_ERRORLEVEL_RE = re.compile(r"^if\s+(not\s+)?errorlevel\s+(\d+)\s+(.+)$", re.IGNORECASE)
+
+# Znaczniki miejsc zmiennych w szablonie komendy (znaki z obszaru prywatnego Unicode)
+MARKER_BASE = 0xE000
+MARKER_COUNT = 0x1900
+MARKER_RE = re.compile(f"[{chr(MARKER_BASE)}-{chr(MARKER_BASE + MARKER_COUNT - 1)}]")
+
+
+class BatchError(Exception):
+    """Błąd kompilacji skryptu"""
+
+
+def variable_value(match, shell, script_args=()):
+    """Wartość jednego dopasowania VARIABLE_RE"""
+    if match.group(0) == '%%':
+        return '%'
+    if match.group(1) is not None:
+        index = int(match.group(1))
+        return script_args[index] if index < len(script_args) else ''
+    name = match.group(2).upper()
+    if name == 'ERRORLEVEL':
+        return str(shell.errorlevel)
+    return shell.variables.get(name, '')
+
+
+def expand_variables(text, shell, script_args=()):
+    """Rozwiń %NAZWA%, %ERRORLEVEL%, %0..%9 i %%"""
+    return VARIABLE_RE.sub(lambda match: variable_value(match, shell, script_args), text)
+
+
+def changes_words(value):
+    """Czy wartość zmiennej zmienia podział linii na słowa (wtedy linia jest parsowana od nowa)"""
+    return (not value or '"' in value or '^' in value or any(char in value for char in OPERATOR_CHARS)
+            or any(char.isspace() for char in value))
+
+
+class CommandStep:
+    """Komenda z rozwiązaną wcześniej funkcją obsługi
+
+    Linia ze zmiennymi jest parsowana raz jako szablon: każde %...% zastępuje
+    znacznik, a przy wykonaniu do gotowych słów trafiają tylko wartości.
+    Wartość, która zmieniłaby podział na słowa (spacje, cudzysłowy, |<>, pusta),
+    wymusza parsowanie rozwiniętej linii, jak w DOS.
+    """
+
+    def __init__(self, shell, line, echo):
+        self.line = line
+        self.echo = echo
+        self.variables = list(VARIABLE_RE.finditer(line))
+        # Znaki znaczników w samej linii albo za dużo zmiennych: zawsze pełne parsowanie
+        self.reparse = len(self.variables) > MARKER_COUNT or (
+            bool(self.variables) and MARKER_RE.search(line) is not None)
+        if self.reparse:
+            return
+        template = line
+        if self.variables:
+            markers = iter(range(MARKER_BASE, MARKER_BASE + MARKER_COUNT))
+            template = VARIABLE_RE.sub(lambda match: chr(next(markers)), line)
+        try:
+            self.stages = parse_command_line(template)
+        except CommandLineError as e:
+            raise BatchError(str(e))
+        self.simple = len(self.stages) == 1 and not self.stages[0].redirected
+        if self.simple:
+            stage = self.stages[0]
+            self.name = stage.name
+            self.args = stage.args
+            # Nazwa ze zmiennej (%EDYTOR% plik) - funkcja wybierana przy wykonaniu
+            self.variable_name = MARKER_RE.search(self.name) is not None
+            self.handler = shell.commands.get(self.name)
+
+    def run(self, shell, program, args):
+        if not log_enabled():
+            return self.execute(shell, args)
+        start = time.monotonic()
+        code = self.execute(shell, args)
+        shell.log_command(self.line, code, start)
+        return code
+
+    def execute(self, shell, args):
+        if self.echo and shell.batch_echo:
+            line = expand_variables(self.line, shell, args) if self.variables else self.line
+            shell.print(f"{shell.prompt} {line}")
+        if not self.variables:
+            if self.simple:
+                return shell.run_handler(self.name, self.handler, self.args)
+            return shell.run_stages(self.stages)
+
+        values = [variable_value(match, shell, args) for match in self.variables]
+        if self.reparse or any(changes_words(value) for value in values):
+            try:
+                stages = parse_command_line(expand_variables(self.line, shell, args))
+            except CommandLineError as e:
+                shell.print(f"Błąd: {e}")
+                return 1
+            return shell.run_stages(stages)
+
+        table = {MARKER_BASE + i: value for i, value in enumerate(values)}
+        if self.simple:
+            arguments = Arguments([word.translate(table) for word in self.args], self.args.text.translate(table))
+            if self.variable_name:
+                name = self.name.translate(table).lower()
+                return shell.run_handler(name, shell.commands.get(name), arguments)
+            return shell.run_handler(self.name, self.handler, arguments)
+        stages = tuple(Stage([word.translate(table) for word in stage.words], stage.args.text.translate(table),
+                             stage.stdin_path and stage.stdin_path.translate(table),
+                             stage.stdout_path and stage.stdout_path.translate(table), stage.append)
+                       for stage in self.stages)
+        return shell.run_stages(stages)
+
+
+class EchoModeStep:
+    """echo on / echo off"""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+
+    def run(self, shell, program, args):
+        shell.batch_echo = self.enabled
+        return shell.errorlevel
+
+
+class GotoStep:
+    def __init__(self, label):
+        self.label = label
+        self.target = None
+
+    def run(self, shell, program, args):
+        program.jump = self.target
+        return shell.errorlevel
+
+
+class IfStep:
+    """if [not] errorlevel N komenda / if [not] A==B komenda
+
+    Argumenty porównania (left, right) to surowy tekst: rozwijany przy wykonaniu,
+    a potem odczytywany jak słowo linii komend ("a b" to jedno słowo a b).
+    """
+
+    def __init__(self, negate, level, left, right, step):
+        self.negate = negate
+        self.level = level
+        self.left = left
+        self.right = right
+        self.step = step
+
+    def run(self, shell, program, args):
+        if self.level is not None:
+            result = shell.errorlevel >= self.level
+        else:
+            left = read_word(expand_variables(self.left, shell, args))[0]
+            right = read_word(expand_variables(self.right, shell, args))[0]
+            result = left == right
+        if result != self.negate:
+            return self.step.run(shell, program, args)
+        return shell.errorlevel
+
+
+class BatchProgram:
+    """Skompilowany skrypt: lista kroków i mapa etykiet"""
+
+    def __init__(self, steps, labels):
+        self.steps = steps
+        self.labels = labels
+        self.jump = None
+
+    def run(self, shell, args=()):
+        """Wykonaj skrypt; zwraca końcowy errorlevel"""
+        steps = self.steps
+        pc = 0
+        count = len(steps)
+        while pc < count:
+            self.jump = None
+            job = shell.job_thread
+            code = steps[pc].run(shell, self, args)
+            # Program uruchomiony przez ten krok: skrypt czeka na jego zakończenie
+            # (zadanie sprzed kroku, np. z GUI, nie zmienia errorlevel)
+            if shell.job_thread is not None and shell.job_thread is not job:
+                code = shell.wait_for_job()
+            shell.errorlevel = code or 0
+            if shell.output.exit_requested:
+                break
+            pc = self.jump if self.jump is not None else pc + 1
+        return shell.errorlevel
+
+
+def compile_line(shell, line, echo=True):
+    """Skompiluj jedną linię do kroku (bez etykiet)"""
+    if line.startswith('@'):
+        echo = False
+        line = line[1:].lstrip()
+
+    lower = line.lower()
+    if lower in ('echo off', 'echo on'):
+        return EchoModeStep(lower == 'echo on')
+    if lower.startswith('goto ') or lower.startswith('goto:'):
+        return GotoStep(line[5:].strip().lstrip(':').lower())
+    if lower.startswith('if '):
+        return compile_if(shell, line, echo)
+    return CommandStep(shell, line, echo)
+
+
+def compile_if(shell, line, echo):
+    """if [not] errorlevel N komenda / if [not] A==B komenda (słowa jak w linii komend)"""
+    match = IF_ERRORLEVEL_RE.match(line)
+    if match:
+        negate, level, rest = match.groups()
+        return IfStep(bool(negate), int(level), None, None, compile_line(shell, rest, echo))
+
+    error = BatchError(f"Nieprawidłowa instrukcja if: {line}")
+    word, start, end = read_word(line, 2, '==')
+    negate = line[start:end].lower() == 'not'
+    if negate:
+        word, start, end = read_word(line, end, '==')
+    level = left = right = None
+    if line[start:end].lower() == 'errorlevel':
+        word, start, end = read_word(line, end)
+        if not word.isdigit():
+            raise error
+        level = int(word)
+    else:
+        left = line[start:end]
+        # Odstępy wokół == są dozwolone (if %1 == a)
+        start = read_word(line, end, '==')[1]
+        if not line.startswith('==', start):
+            raise error
+        word, start, end = read_word(line, start + 2)
+        right = line[start:end]
+        if not left or not right:
+            raise error
+    rest = line[end:].strip()
+    if not rest:
+        raise error
+    return IfStep(negate, level, left, right, compile_line(shell, rest, echo))
+
+
+def compile_script(text, shell):
+    """Skompiluj tekst skryptu do BatchProgram"""
+    steps = []
+    labels = {}
+    gotos = []
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if not line or line.startswith('::') or line.lower().startswith('rem ') or line.lower() == 'rem':
+            continue
+        if line.startswith(':'):
+            labels[line[1:].strip().lower()] = len(steps)
+            continue
+        try:
+            step = compile_line(shell, line)
+        except BatchError as e:
+            raise BatchError(f"Linia {number}: {e}")
+        steps.append(step)
+
+        # goto także wewnątrz if
+        inner = step
+        while isinstance(inner, IfStep):
+            inner = inner.step
+        if isinstance(inner, GotoStep):
+            gotos.append((number, inner))
+
+    labels['eof'] = len(steps)
+    for number, goto in gotos:
+        if goto.label not in labels:
+            raise BatchError(f"Linia {number}: nieznana etykieta: {goto.label}")
+        goto.target = labels[goto.label]
+    return BatchProgram(steps, labels)
+
+
+class ScriptCache:
+    """Skompilowane skrypty (klucz: ścieżka, mtime i rozmiar)"""
+
+    def __init__(self):
+        self.programs = {}
+
+    def load(self, path, shell):
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self.programs.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            program = compile_script(f.read(), shell)
+        self.programs[path] = (key, program)
+        return program
+
+
+def in_batch(shell):
+    """Czy bieżący wątek wykonuje skrypt (call wewnątrz skryptu)"""
+    return getattr(shell.local, 'batch', False)
+
+
+def run_script(shell, path, args=()):
+    """Uruchom skrypt w bieżącym wątku; zwraca końcowy errorlevel"""
+    program = shell.script_cache.load(str(path), shell)
+    if in_batch(shell):
+        return program.run(shell, args)
+    shell.local.batch = True
+    shell.batch_echo = True
+    try:
+        return program.run(shell, args)
+    finally:
+        shell.local.batch = False
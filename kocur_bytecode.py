@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - pamięć podręczna kodu bajtowego skryptów
+Python nie zapisuje kodu bajtowego uruchamianego skryptu (zawsze go
+kompiluje). KocurDOS trzyma skompilowany kod w .kocurdos/bytecode,
+pod kluczem z nazwy i skrótu źródła, a kompiluje w tle - po zapisie
+w edytorze albo po zmianie pliku na dysku.
+"""
+
+import hashlib
+import marshal
+import os
+import queue
+import threading
+from pathlib import Path
+
+from kocur_runcode import CODE_HEADER
+
+# Ile plików trzyma pamięć podręczna (najdawniej używane są usuwane)
+CACHE_LIMIT = 500
+
+# Mniejsze skrypty Python kompiluje szybciej, niż trwa start przez kocur_runcode
+MIN_SOURCE_SIZE = 16 * 1024
+
+
+def source_key(name, source):
+    """Klucz kodu: wersja Pythona, nazwa pliku (w śladach błędów) i treść"""
+    digest = hashlib.sha256(CODE_HEADER)
+    digest.update(name.encode('utf-8') + b'\0')
+    digest.update(source)
+    return digest.hexdigest()[:40]
+
+
+class BytecodeCache:
+    """Skompilowane skrypty w katalogu pamięci podręcznej"""
+
+    def __init__(self, directory, limit=CACHE_LIMIT, min_size=MIN_SOURCE_SIZE):
+        self.directory = Path(os.path.abspath(directory))
+        self.limit = limit
+        self.min_size = min_size
+        # ścieżka -> (mtime_ns, rozmiar, klucz): bez ponownego czytania niezmienionych plików
+        self.known = {}
+        self.lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.thread = None
+        self.compiled = 0
+
+    def cache_path(self, key):
+        return self.directory / f"{key}.pyc"
+
+    def lookup(self, path):
+        """Plik z kodem skryptu (kompiluje, gdy go brak)
+
+        None dla małych skryptów i przy błędzie składni - wtedy skrypt
+        uruchamiany jest zwykłym python.
+        """
+        path = str(path)
+        try:
+            st = os.stat(path)
+            with self.lock:
+                known = self.known.get(path)
+            if known and known[:2] == (st.st_mtime_ns, st.st_size):
+                cache_path = self.cache_path(known[2])
+                try:
+                    os.utime(cache_path)
+                    return cache_path
+                except OSError:
+                    pass
+            return self.compile(path)
+        except OSError:
+            return None
+
+    def compile(self, path):
+        path = str(path)
+        st = os.stat(path)
+        if st.st_size < self.min_size:
+            return None
+        with open(path, 'rb') as f:
+            source = f.read()
+        name = os.path.basename(path)
+        key = source_key(name, source)
+        cache_path = self.cache_path(key)
+        if not cache_path.exists():
+            try:
+                code = compile(source, name, 'exec', dont_inherit=True)
+            except (SyntaxError, ValueError):
+                # Błąd pokaże sam Python przy uruchomieniu
+                return None
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary = cache_path.with_name(f"{key}.{threading.get_ident()}.tmp")
+            with open(temporary, 'wb') as f:
+                f.write(CODE_HEADER)
+                marshal.dump(code, f)
+            os.replace(temporary, cache_path)
+            self.compiled += 1
+        else:
+            # Czas dostępu dla usuwania najdawniej używanych
+            os.utime(cache_path)
+        with self.lock:
+            self.known[path] = (st.st_mtime_ns, st.st_size, key)
+        return cache_path
+
+    def submit(self, path):
+        """Skompiluj skrypt w tle"""
+        self._queue(('compile', str(path)))
+
+    def scan(self, directory):
+        """Skompiluj w tle zmienione skrypty z katalogu (bez podkatalogów)"""
+        if self.pending.empty():
+            self._queue(('scan', str(directory)))
+
+    def _queue(self, task):
+        self.pending.put(task)
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='kocur-bytecode', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            kind, path = self.pending.get()
+            try:
+                if kind == 'compile':
+                    self.compile(path)
+                else:
+                    self._scan(path)
+                if self.pending.empty():
+                    self.prune()
+            except OSError:
+                pass
+
+    def _scan(self, directory):
+        with os.scandir(directory) as entries:
+            scripts = [entry for entry in entries if entry.name.endswith('.py') and entry.is_file()]
+        for entry in scripts:
+            st = entry.stat()
+            with self.lock:
+                known = self.known.get(entry.path)
+            if not known or known[:2] != (st.st_mtime_ns, st.st_size):
+                self.compile(entry.path)
+
+    def prune(self):
+        """Usuń najdawniej używane pliki ponad limit"""
+        try:
+            entries = [(entry.stat().st_mtime, entry.path) for entry in os.scandir(self.directory)
+                       if entry.name.endswith('.pyc')]
+        except OSError:
+            return
+        if len(entries) <= self.limit:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.limit]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - parser linii komend
+Reguły jak w DOS: cudzysłowy grupują słowa ze spacjami, "" w cudzysłowie
+to znak ", ^ poprzedza znak dosłowny, a |, <, >, >> poza cudzysłowem
+to potoki i przekierowania. Wynik jest zapamiętywany, więc komendy
+z historii nie są parsowane ponownie.
+"""
+
+from functools import lru_cache
+
+OPERATOR_CHARS = '|<>'
+
+# Ile różnych linii trzyma pamięć podręczna parsera
+CACHE_SIZE = 1024
+
+
+class CommandLineError(Exception):
+    """Błąd składni linii komend"""
+
+
+class Arguments(tuple):
+    """Argumenty komendy (bez cudzysłowów); text to surowy tekst dla echo i set"""
+
+    def __new__(cls, words=(), text=''):
+        self = super().__new__(cls, words)
+        self.text = text
+        return self
+
+
+class Stage:
+    """Jedna komenda linii: słowa i przekierowania (etap potoku)"""
+
+    def __init__(self, words, text, stdin_path=None, stdout_path=None, append=False):
+        self.words = tuple(words)
+        self.name = words[0].lower()
+        self.args = Arguments(words[1:], text)
+        self.stdin_path = stdin_path
+        self.stdout_path = stdout_path
+        self.append = append
+
+    @property
+    def redirected(self):
+        return bool(self.stdin_path or self.stdout_path)
+
+    @property
+    def is_python(self):
+        return self.name == 'python'
+
+
+def has_operators(command):
+    """Szybki test: czy linia może zawierać potok lub przekierowanie"""
+    return any(char in command for char in OPERATOR_CHARS)
+
+
+def read_word(command, start=0, stop=None):
+    """Następne słowo od pozycji start (te same reguły cudzysłowów i ^)
+
+    Zwraca (słowo, początek, koniec): surowy tekst słowa to command[początek:koniec].
+    Słowo kończy biały znak poza cudzysłowem albo tekst stop (np. '==' w if).
+    """
+    length = len(command)
+    while start < length and command[start].isspace():
+        start += 1
+    word = []
+    quoted = False
+    i = start
+    while i < length:
+        char = command[i]
+        if quoted:
+            if char == '"':
+                if command.startswith('""', i):
+                    word.append('"')
+                    i += 2
+                    continue
+                quoted = False
+            else:
+                word.append(char)
+        elif char == '"':
+            quoted = True
+        elif char == '^' and i + 1 < length:
+            i += 1
+            word.append(command[i])
+        elif char.isspace() or (stop and command.startswith(stop, i)):
+            break
+        else:
+            word.append(char)
+        i += 1
+    return ''.join(word), start, i
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_command_line(command):
+    """Podziel linię na etapy; zwraca krotkę Stage (pusta dla pustej linii)"""
+    stages = []
+    words = []
+    raw = []            # surowy tekst etapu bez przekierowań
+    args_start = None   # pozycja w raw za nazwą komendy
+    redirects = {}
+    word = []
+    in_word = False
+    quoted = False
+    target = None       # 'in' / 'out' / 'append' - czeka na nazwę pliku
+
+    def finish_word():
+        nonlocal in_word, target, args_start
+        if not in_word:
+            return
+        text = ''.join(word)
+        word.clear()
+        in_word = False
+        if target == 'in':
+            redirects['stdin_path'] = text
+        elif target is not None:
+            redirects['stdout_path'] = text
+            redirects['append'] = target == 'append'
+        else:
+            words.append(text)
+            if len(words) == 1:
+                args_start = len(raw)
+        target = None
+
+    def finish_stage():
+        if not words:
+            raise CommandLineError("Pusta komenda w potoku")
+        text = ''.join(raw[args_start:]).strip()
+        stages.append(Stage(words[:], text, **redirects))
+        words.clear()
+        raw.clear()
+        redirects.clear()
+
+    i = 0
+    length = len(command)
+    while i < length:
+        char = command[i]
+        if quoted:
+            if char == '"':
+                if command.startswith('""', i):
+                    word.append('"')
+                    raw.append('""')
+                    i += 2
+                    continue
+                quoted = False
+            else:
+                word.append(char)
+        elif char == '"':
+            quoted = True
+            in_word = True
+        elif char == '^' and i + 1 < length:
+            i += 1
+            char = command[i]
+            word.append(char)
+            in_word = True
+        elif char.isspace():
+            finish_word()
+        elif char in OPERATOR_CHARS:
+            finish_word()
+            if target is not None:
+                raise CommandLineError("Brak nazwy pliku po przekierowaniu")
+            if char == '|':
+                finish_stage()
+                i += 1
+                continue
+            if char == '<':
+                target = 'in'
+            elif command.startswith('>>', i):
+                target = 'append'
+                i += 1
+            else:
+                target = 'out'
+            i += 1
+            continue
+        else:
+            word.append(char)
+            in_word = True
+
+        # Nazwy plików przekierowań nie należą do tekstu komendy
+        if target is None:
+            raw.append(char)
+        i += 1
+
+    if quoted:
+        # Niezamknięty cudzysłów obejmuje resztę linii (jak w DOS)
+        quoted = False
+    finish_word()
+    if target is not None:
+        raise CommandLineError("Brak nazwy pliku po przekierowaniu")
+    if words:
+        finish_stage()
+    elif stages:
+        raise CommandLineError("Pusta komenda w potoku")
+    return tuple(stages)
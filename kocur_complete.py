@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - uzupełnianie komend i ścieżek (Tab)
+Listy katalogów są zapamiętywane i odświeżane tylko po zmianie mtime
+katalogu, więc nawet przy 50 tys. plików Tab nie skanuje dysku ponownie
+"""
+
+import os
+from bisect import bisect_left
+from collections import OrderedDict
+
+# Ile katalogów trzyma pamięć podręczna
+CACHE_DIRS = 64
+
+# Komendy, dla których podpowiadane są tylko katalogi
+DIRECTORY_COMMANDS = {'cd', 'rmdir', 'mkdir'}
+
+WORD_SEPARATORS = ' \t|<>'
+
+
+class DirectoryListing:
+    """Nazwy z jednego katalogu posortowane bez rozróżniania wielkości liter"""
+
+    def __init__(self, path, mtime_ns):
+        self.mtime_ns = mtime_ns
+        entries = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                entries.append((entry.name.lower(), entry.name, is_dir))
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.names = [name for _, name, _ in entries]
+        self.dirs = [is_dir for _, _, is_dir in entries]
+
+    def starting_with(self, prefix, dirs_only=False):
+        """Nazwy zaczynające się od prefix (wyszukiwanie binarne)"""
+        prefix = prefix.lower()
+        found = []
+        for i in range(bisect_left(self.keys, prefix), len(self.keys)):
+            if not self.keys[i].startswith(prefix):
+                break
+            if dirs_only and not self.dirs[i]:
+                continue
+            found.append((self.names[i], self.dirs[i]))
+        return found
+
+
+class DirectoryIndex:
+    """Pamięć podręczna list katalogów (unieważniana przez mtime)"""
+
+    def __init__(self, size=CACHE_DIRS):
+        self.size = size
+        self.listings = OrderedDict()
+
+    def listing(self, path):
+        path = str(path)
+        mtime_ns = os.stat(path).st_mtime_ns
+        listing = self.listings.get(path)
+        if listing is None or listing.mtime_ns != mtime_ns:
+            listing = DirectoryListing(path, mtime_ns)
+            self.listings[path] = listing
+            if len(self.listings) > self.size:
+                self.listings.popitem(last=False)
+        self.listings.move_to_end(path)
+        return listing
+
+
+def split_current_word(line):
+    """(tekst przed słowem, słowo bez cudzysłowu, komenda etapu lub None)
+
+    None oznacza, że uzupełniane słowo jest nazwą komendy.
+    """
+    start = 0
+    stage_start = 0
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char in WORD_SEPARATORS:
+            start = i + 1
+            if char == '|':
+                stage_start = i + 1
+    head = line[:start]
+    word = line[start:].replace('"', '')
+    before = line[stage_start:start].split()
+    return head, word, before[0].lower() if before else None
+
+
+class Completion:
+    """Trwające uzupełnianie: kolejne Tab przechodzą przez kandydatów"""
+
+    def __init__(self, head, candidates):
+        self.head = head
+        self.candidates = candidates
+        self.index = -1
+        self.current = None
+
+    def next(self):
+        self.index = (self.index + 1) % len(self.candidates)
+        self.current = self.head + self.candidates[self.index]
+        return self.current
+
+
+class Completer:
+    """Kandydaci: nazwy komend dla pierwszego słowa, ścieżki dla pozostałych"""
+
+    def __init__(self, shell, index=None):
+        self.shell = shell
+        self.index = index or DirectoryIndex()
+
+    def start(self, line):
+        """Rozpocznij uzupełnianie tekstu przed kursorem (None gdy brak kandydatów)"""
+        head, candidates = self.candidates(line)
+        return Completion(head, candidates) if candidates else None
+
+    def candidates(self, line):
+        head, word, command = split_current_word(line)
+        if command is None:
+            prefix = word.lower()
+            return head, sorted(name + ' ' for name in self.shell.commands if name.startswith(prefix))
+
+        dirs_only = command in DIRECTORY_COMMANDS
+        separator = max(word.rfind('\\'), word.rfind('/'))
+        directory_part = word[:separator + 1]
+        prefix = word[separator + 1:]
+        try:
+            directory = self.shell.resolve_path(directory_part) if directory_part else self.shell.current_dir
+            listing = self.index.listing(directory)
+        except OSError:
+            return head, []
+
+        candidates = []
+        for name, is_dir in listing.starting_with(prefix, dirs_only):
+            # Ukryte pliki (np. .kocurdos) tylko gdy użytkownik zaczął od kropki
+            if name.startswith('.') and not prefix.startswith('.'):
+                continue
+            text = directory_part + name + ('\\' if is_dir else '')
+            if ' ' in text:
+                text = f'"{text}"'
+            # Po pliku spacja, po katalogu można uzupełniać dalej
+            candidates.append(text if is_dir else text + ' ')
+        return head, candidates
@@ -0,0 +1,1227 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - rdzeń powłoki (bez tkinter)
+Komendy DOS z wymiennym wyjściem: terminal GUI albo stdin/stdout
+"""
+
+import os
+import sys
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from kocur_batch import BatchError, ScriptCache, expand_variables, in_batch, run_script
+from kocur_bytecode import BytecodeCache
+from kocur_cmdline import CommandLineError, parse_command_line
+from kocur_complete import Completer
+from kocur_fileio import atomic_write
+from kocur_fsops import (BACKGROUND_BYTES, BACKGROUND_THRESHOLD, MAX_REPORTED_ERRORS, copy_file, has_wildcards,
+                         match_entries, move_path, plan_copies, remove_path, run_bulk, walk_tree)
+from kocur_history import CommandHistory
+from kocur_ioloop import ProcessLoop
+from kocur_log import log_event, start_logging
+from kocur_metrics import format_rows, metrics
+from kocur_pipeline import Pipeline, PipelineError
+from kocur_profile import TOP_FUNCTIONS
+from kocur_procstat import PROC_SUPPORTED, ProcessMonitor, format_table, format_usage, read_process
+from kocur_pty import PTY_SUPPORTED, PtyProcess, open_terminal, terminal_variables
+from kocur_workers import POOL_SIZE, WORKERS_SUPPORTED, WorkerPool
+
+
+# Uruchamia skrypt z kodu w pamięci podręcznej (kocur_runcode --run)
+BYTECODE_RUNNER = str(Path(__file__).resolve().with_name("kocur_runcode.py"))
+
+# Uruchamia skrypt pod profilerem (komenda profile)
+PROFILE_RUNNER = str(Path(__file__).resolve().with_name("kocur_profile.py"))
+
+# Limit czasu programu, który nie może dostać danych od użytkownika (skrypty, --run)
+PROGRAM_TIMEOUT = 30
+
+
+class ShellOutput:
+    """Interfejs wyjścia powłoki"""
+
+    exit_requested = False
+    partial = ''
+
+    def write(self, text):
+        raise NotImplementedError
+
+    def write_raw(self, text):
+        """Tekst bez dodawania końca linii (wyjście programu na bieżąco)"""
+        *lines, self.partial = (self.partial + text).split('\n')
+        for line in lines:
+            self.write(line)
+
+    def clear(self):
+        """Wyczyść ekran"""
+
+    def exit(self):
+        """Komenda exit"""
+
+    def directory_changed(self, path):
+        """Zmiana bieżącego katalogu (np. aktualizacja promptu)"""
+
+    def show_processes(self):
+        """Komenda top: True gdy wyjście ma widok odświeżany na bieżąco"""
+        return False
+
+
+class StdoutOutput(ShellOutput):
+    """Wyjście na stdout (tryb bez GUI)"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.exit_requested = False
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        with self.lock:
+            self.stream.write(text + '\n')
+
+    def write_raw(self, text):
+        with self.lock:
+            self.stream.write(text)
+            self.stream.flush()
+
+    def flush(self):
+        with self.lock:
+            self.stream.flush()
+
+    def clear(self):
+        if self.stream.isatty():
+            self.stream.write("\033[2J\033[H")
+
+    def exit(self):
+        self.exit_requested = True
+
+
+class KocurShell:
+    VERSION = "1.0.0"
+
+    def __init__(self, disk_c, output):
+        self.disk_c = Path(disk_c)
+        self.disk_c.mkdir(exist_ok=True)
+        self.current_dir = self.disk_c
+        self.default_output = output
+
+        # Etapy potoku działają w osobnych wątkach, każdy z własnym wyjściem i wejściem
+        self.local = threading.local()
+
+        # Aktualny proces Python; interactive_input - wejście programu z pola komendy (GUI)
+        self.current_process = None
+        self.interactive_input = False
+        # Programy z wejściem z GUI w pseudoterminalu (Linux)
+        self.use_pty = False
+        # Wyjście wszystkich programów czyta jeden wątek; start - programy w tle
+        self.process_loop = ProcessLoop()
+        self.background_jobs = {}
+        self.last_job = 0
+        # Próbki /proc dla ps i zakładki Procesy (odstęp: top <sekundy>)
+        self.monitor = ProcessMonitor()
+        # Pula rozgrzanych interpreterów (komenda workers; domyślnie wyłączona)
+        self.worker_pool = None
+        # Skompilowane skrypty - python nie kompiluje ich przy każdym uruchomieniu
+        self.bytecode = BytecodeCache(self.disk_c / ".kocurdos" / "bytecode")
+        # Kody wyjścia zakończonych zadań (zadanie -> kod), odbiera je wait_for_job
+        self.job_codes = {}
+
+        # Zmienne (set) i kod wyjścia ostatniej komendy
+        self.variables = {}
+        self.errorlevel = 0
+        self.script_cache = ScriptCache()
+        self.batch_echo = True
+
+        # Dyspozytor komend: nazwa -> funkcja(args)
+        self.commands = {
+            'help': self.show_help,
+            'dir': self.list_directory,
+            'ls': self.list_directory,
+            'cd': self.change_directory,
+            'mkdir': self.make_directory,
+            'rmdir': self.remove_directory,
+            'del': self.delete_file,
+            'rm': self.delete_file,
+            'type': self.show_file_content,
+            'cat': self.show_file_content,
+            'echo': self.echo_text,
+            'cls': self.clear_terminal,
+            'clear': self.clear_terminal,
+            'python': self.run_python_command,
+            'profile': self.profile_program,
+            'start': self.start_program,
+            'workers': self.configure_workers,
+            'ps': self.list_processes,
+            'top': self.show_top,
+            'stats': self.show_stats,
+            'exit': self.exit_shell,
+            'ver': self.show_version,
+            'stop': self.interrupt_process,
+            'set': self.set_variable,
+            'call': self.call_script,
+            'copy': self.copy_files,
+            'move': self.move_files,
+            'xcopy': self.xcopy_tree,
+            'find': self.find_text,
+            'sort': self.sort_lines,
+        }
+
+    @property
+    def prompt(self):
+        return f"C:\\{self.current_dir.name}>"
+
+    @property
+    def output(self):
+        return getattr(self.local, 'output', self.default_output)
+
+    @output.setter
+    def output(self, value):
+        if hasattr(self.local, 'output'):
+            self.local.output = value
+        else:
+            self.default_output = value
+
+    @property
+    def job_thread(self):
+        """Zadanie uruchomione z bieżącego wątku (skrypt wsadowy w tle ma własne)"""
+        return getattr(self.local, 'job', None)
+
+    @job_thread.setter
+    def job_thread(self, value):
+        self.local.job = value
+
+    @property
+    def stdin(self):
+        """Wejście komendy w potoku (None poza potokiem)"""
+        return getattr(self.local, 'stdin', None)
+
+    @contextmanager
+    def redirected(self, output, stdin=None):
+        """Wyjście i wejście komend w bieżącym wątku (etap potoku)"""
+        self.local.output = output
+        self.local.stdin = stdin
+        try:
+            yield
+        finally:
+            del self.local.output
+            del self.local.stdin
+
+    def print(self, text):
+        self.output.write(text)
+
+    def resolve_path(self, name):
+        """Ścieżka DOS (a\\b.txt, C:\\a) względem bieżącego katalogu"""
+        name = name.replace('\\', '/')
+        if name[:2].lower() == 'c:':
+            return self.disk_c / name[2:].lstrip('/')
+        return self.current_dir / name
+
+    @metrics.timed('process_command')
+    def process_command(self, command):
+        """Wykonaj komendę; zwraca kod wyjścia (errorlevel)"""
+        start = time.monotonic()
+        code = self.run_command_line(command)
+        self.log_command(command, code, start)
+        return code
+
+    def log_command(self, command, code, start):
+        """Komenda w dzienniku sesji"""
+        # Tekst sprzed rozwinięcia %ZMIENNYCH% (wartości nie trafiają do dziennika);
+        # skrypt wsadowy podaje tu linię skryptu, nie rozwiniętą komendę
+        log_event('command', command=command, cwd=os.path.abspath(self.current_dir), code=code,
+                  duration_ms=round((time.monotonic() - start) * 1000, 2))
+
+    def run_command_line(self, command):
+        if '%' in command:
+            command = expand_variables(command, self)
+        try:
+            stages = parse_command_line(command)
+        except CommandLineError as e:
+            self.print(f"Błąd: {e}")
+            self.errorlevel = 1
+            return 1
+        return self.run_stages(stages)
+
+    def run_stages(self, stages):
+        """Wykonaj sparsowaną linię (jedna komenda albo potok)"""
+        if not stages:
+            return 0
+        if len(stages) == 1 and not stages[0].redirected:
+            stage = stages[0]
+            return self.run_handler(stage.name, self.commands.get(stage.name), stage.args)
+        return self.run_pipeline(stages)
+
+    def run_pipeline(self, stages):
+        """Komendy połączone | oraz przekierowania <, >, >>"""
+        try:
+            pipeline = Pipeline(self, stages)
+            pipeline.start()
+        except PipelineError as e:
+            self.print(f"Błąd: {e}")
+            self.errorlevel = 1
+            return 1
+
+        # Na etapy czekamy w tle, jak na program uruchomiony komendą python
+        return self.start_job(pipeline.wait)
+
+    def start_job(self, work):
+        """Wykonaj work() w tle jako zadanie; jego wynik to kod wyjścia zadania"""
+        def run():
+            self.job_codes[thread] = work()
+
+        thread = self.job_thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return 0
+
+    def run_handler(self, name, handler, args):
+        """Wywołaj funkcję komendy i ustaw errorlevel"""
+        if handler is None:
+            self.print(f"Nieznana komenda: {name}")
+            code = 1
+        else:
+            code = handler(args) or 0
+        self.errorlevel = code
+        return code
+
+    def show_help(self, args=None):
+        help_text = """
+Dostępne komendy:
+  help          - Pokaż tę pomoc
+  dir, ls [wzorzec] - Wyświetl zawartość katalogu (np. dir *.py)
+  cd <katalog>  - Zmień katalog
+  mkdir <nazwa...> - Utwórz katalogi
+  rmdir [/s] <nazwa...> - Usuń katalogi (/s - razem z zawartością)
+  del, rm <plik...> - Usuń pliki (np. del *.log)
+  type, cat <plik...> - Wyświetl zawartość plików
+  copy <plik...> <cel> - Kopiuj pliki (kilka plików: cel to katalog)
+  move <plik...> <cel> - Przenieś pliki lub katalogi
+  xcopy <źródło> <cel> [/s /e] - Kopiuj drzewo katalogów
+                  (copy i xcopy: /v - weryfikuj, /z - wznów przerwane kopiowanie)
+  echo <tekst>  - Wyświetl tekst
+  find [/i /v /c] "tekst" [plik] - Linie zawierające tekst
+  sort [/r] [plik] - Posortuj linie
+  set [a=b]     - Ustaw lub pokaż zmienne (%a% w komendach)
+  call <plik>   - Uruchom skrypt wsadowy .kbat
+  cls, clear    - Wyczyść terminal
+  python <plik> - Uruchom skrypt Python
+  profile [/s] [/n:liczba] <plik.py> - Uruchom skrypt pod profilerem
+                  (cProfile i plik .pstats; /s - próbkowanie stosu i plik .collapsed)
+  stop          - Przerwij działający program
+  start python <plik.py> - Uruchom program w tle (bez czekania)
+  workers [on [n] | off] - Pula rozgrzanych interpreterów (szybki start python)
+  ps            - Działające programy: CPU%, pamięć, odczyt/zapis, wątki
+  top [sekundy] - Zakładka Procesy odświeżana co podany czas
+  stats [on | off | reset] - Czasy operacji KocurDOS (pomiary: stats on)
+  stats json|prometheus [plik] - Eksport pomiarów
+  ver           - Pokaż wersję
+  exit          - Wyjście
+
+Nazwy ze spacjami w cudzysłowie: cd "Moje pliki"
+Wzorce * i ? w del, dir, copy, move, xcopy; /l - tylko pokaż, co zostałoby zrobione
+
+Potoki i przekierowania:
+  dir | find ".py"        type dane.txt | python filtr.py > wynik.txt
+  komenda > plik, komenda >> plik (dopisz), komenda < plik
+
+Gdy program działa, wpisany tekst trafia na jego wejście (input())
+
+💡 Skróty klawiszowe:
+  Ctrl+C        - Przerwij program
+  Ctrl+D        - Koniec danych dla programu (input() dostaje EOF)
+  ↑/↓           - Historia komend
+  Ctrl+R        - Szukaj w historii (kolejne Ctrl+R - starsze, Esc - anuluj)
+  Tab           - Uzupełnij komendę lub ścieżkę (kolejne Tab - następna)
+        """
+        self.print(help_text)
+
+    def show_version(self, args=None):
+        self.print(f"KocurDOS v{self.VERSION}")
+
+    def exit_shell(self, args=None):
+        self.output.exit()
+
+    def list_directory(self, args=None):
+        try:
+            if args:
+                path = self.resolve_path(args[0])
+                if path.is_dir():
+                    entries = match_entries(path, '*')
+                elif has_wildcards(path.name):
+                    entries = match_entries(path.parent, path.name)
+                else:
+                    self.print(f"Nie znaleziono: {args[0]}")
+                    return 1
+            else:
+                entries = match_entries(self.current_dir, '*')
+            if not entries:
+                if not args:
+                    self.print("Katalog jest pusty")
+                    return
+                # Wzorzec bez dopasowań to błąd (jak w DOS)
+                self.print("Nie znaleziono pliku")
+                return 1
+
+            for entry in entries:
+                if entry.is_dir():
+                    self.print(f"<DIR>     {entry.name}")
+                else:
+                    size = entry.stat().st_size
+                    self.print(f"{size:>8} {entry.name}")
+        except Exception as e:
+            self.print(f"Błąd: {e}")
+            return 1
+
+    def change_directory(self, args):
+        if not args:
+            self.print(str(self.current_dir))
+            return
+
+        # Jak w DOS: cd Moje pliki działa także bez cudzysłowu
+        target = " ".join(args)
+        if target == "..":
+            if self.current_dir != self.disk_c:
+                self.current_dir = self.current_dir.parent
+        else:
+            new_path = self.resolve_path(target)
+            if new_path.exists() and new_path.is_dir():
+                self.current_dir = new_path
+            else:
+                self.print(f"Katalog nie istnieje: {target}")
+                return 1
+
+        self.output.directory_changed(self.current_dir)
+
+    def for_each_target(self, args, usage, action):
+        """Wykonaj action(nazwa) dla każdego argumentu; błędy nie przerywają pętli"""
+        if not args:
+            self.print(usage)
+            return 1
+
+        code = 0
+        for name in args:
+            try:
+                action(name)
+            except Exception as e:
+                self.print(f"Błąd: {e}")
+                code = 1
+        return code
+
+    def make_directory(self, args):
+        def make(name):
+            self.resolve_path(name).mkdir()
+            self.print(f"Utworzono katalog: {name}")
+        return self.for_each_target(args, "Użycie: mkdir <nazwa...>", make)
+
+    def remove_directory(self, args):
+        switches, names = self.split_switches(args)
+        if '/s' not in switches:
+            def remove(name):
+                self.resolve_path(name).rmdir()
+                self.print(f"Usunięto katalog: {name}")
+            return self.for_each_target(names, "Użycie: rmdir [/s] <nazwa...>", remove)
+
+        if not names:
+            self.print("Użycie: rmdir [/s] <nazwa...>")
+            return 1
+        # rmdir /s: najpierw pliki (masowo), potem katalogi od najgłębszych
+        files = []
+        dirs = []
+        code = 0
+        for name in names:
+            root = self.resolve_path(name)
+            try:
+                tree_files, tree_dirs = walk_tree(root)
+            except OSError as e:
+                self.print(f"Błąd: {e}")
+                code = 1
+                continue
+            files.extend(root / path for path in tree_files)
+            dirs.extend(root / path for path in reversed(tree_dirs))
+            dirs.append(root)
+
+        def remove_dirs():
+            for path in dirs:
+                path.rmdir()
+        return self.bulk_operation("Usunięto plików", files, remove_path, switches,
+                                   finish=remove_dirs, preview=dirs) or code
+
+    def delete_file(self, args):
+        switches, names = self.split_switches(args)
+        if not names:
+            self.print("Użycie: del [/l] <plik...>")
+            return 1
+        paths = self.expand_targets(names, files_only=True)
+        if paths is None:
+            return 1
+        return self.bulk_operation("Usunięto plików", paths, remove_path, switches,
+                                   describe=lambda path: f"Usunięto plik: {self.display_path(path)}")
+
+    def show_file_content(self, args):
+        def show(name):
+            self.print(self.resolve_path(name).read_text(encoding='utf-8'))
+        return self.for_each_target(args, "Użycie: type <plik...>", show)
+
+    def split_switches(self, args):
+        """Oddziel przełączniki (/s, /l...) od nazw"""
+        switches = {arg.lower() for arg in args if arg.startswith('/')}
+        return switches, [arg for arg in args if not arg.startswith('/')]
+
+    def display_path(self, path):
+        try:
+            return str(path.relative_to(self.current_dir))
+        except ValueError:
+            return str(path)
+
+    def expand_targets(self, names, files_only=False):
+        """Nazwy ze wzorcami jako lista ścieżek (jeden skan katalogu na wzorzec)
+
+        None przy błędzie albo gdy żaden wzorzec niczego nie znalazł.
+        """
+        paths = []
+        unmatched = False
+        for name in names:
+            path = self.resolve_path(name)
+            if not has_wildcards(path.name):
+                paths.append(path)
+                continue
+            try:
+                entries = match_entries(path.parent, path.name)
+            except OSError as e:
+                self.print(f"Błąd: {e}")
+                return None
+            if files_only:
+                entries = [entry for entry in entries if not entry.is_dir(follow_symlinks=False)]
+            if not entries:
+                self.print(f"Nie znaleziono pliku: {name}")
+                unmatched = True
+            paths.extend(path.parent / entry.name for entry in entries)
+        if unmatched and not paths:
+            return None
+        return paths
+
+    def bulk_operation(self, label, items, action, switches, describe=None, finish=None, preview=(),
+                       sizes=None):
+        """Wykonaj action dla wielu elementów
+
+        /l tylko wypisuje elementy. Duże operacje działają w tle na puli
+        wątków i co jakiś czas raportują postęp; finish() wołane jest na końcu.
+        sizes (bajty elementów) pozwala dzielić pracę także według rozmiaru.
+        """
+        if '/l' in switches:
+            for item in list(items) + list(preview):
+                self.print(self.display_path(item[0] if isinstance(item, tuple) else item))
+            self.print(f"{label} (podgląd /l, bez zmian): {len(items)}")
+            return 0
+
+        output = self.output
+
+        def work():
+            if len(items) >= BACKGROUND_THRESHOLD:
+                output.write(f"Operacja na {len(items)} plikach...")
+            errors = run_bulk(items, action, lambda done, total: output.write(f"  {done}/{total}"), sizes)
+            failed = {id(item) for item, error in errors}
+            if describe and len(items) < BACKGROUND_THRESHOLD:
+                for item in items:
+                    if id(item) not in failed:
+                        output.write(describe(item))
+            for item, error in errors[:MAX_REPORTED_ERRORS]:
+                output.write(f"Błąd: {error}")
+            if len(errors) > MAX_REPORTED_ERRORS:
+                output.write(f"... i {len(errors) - MAX_REPORTED_ERRORS} innych błędów")
+            if finish:
+                try:
+                    finish()
+                except OSError as e:
+                    output.write(f"Błąd: {e}")
+                    return 1
+            if not describe or len(items) >= BACKGROUND_THRESHOLD:
+                output.write(f"{label}: {len(items) - len(errors)}")
+            return 1 if errors else 0
+
+        if len(items) < BACKGROUND_THRESHOLD and sum(sizes or ()) < BACKGROUND_BYTES:
+            return work()
+        return self.start_job(work)
+
+    def copy_operation(self, pairs, switches):
+        """copy/xcopy: /v - weryfikacja kopii, /z - wznowienie (pomija skopiowane pliki)"""
+        try:
+            pairs, sizes, skipped = plan_copies(pairs, resume='/z' in switches)
+        except OSError as e:
+            self.print(f"Błąd: {e}")
+            return 1
+        if skipped:
+            self.print(f"Pominięto już skopiowane: {skipped}")
+        verify = '/v' in switches
+        return self.bulk_operation("Skopiowano plików", pairs, lambda pair: copy_file(*pair, verify=verify),
+                                   switches, sizes=sizes)
+
+    def transfer_pairs(self, names, files_only):
+        """Źródła (ze wzorcami) i cel jako pary (źródło, cel) dla copy/move"""
+        *sources, target = names
+        destination = self.resolve_path(target)
+        paths = self.expand_targets(sources, files_only)
+        if paths is None:
+            return None
+        into_directory = destination.is_dir() or target.endswith(('\\', '/'))
+        if (len(paths) > 1 or len(sources) > 1) and not into_directory:
+            self.print(f"Cel musi być katalogiem: {target}")
+            return None
+        return [(path, destination / path.name if into_directory else destination) for path in paths]
+
+    def copy_files(self, args):
+        """copy [/l /v /z] <plik...> <cel>"""
+        switches, names = self.split_switches(args)
+        if len(names) < 2:
+            self.print("Użycie: copy [/l /v /z] <plik...> <cel>")
+            return 1
+        pairs = self.transfer_pairs(names, files_only=True)
+        if pairs is None:
+            return 1
+        return self.copy_operation(pairs, switches)
+
+    def move_files(self, args):
+        """move [/l] <plik...> <cel>"""
+        switches, names = self.split_switches(args)
+        if len(names) < 2:
+            self.print("Użycie: move [/l] <plik...> <cel>")
+            return 1
+        pairs = self.transfer_pairs(names, files_only=False)
+        if pairs is None:
+            return 1
+        return self.bulk_operation("Przeniesiono", pairs, lambda pair: move_path(*pair), switches)
+
+    def xcopy_tree(self, args):
+        """xcopy <katalog|wzorzec> <cel> [/s] [/e] [/l] [/v] [/z]"""
+        switches, names = self.split_switches(args)
+        if len(names) != 2:
+            self.print("Użycie: xcopy <źródło> <cel> [/s] [/e] [/l] [/v] [/z]")
+            return 1
+
+        source = self.resolve_path(names[0])
+        destination = self.resolve_path(names[1])
+        if source.is_dir():
+            root, pattern = source, '*'
+        else:
+            root, pattern = source.parent, source.name
+        recursive = '/s' in switches or '/e' in switches
+        try:
+            files, dirs = walk_tree(root, pattern, include_dirs=recursive)
+        except OSError as e:
+            self.print(f"Błąd: {e}")
+            return 1
+
+        # /s: katalogi z plikami, /e: także puste
+        if '/e' not in switches:
+            dirs = sorted({os.path.dirname(path) for path in files} - {''})
+        pairs = [(root / path, destination / path) for path in files]
+
+        def make_dirs():
+            destination.mkdir(parents=True, exist_ok=True)
+            for path in dirs:
+                (destination / path).mkdir(parents=True, exist_ok=True)
+
+        if '/l' not in switches:
+            try:
+                make_dirs()
+            except OSError as e:
+                self.print(f"Błąd: {e}")
+                return 1
+        return self.copy_operation(pairs, switches)
+
+    def echo_text(self, args):
+        # Surowy tekst: echo zachowuje cudzysłowy i odstępy (jak w DOS)
+        self.print(getattr(args, 'text', " ".join(args)))
+        # echo nie zmienia errorlevel (jak w DOS)
+        return self.errorlevel
+
+    def open_input(self, name, args):
+        """Wejście filtra: plik z argumentów albo potok"""
+        if args:
+            return open(self.resolve_path(args[0]), 'r', encoding='utf-8', errors='replace')
+        if self.stdin is None:
+            self.print(f"{name}: brak danych wejściowych (podaj plik lub użyj potoku)")
+        return self.stdin
+
+    def find_text(self, args):
+        """find [/i] [/v] [/c] "tekst" [plik]"""
+        switches = {arg.lower() for arg in args if arg.startswith('/')}
+        args = [arg for arg in args if not arg.startswith('/')]
+        if not args:
+            self.print('Użycie: find [/i] [/v] [/c] "tekst" [plik]')
+            return 1
+
+        needle = args[0]
+        ignore_case = '/i' in switches
+        invert = '/v' in switches
+        if ignore_case:
+            needle = needle.lower()
+
+        try:
+            stream = self.open_input('find', args[1:])
+            if stream is None:
+                return 1
+            count = 0
+            # Linia po linii: w potoku dane nie są trzymane w pamięci
+            for line in stream:
+                line = line.rstrip('\n')
+                found = needle in (line.lower() if ignore_case else line)
+                if found != invert:
+                    count += 1
+                    if '/c' not in switches:
+                        self.print(line)
+            if args[1:]:
+                stream.close()
+        except OSError as e:
+            self.print(f"Błąd: {e}")
+            return 1
+        if '/c' in switches:
+            self.print(str(count))
+        # Jak w DOS: 1 gdy nic nie znaleziono
+        return 0 if count else 1
+
+    def sort_lines(self, args):
+        """sort [/r] [plik]"""
+        reverse = any(arg.lower() == '/r' for arg in args)
+        args = [arg for arg in args if not arg.startswith('/')]
+        try:
+            stream = self.open_input('sort', args)
+            if stream is None:
+                return 1
+            lines = [line.rstrip('\n') for line in stream]
+            if args:
+                stream.close()
+        except OSError as e:
+            self.print(f"Błąd: {e}")
+            return 1
+        for line in sorted(lines, key=str.lower, reverse=reverse):
+            self.print(line)
+
+    def clear_terminal(self, args=None):
+        self.output.clear()
+
+    def interrupt_process(self, args=None):
+        """Przerwij działający proces Python"""
+        if self.current_process and self.current_process.poll() is None:
+            try:
+                self.current_process.terminate()
+                self.print("\n⚠️  Program przerwany przez użytkownika")
+                self.current_process = None
+            except:
+                try:
+                    self.current_process.kill()
+                    self.print("\n⚠️  Program wymuszenie zakończony")
+                    self.current_process = None
+                except:
+                    self.print("\n❌ Nie można przerwać programu")
+                    return 1
+        else:
+            self.print("Brak działającego programu do przerwania")
+            return 1
+
+    def run_python_command(self, args):
+        if not args:
+            self.print("Użycie: python <plik.py>")
+            return 1
+
+        script_path = self.resolve_path(args[0])
+        if not script_path.exists():
+            self.print(f"Plik nie istnieje: {args[0]}")
+            return 1
+
+        try:
+            self.print(f"🐍 Uruchamiam {args[0]}... (Ctrl+C lub STOP aby przerwać)")
+
+            interactive = self.interactive_input
+            process = self.spawn_python(script_path, args[1:], subprocess.PIPE if interactive else None,
+                                        use_pty=interactive)
+            self.run_foreground(process, args[0])
+
+        except Exception as e:
+            self.print(f"Błąd uruchamiania: {e}")
+            return 1
+
+    def run_foreground(self, process, name, on_finished=None):
+        """Program na pierwszym planie: wyjście do terminala, kod w job_codes"""
+        self.current_process = process
+        # Wyjście tam, gdzie komenda (np. do skryptu wsadowego)
+        output = self.output
+        timeout = self.program_timeout()
+
+        def finished(watch):
+            if watch.usage:
+                output.write(format_usage(watch.usage))
+            if watch.timed_out:
+                self.job_codes[watch] = 1
+                output.write(f"⏰ Program przerwany - przekroczono limit czasu ({PROGRAM_TIMEOUT}s)")
+            elif watch.returncode != 0:
+                self.job_codes[watch] = watch.returncode
+                output.write(f"Program zakończony z kodem: {watch.returncode}")
+            else:
+                self.job_codes[watch] = 0
+                output.write("✅ Program zakończony pomyślnie")
+            if on_finished is not None:
+                on_finished(watch)
+            if self.current_process is process:
+                self.current_process = None
+
+        # Wyjście i koniec programu obsługuje wspólny wątek pętli procesów
+        self.job_thread = self.watch_program(process, output, finished, timeout, name)
+
+    def program_timeout(self):
+        """Limit czasu programu - tylko gdy nikt nie może mu odpowiedzieć (None: bez limitu)"""
+        stdin_tty = sys.stdin is not None and sys.stdin.isatty()
+        return None if self.interactive_input or stdin_tty else PROGRAM_TIMEOUT
+
+    def spawn_python(self, script_path, args, stdin, use_pty=False, stdout=None):
+        """Uruchom skrypt; -u: wyjście bez buforowania, od razu w terminalu
+
+        stdout - deskryptor wyjścia (etap potoku); None - wyjście do pętli procesów.
+        """
+        use_pty = use_pty and self.use_pty and PTY_SUPPORTED
+        if self.worker_pool is not None:
+            terminal = open_terminal() if use_pty else None
+            try:
+                process = self.worker_pool.run(script_path, args, stdin, terminal,
+                                               terminal_variables() if use_pty else None,
+                                               self.bytecode.lookup(script_path), stdout)
+            except OSError:
+                process = None
+            if process is not None:
+                return process
+            if terminal is not None:
+                for fd in terminal:
+                    os.close(fd)
+
+        return self.spawn_command(self.python_command(script_path, args), script_path.parent, stdin, use_pty, stdout)
+
+    def spawn_command(self, command, cwd, stdin, use_pty=False, stdout=None):
+        """Nowy proces interpretera z wyjściem do pętli procesów (albo do stdout)"""
+        env = dict(os.environ, PYTHONUNBUFFERED='1')
+        if use_pty and self.use_pty and PTY_SUPPORTED:
+            # Pseudoterminal: isatty() w programie, paski postępu, kolory
+            return PtyProcess(command, cwd=str(cwd), env=env)
+        return subprocess.Popen(
+            command,
+            stdin=stdin,
+            stdout=stdout if stdout is not None else subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=str(cwd),
+            env=env,
+        )
+
+    def profile_program(self, args):
+        """profile [/s] [/n:liczba] <plik.py> - skrypt pod cProfile albo z próbkowaniem stosu"""
+        usage = "Użycie: profile [/s] [/n:liczba] <plik.py> [argumenty]"
+        sampling = False
+        top = TOP_FUNCTIONS
+        args = list(args)
+        # Przełączniki tylko przed nazwą skryptu (dalej są argumenty skryptu)
+        while args and args[0].startswith('/'):
+            switch = args.pop(0).lower()
+            if switch == '/s':
+                sampling = True
+            elif switch.startswith('/n:') and switch[3:].isdigit() and int(switch[3:]) > 0:
+                top = int(switch[3:])
+            else:
+                self.print(usage)
+                return 1
+        if not args:
+            self.print(usage)
+            return 1
+
+        script_path = self.resolve_path(args[0])
+        if not script_path.exists():
+            self.print(f"Plik nie istnieje: {args[0]}")
+            return 1
+        profile_path = self.current_dir / (script_path.stem + ('.collapsed' if sampling else '.pstats'))
+        command = [sys.executable, '-u', PROFILE_RUNNER, '--sample' if sampling else '--profile',
+                   str(profile_path), str(top), script_path.name] + args[1:]
+
+        try:
+            # Stary profil jest i tak nadpisywany; jego brak po końcu to błąd skryptu
+            profile_path.unlink(missing_ok=True)
+            self.print(f"📊 Profiluję {args[0]}... (Ctrl+C lub STOP aby przerwać)")
+            interactive = self.interactive_input
+            process = self.spawn_command(command, script_path.parent, subprocess.PIPE if interactive else None,
+                                         use_pty=interactive)
+        except OSError as e:
+            self.print(f"Błąd uruchamiania: {e}")
+            return 1
+
+        output = self.output
+
+        def finished(watch):
+            if profile_path.exists():
+                output.write(f"Profil zapisany: {self.display_path(profile_path)}")
+
+        self.run_foreground(process, args[0], finished)
+        return 0
+
+    def python_command(self, script_path, args):
+        """Linia komend interpretera; skompilowany kod z pamięci podręcznej, gdy jest"""
+        code_path = self.bytecode.lookup(script_path)
+        if code_path is None:
+            return [sys.executable, '-u', script_path.name] + list(args)
+        return [sys.executable, '-u', BYTECODE_RUNNER, '--run', str(code_path), script_path.name] + list(args)
+
+    def configure_workers(self, args):
+        """workers [on [liczba] | off] - pula rozgrzanych interpreterów dla python"""
+        if args:
+            mode = args[0].lower()
+            if mode == 'off':
+                if self.worker_pool is not None:
+                    self.worker_pool.close()
+                    self.worker_pool = None
+            elif mode == 'on':
+                if not WORKERS_SUPPORTED:
+                    self.print("Pula interpreterów nie jest dostępna w tym systemie")
+                    return 1
+                try:
+                    size = int(args[1]) if len(args) > 1 else POOL_SIZE
+                except ValueError:
+                    self.print("Użycie: workers [on [liczba] | off]")
+                    return 1
+                if self.worker_pool is not None:
+                    self.worker_pool.close()
+                self.worker_pool = WorkerPool(max(1, size))
+            else:
+                self.print("Użycie: workers [on [liczba] | off]")
+                return 1
+
+        pool = self.worker_pool
+        if pool is None:
+            self.print("Pula interpreterów: wyłączona")
+        else:
+            self.print(f"Pula interpreterów: {pool.size} procesów, czeka: {len(pool.idle)}, "
+                       f"skryptów: {pool.runs}, wymienionych procesów: {pool.recycled}")
+        return 0
+
+    def watch_program(self, process, output, finished, timeout=None, name=None, outputs=None):
+        """Przekazuj wyjście programu do output; finished(watch) po jego końcu
+
+        outputs - własne pary (strumień, zapis) zamiast wyjścia na output bez zmian.
+        """
+        ended_line = [True]
+
+        def write(text):
+            output.write_raw(text)
+            ended_line[0] = text.endswith('\n')
+
+        def done(watch):
+            # Komunikaty powłoki zawsze od nowej linii ("Podaj liczbę: " bez \n)
+            if not ended_line[0]:
+                output.write_raw('\n')
+            log_event('job_exit', pid=process.pid, name=name, code=watch.returncode, timed_out=watch.timed_out,
+                      duration_ms=round((time.monotonic() - watch.started) * 1000, 1), usage=watch.usage)
+            finished(watch)
+
+        if outputs is None:
+            outputs = [(stream, write) for stream in (process.stdout, process.stderr) if stream is not None]
+        watch = self.process_loop.watch(process, outputs, done, timeout, name)
+        log_event('job_start', pid=process.pid, name=name, pool=not isinstance(process, subprocess.Popen))
+        if not isinstance(process, subprocess.Popen):
+            # Proces z puli: liczniki /proc od początku tego skryptu
+            watch.baseline = read_process(process.pid)
+        return watch
+
+    def start_program(self, args):
+        """start python <plik.py> - program w tle, bez czekania na koniec"""
+        if len(args) < 2 or args[0].lower() != 'python':
+            self.print("Użycie: start python <plik.py> [argumenty]")
+            return 1
+        script_path = self.resolve_path(args[1])
+        if not script_path.exists():
+            self.print(f"Plik nie istnieje: {args[1]}")
+            return 1
+        try:
+            process = self.spawn_python(script_path, args[2:], subprocess.DEVNULL)
+        except OSError as e:
+            self.print(f"Błąd uruchamiania: {e}")
+            return 1
+
+        self.last_job += 1
+        number = self.last_job
+        output = self.output
+
+        def finished(watch):
+            self.background_jobs.pop(number, None)
+            output.write(f"[{number}] {args[1]} zakończony z kodem {watch.returncode}")
+            if watch.usage:
+                output.write(f"[{number}] {format_usage(watch.usage)}")
+
+        self.background_jobs[number] = (args[1], process)
+        self.watch_program(process, output, finished, name=f"[{number}] {args[1]}")
+        self.print(f"[{number}] {process.pid} {args[1]}")
+        return 0
+
+    def list_processes(self, args=None):
+        """ps - programy obsługiwane przez powłokę i zużycie ich zasobów"""
+        watches = self.process_loop.running()
+        if not watches:
+            self.print("Brak działających programów")
+            return 0
+        if not PROC_SUPPORTED:
+            for watch in watches:
+                self.print(f"{watch.process.pid:>7}  {watch.name}")
+            return 0
+        for line in format_table(self.monitor.sample(watches)):
+            self.print(line)
+        return 0
+
+    def show_top(self, args=None):
+        """top [sekundy] - odświeżany widok programów (zakładka Procesy w GUI)"""
+        if args:
+            try:
+                interval = float(args[0].replace(',', '.'))
+            except ValueError:
+                interval = 0
+            if interval <= 0:
+                self.print("Użycie: top [sekundy]")
+                return 1
+            self.monitor.interval = interval
+        if not self.output.show_processes():
+            # Wyjście bez odświeżanego widoku (tryb tekstowy): jedna próbka jak ps
+            return self.list_processes()
+        return 0
+
+    def show_stats(self, args=None):
+        """stats [on | off | reset | json [plik] | prometheus [plik]] - pomiary KocurDOS"""
+        mode = args[0].lower() if args else ''
+        if mode in ('on', 'off'):
+            metrics.enabled = mode == 'on'
+            self.print(f"Pomiary: {'włączone' if metrics.enabled else 'wyłączone'}")
+            return 0
+        if mode == 'reset':
+            metrics.reset()
+            return 0
+        if mode in ('json', 'prometheus'):
+            text = metrics.to_json() + '\n' if mode == 'json' else metrics.to_prometheus()
+            if len(args) > 1:
+                path = self.resolve_path(args[1])
+                try:
+                    atomic_write(path, [text])
+                except OSError as e:
+                    self.print(f"Błąd: {e}")
+                    return 1
+                self.print(f"Zapisano: {self.display_path(path)}")
+            else:
+                for line in text.rstrip('\n').split('\n'):
+                    self.print(line)
+            return 0
+        if mode:
+            self.print("Użycie: stats [on | off | reset | json [plik] | prometheus [plik]]")
+            return 1
+
+        rows = metrics.rows()
+        if not metrics.enabled and not rows:
+            self.print("Pomiary wyłączone (stats on, zmienna KOCURDOS_METRICS=1 albo --metrics)")
+            return 0
+        for line in format_rows(rows):
+            self.print(line)
+        return 0
+
+    def accepts_input(self):
+        """Czy działa program czekający na wejście z pola komendy"""
+        process = self.current_process
+        # returncode ustawia pętla procesów (poll() odebrałby proces przed jej wait4)
+        return (process is not None and process.stdin is not None
+                and not process.stdin.closed and process.returncode is None)
+
+    def send_input(self, text):
+        """Przekaż linię tekstu na wejście działającego programu"""
+        process = self.current_process
+        if not self.accepts_input():
+            return False
+        try:
+            process.stdin.write((text + '\n').encode('utf-8'))
+            process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            # Program zamknął wejście albo właśnie się kończy
+            pass
+        return True
+
+    def close_input(self):
+        """Koniec danych (Ctrl+D) dla działającego programu"""
+        if self.accepts_input():
+            try:
+                self.current_process.stdin.close()
+            except OSError:
+                pass
+
+    def set_variable(self, args):
+        """set, set NAZWA, set NAZWA=wartość"""
+        if not args:
+            for name, value in sorted(self.variables.items()):
+                self.print(f"{name}={value}")
+            return 0
+
+        text = getattr(args, 'text', " ".join(args))
+        if len(text) > 1 and text[0] == text[-1] == '"':
+            # set "NAZWA=wartość"
+            text = text[1:-1]
+        if '=' not in text:
+            name = text.upper()
+            if name not in self.variables:
+                self.print(f"Zmienna nie jest zdefiniowana: {text}")
+                return 1
+            self.print(f"{name}={self.variables[name]}")
+            return 0
+
+        name, value = text.split('=', 1)
+        name = name.strip().upper()
+        if value:
+            self.variables[name] = value
+        else:
+            self.variables.pop(name, None)
+        return 0
+
+    def call_script(self, args):
+        """Uruchom skrypt wsadowy (.kbat)"""
+        if not args:
+            self.print("Użycie: call <skrypt.kbat> [argumenty]")
+            return 1
+
+        script_path = self.resolve_path(args[0])
+        if not script_path.exists():
+            self.print(f"Plik nie istnieje: {args[0]}")
+            return 1
+
+        def work():
+            try:
+                return run_script(self, script_path, args)
+            except (BatchError, OSError) as e:
+                self.print(f"Błąd skryptu: {e}")
+                return 1
+
+        if in_batch(self) or self.stdin is not None or hasattr(self.local, 'output'):
+            # call ze skryptu albo z potoku: wątek i tak nie jest wątkiem Tk
+            return work()
+        # Skrypt czeka na swoje programy - w tle jak python, wyjście płynie na bieżąco
+        output = self.output
+
+        def job():
+            with self.redirected(output):
+                return work()
+
+        return self.start_job(job)
+
+    def wait_for_job(self):
+        """Poczekaj na zakończenie programu uruchomionego w tle; zwraca jego kod"""
+        job = self.job_thread
+        if job is None:
+            return self.errorlevel
+        job.join()
+        # Zakończone zadanie nie zostaje: następny krok nie odczyta starego kodu
+        self.job_thread = None
+        return self.job_codes.pop(job, 0)
+
+
+# Ile ostatnich komend trafia do readline w trybie bez GUI
+READLINE_HISTORY = 1000
+
+
+def setup_readline(shell, history):
+    """Strzałki, Ctrl+R i Tab w terminalu (readline) z historią KocurDOS"""
+    try:
+        import readline
+    except ImportError:
+        return
+
+    # Całą linię do kursora dostaje Completer, który sam wybiera słowo
+    completer = Completer(shell)
+    state = {}
+
+    def complete(text, index):
+        if index == 0:
+            line = readline.get_line_buffer()[:readline.get_endidx()]
+            completion = completer.start(line)
+            matches = [completion.head + candidate for candidate in completion.candidates] if completion else []
+            # readline skraca do wspólnego początku z rozróżnianiem wielkości liter
+            # (mógłby skasować wpisany tekst), więc kandydaci zgodni z wpisanym
+            # tekstem mają pierwszeństwo, a niezgodni tylko gdy jest jeden
+            exact = [match for match in matches if match.startswith(line)]
+            state['matches'] = exact or (matches if len(matches) == 1 else [])
+        matches = state.get('matches', [])
+        return matches[index] if index < len(matches) else None
+
+    readline.set_completer_delims('')
+    readline.set_completer(complete)
+    readline.parse_and_bind('tab: complete')
+
+    recent = []
+    while len(recent) < READLINE_HISTORY:
+        command = history.entry(len(recent) + 1)
+        if command is None:
+            break
+        recent.append(command)
+    for command in reversed(recent):
+        readline.add_history(command)
+
+
+def run_repl(shell, output, history=None):
+    """Pętla komend na stdin/stdout"""
+    output.write(f"KocurDOS v{shell.VERSION} (tryb bez GUI)")
+    output.write("Witaj w KocurDOS! Wpisz 'help' aby zobaczyć dostępne komendy.")
+    if history is not None and sys.stdin.isatty():
+        setup_readline(shell, history)
+    while not output.exit_requested:
+        output.flush()
+        try:
+            command = input(f"{shell.prompt} ").strip()
+        except EOFError:
+            break
+        except KeyboardInterrupt:
+            output.write("")
+            continue
+
+        if history is not None:
+            history.add(command)
+        try:
+            shell.process_command(command)
+            shell.errorlevel = shell.wait_for_job()
+        except KeyboardInterrupt:
+            shell.interrupt_process()
+            shell.wait_for_job()
+    output.flush()
+    return 0
+
+
+def run_batch_file(shell, output, argv):
+    """Tryb --run: wykonaj skrypt i zakończ z jego errorlevel"""
+    if not argv:
+        output.write("Użycie: kocur_dos.py --run <skrypt.kbat> [argumenty]")
+        output.flush()
+        return 1
+    try:
+        # Ścieżka jak w call: względem dysku C (C:\skrypty\a.kbat, skrypty\a.kbat),
+        # tak samo jak ścieżki komend w skrypcie; ścieżka bezwzględna systemu też działa
+        code = run_script(shell, shell.resolve_path(argv[0]), argv)
+    except (BatchError, OSError) as e:
+        output.write(f"Błąd skryptu: {e}")
+        code = 1
+    output.flush()
+    return code
+
+
+def main(argv=None):
+    """Punkt wejścia trybu bez GUI: --headless (REPL) lub --run <skrypt.kbat>"""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if '--metrics' in argv:
+        metrics.enabled = True
+    output = StdoutOutput()
+    shell = KocurShell("KocurDOS-diskC", output)
+    listener = start_logging(shell.disk_c / ".kocurdos" / "logs")
+    log_event('session_start', version=shell.VERSION, mode='run' if '--run' in argv else 'headless')
+    try:
+        if '--run' in argv:
+            return run_batch_file(shell, output, argv[argv.index('--run') + 1:])
+        return run_repl(shell, output, CommandHistory(shell.disk_c / ".kocurdos" / "history"))
+    finally:
+        log_event('session_end')
+        listener.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - dokumenty edytora
+Nieaktywne dokumenty nie zajmują widgetu Text: ich treść trzymana jest
+w skompresowanym buforze w pamięci, w pliku tymczasowym albo tylko na dysku
+"""
+
+import os
+import tempfile
+import uuid
+import zlib
+from pathlib import Path
+
+from kocur_journal import EditJournal
+
+# Skompresowane bufory większe niż ten próg trafiają do pliku tymczasowego
+SPILL_THRESHOLD = 4 * 1024 * 1024
+
+
+class CompactBuffer:
+    """Tekst skompresowany zlib (w pamięci lub w pliku tymczasowym)"""
+
+    def __init__(self, text, spill_dir=None):
+        data = zlib.compress(text.encode('utf-8'), 1)
+        self.path = None
+        self.data = None
+        if spill_dir and len(data) > SPILL_THRESHOLD:
+            os.makedirs(spill_dir, exist_ok=True)
+            fd, self.path = tempfile.mkstemp(suffix=".buf", dir=spill_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+        else:
+            self.data = data
+
+    def text(self):
+        """Zwróć rozpakowany tekst"""
+        data = self.data
+        if data is None:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        return zlib.decompress(data).decode('utf-8')
+
+    def release(self):
+        """Zwolnij bufor (usuń plik tymczasowy)"""
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        self.path = None
+        self.data = None
+
+
+class Document:
+    """Dokument edytora: plik, stan modyfikacji, dziennik i bufor nieaktywnej treści"""
+
+    def __init__(self, journal_dir, file_path=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.file_path = str(file_path) if file_path else None
+        self.journal = EditJournal(os.path.join(str(journal_dir), f"{self.id}.journal"))
+        self.buffer = None
+        self.tab = None
+        self.cursor = '1.0'
+        self.yview = 0.0
+        # Licznik zmian; dokument jest zmodyfikowany, gdy różni się od zapisanego
+        self.version = 0
+        self.saved_version = 0
+
+    @property
+    def modified(self):
+        return self.version != self.saved_version
+
+    @property
+    def title(self):
+        name = Path(self.file_path).name if self.file_path else "Nowy"
+        return f"*{name}" if self.modified else name
+
+    def store(self, text, spill_dir=None):
+        """Schowaj treść nieaktywnego dokumentu do zwartego bufora"""
+        self.release_buffer()
+        self.buffer = CompactBuffer(text, spill_dir)
+
+    def take_text(self):
+        """Pobierz treść z bufora i zwolnij go (None gdy bufora nie ma)"""
+        if self.buffer is None:
+            return None
+        text = self.buffer.text()
+        self.release_buffer()
+        return text
+
+    def release_buffer(self):
+        if self.buffer is not None:
+            self.buffer.release()
+            self.buffer = None
+
+    def close(self):
+        """Zamknij dokument: usuń bufor i dziennik"""
+        self.release_buffer()
+        self.journal.stop()
@@ -7,6 +7,13 @@ Wersja: 1.0.0
 import os
 import sys
 import json
+import logging
+
+# Tryb bez GUI (serwery, skrypty --run): sama powłoka, bez importu tkinter
+if __name__ == "__main__" and ("--headless" in sys.argv or "--run" in sys.argv):
+    from kocur_core import main
+    sys.exit(main(sys.argv[1:]))
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext, simpledialog
 import subprocess
@@ -16,10 +23,94 @@ from pathlib import Path
 import shutil
 import time
 import signal
+import queue
+
+from kocur_fileio import (LARGE_FILE_THRESHOLD, PREVIEW_THRESHOLD, SLICE_LINES,
+                          ChunkReader, atomic_write, file_size, iter_text_chunks)
+from kocur_complete import Completer
+from kocur_ansi import CONTROL_CHARS, AnsiParser, tag_style
+from kocur_core import KocurShell, ShellOutput
+from kocur_documents import Document
+from kocur_highlight import EditorHighlighter
+from kocur_history import CommandHistory, ReverseSearch
+from kocur_journal import journal_matches_file, replay_journal
+from kocur_log import log_event, start_logging
+from kocur_metrics import metrics
+from kocur_procstat import PROC_SUPPORTED, format_size
+from kocur_pty import PTY_SUPPORTED
+from kocur_session import SCROLLBACK_LINES, SessionStore
+from kocur_textwatch import TextChangeTracker
+from kocur_watchdog import HEARTBEAT_INTERVAL, STALL_THRESHOLD, LoopWatchdog
+
+class TerminalOutput(ShellOutput):
+    """Wyjście powłoki do zakładki Terminal
+    
+    Wątki robocze (programy, skrypty, operacje w tle) nie dotykają Tk: ich
+    tekst i polecenia (cls, cd, top, exit) trafiają do kolejki, którą pętla
+    Tk opróżnia co OUTPUT_POLL ms.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self.main_thread = threading.current_thread()
+        self.pending = queue.Queue()
+        self.exit_requested = False
+        
+    def write(self, text):
+        self.write_raw(text + '\n')
+        
+    def write_raw(self, text):
+        self.call(self.app.insert_terminal_text, text)
+            
+    def call(self, function, *args):
+        """Wykonaj function(*args) w wątku Tk (z innego wątku - przez kolejkę)"""
+        if threading.current_thread() is self.main_thread:
+            # Najpierw to, co czeka w kolejce - zachowuje kolejność
+            self.drain()
+            function(*args)
+        else:
+            self.pending.put((function, args))
+            
+    def drain(self):
+        """Wstaw do terminala tekst z kolejki (kolejne fragmenty jednym wywołaniem)"""
+        chunks = []
+        while True:
+            try:
+                function, args = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            if function == self.app.insert_terminal_text:
+                chunks.append(args[0])
+                continue
+            if chunks:
+                self.app.insert_terminal_text(''.join(chunks))
+                chunks = []
+            function(*args)
+        if chunks:
+            self.app.insert_terminal_text(''.join(chunks))
+        
+    def clear(self):
+        self.call(self.app.clear_terminal)
+        
+    def exit(self):
+        self.exit_requested = True
+        self.call(self.app.root.quit)
+        
+    def directory_changed(self, path):
+        self.call(self.app.update_prompt)
+        
+    def show_processes(self):
+        self.call(self.app.show_processes)
+        return True
 
 class KocurDOS:
     VERSION = "1.0.0"
     GITHUB_REPO = "https://api.github.com/repos/kocurowy96/KocurDOS-py"
+    AUTOSAVE_INTERVAL = 1000  # ms
+    OUTPUT_POLL = 15  # ms
+    BYTECODE_SCAN_INTERVAL = 5000  # ms
+    METRICS_REFRESH = 1000  # ms
+    SESSION_SAVE_INTERVAL = 5000  # ms
     
     def __init__(self):
         self.root = tk.Tk()
@@ -27,21 +118,68 @@ class KocurDOS:
         self.root.geometry("1000x700")
         self.root.configure(bg='#000080')
         
-        # Tworzenie głównego folderu systemu
-        self.disk_c = Path("KocurDOS-diskC")
-        self.disk_c.mkdir(exist_ok=True)
-        self.current_dir = self.disk_c
+        # Powłoka (tworzy główny folder systemu)
+        self.terminal = TerminalOutput(self)
+        self.shell = KocurShell("KocurDOS-diskC", self.terminal)
+        self.shell.interactive_input = True
+        self.shell.use_pty = PTY_SUPPORTED
+        self.ansi = AnsiParser()
+        self.ansi_tags = set()
+        self.program_input = False
+        self.disk_c = self.shell.disk_c
+        
+        # Pliki systemowe (dzienniki i bufory edytora itp.)
+        self.system_dir = self.disk_c / ".kocurdos"
+        self.journal_dir = self.system_dir / "journal"
+        self.buffers_dir = self.system_dir / "buffers"
         
-        # Historia komend
-        self.command_history = []
-        self.history_index = -1
+        # Dziennik sesji (JSON lines, zapis w tle) w .kocurdos/logs
+        self.log_listener = start_logging(self.system_dir / "logs")
+        log_event('session_start', version=self.VERSION, mode='gui')
         
-        # Aktualny proces Python
-        self.current_process = None
+        # Historia komend (zapisywana w pliku, Ctrl+R - wyszukiwanie wstecz)
+        self.command_history = CommandHistory(self.system_dir / "history")
+        self.history_index = 0
+        self.history_search = None
+        self.history_draft = ""
+        
+        # Uzupełnianie komend i ścieżek (Tab)
+        self.completer = Completer(self.shell)
+        self.completion = None
+        
+        # Przestoje pętli Tk (zablokowane okno) ze stosem w .kocurdos/stalls.log
+        self.watchdog = LoopWatchdog(self.system_dir / "stalls.log", STALL_THRESHOLD, HEARTBEAT_INTERVAL)
+        
+        # Migawka sesji; zakładki z poprzedniej sesji powstają dopiero przy pierwszym pokazaniu
+        self.session = SessionStore(self.system_dir / "session.json")
+        self.session_restore = self.session.load()
+        self.lazy_tabs = {}
+        self.tab_builders = {
+            "Edytor": self.show_editor,
+            "Explorer": self.show_explorer,
+            "Procesy": self.show_processes,
+            "Metryki": self.show_metrics,
+        }
         
         self.setup_ui()
+        self.restore_session()
+        self.root.after(self.SESSION_SAVE_INTERVAL, self.save_session)
+        self.poll_terminal_output()
+        self.watchdog.start()
+        self.heartbeat()
+        self.root.after(self.BYTECODE_SCAN_INTERVAL, self.scan_scripts)
+        self.recover_editor_journals()
         self.check_for_updates()
         
+    @property
+    def current_dir(self):
+        """Bieżący katalog (wspólny dla powłoki i explorera)"""
+        return self.shell.current_dir
+        
+    @current_dir.setter
+    def current_dir(self, path):
+        self.shell.current_dir = path
+        
     def setup_ui(self):
         # Menu bar
         menubar = tk.Menu(self.root)
@@ -53,6 +191,8 @@ class KocurDOS:
         file_menu.add_command(label="Terminal", command=self.show_terminal)
         file_menu.add_command(label="Edytor", command=self.show_editor)
         file_menu.add_command(label="Explorer", command=self.show_explorer)
+        file_menu.add_command(label="Procesy", command=self.show_processes)
+        file_menu.add_command(label="Metryki", command=self.show_metrics)
         file_menu.add_separator()
         file_menu.add_command(label="Sprawdź aktualizacje", command=self.check_for_updates)
         file_menu.add_command(label="Wyjście", command=self.root.quit)
@@ -60,20 +200,115 @@ class KocurDOS:
         # Notebook dla zakładek
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
         
         # Domyślnie pokazuj terminal
         self.show_terminal()
         
-    def show_terminal(self):
-        # Sprawdź czy zakładka już istnieje
+    def select_existing_tab(self, text):
+        """Przełącz na gotową zakładkę o danej nazwie (False gdy jej nie ma)"""
         for tab_id in self.notebook.tabs():
-            if self.notebook.tab(tab_id, "text") == "Terminal":
+            if self.notebook.tab(tab_id, "text") == text and str(tab_id) not in self.lazy_tabs:
                 self.notebook.select(tab_id)
+                return True
+        return False
+        
+    def add_tab(self, frame, text):
+        """Dodaj zakładkę (w miejsce pustej zakładki z poprzedniej sesji, jeśli jest)"""
+        for tab_id, name in list(self.lazy_tabs.items()):
+            if name == text:
+                del self.lazy_tabs[tab_id]
+                selected = str(self.notebook.select()) == tab_id
+                self.notebook.insert(self.notebook.index(tab_id), frame, text=text)
+                if selected:
+                    self.notebook.select(frame)
+                self.notebook.forget(tab_id)
+                self.root.nametowidget(tab_id).destroy()
                 return
+        self.notebook.add(frame, text=text)
+        
+    def on_tab_changed(self, event):
+        # Pusta zakładka z poprzedniej sesji - zbuduj ją przy pierwszym pokazaniu
+        name = self.lazy_tabs.get(str(self.notebook.select()))
+        if name is not None:
+            self.tab_builders[name]()
+            
+    def restore_session(self):
+        """Katalog, terminal i zakładki z migawki poprzedniej sesji"""
+        state = self.session_restore
+        if not state:
+            return
+            
+        saved_dir = state.get('current_dir')
+        if isinstance(saved_dir, str):
+            path = Path(os.path.normpath(self.disk_c / saved_dir))
+            root = self.disk_c.resolve()
+            resolved = path.resolve()
+            if path.is_dir() and (resolved == root or root in resolved.parents):
+                self.current_dir = path
+                self.update_prompt()
+                
+        scrollback = state.get('scrollback')
+        if isinstance(scrollback, str) and scrollback:
+            widget = self.terminal_output
+            widget.config(state='normal')
+            widget.insert('1.0', scrollback + "\n--- poprzednia sesja ---\n\n")
+            widget.config(state='disabled')
+            widget.see(tk.END)
+            
+        for name in state.get('tabs', []):
+            if name in self.tab_builders:
+                placeholder = ttk.Frame(self.notebook)
+                self.notebook.add(placeholder, text=name)
+                self.lazy_tabs[str(placeholder)] = name
+                
+        for tab_id in self.notebook.tabs():
+            if self.notebook.tab(tab_id, "text") == state.get('selected'):
+                self.notebook.select(tab_id)
+                break
+                
+    def save_session(self):
+        """Co SESSION_SAVE_INTERVAL ms zapisz migawkę (plik tylko gdy stan się zmienił)"""
+        self.snapshot_session()
+        self.session.flush()
+        self.root.after(self.SESSION_SAVE_INTERVAL, self.save_session)
+        
+    def snapshot_session(self):
+        tabs = [self.notebook.tab(tab_id, "text") for tab_id in self.notebook.tabs()]
+        selected = self.notebook.select()
+        self.session.update(
+            current_dir=os.path.relpath(self.current_dir, self.disk_c),
+            tabs=tabs,
+            selected=self.notebook.tab(selected, "text") if selected else None,
+            editor=self.editor_session(),
+            scrollback=self.terminal_output.get(f'end - {SCROLLBACK_LINES + 1} lines', 'end - 1 chars'),
+        )
+        
+    def editor_session(self):
+        """Otwarte pliki edytora z kursorem (niezapisana treść jest w dziennikach)"""
+        if not hasattr(self, 'documents'):
+            # Edytor jeszcze nie zbudowany - stan z poprzedniej sesji bez zmian
+            return self.session_restore.get('editor')
+        documents = []
+        for doc in self.documents:
+            if not doc.file_path:
+                continue
+            cursor, yview = doc.cursor, doc.yview
+            if doc is self.document and not self.file_loading:
+                cursor = self.editor_text.index(tk.INSERT)
+                yview = self.editor_text.yview()[0]
+            documents.append({'path': os.path.abspath(doc.file_path), 'cursor': cursor, 'yview': yview})
+        active = self.document.file_path if self.document else None
+        return {'documents': documents, 'active': os.path.abspath(active) if active else None}
+        
+    def show_terminal(self):
+        # Sprawdź czy zakładka już istnieje
+        if self.select_existing_tab("Terminal"):
+            return
                 
         # Tworzenie zakładki terminala
         terminal_frame = ttk.Frame(self.notebook)
-        self.notebook.add(terminal_frame, text="Terminal")
+        self.add_tab(terminal_frame, "Terminal")
         
         # Output area
         self.terminal_output = scrolledtext.ScrolledText(
@@ -84,6 +319,8 @@ class KocurDOS:
             state='disabled'
         )
         self.terminal_output.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Kursor wyjścia: po \r programy nadpisują bieżącą linię (paski postępu)
+        self.terminal_output.mark_set('output', 'end - 1 chars')
         
         # Input frame
         input_frame = ttk.Frame(terminal_frame)
@@ -100,7 +337,12 @@ class KocurDOS:
         self.command_entry.bind('<Return>', self.execute_command)
         self.command_entry.bind('<Up>', self.history_up)
         self.command_entry.bind('<Down>', self.history_down)
+        self.command_entry.bind('<Control-r>', self.reverse_search)
+        self.command_entry.bind('<Tab>', self.complete_command)
+        self.command_entry.bind('<Escape>', self.cancel_search)
+        self.command_entry.bind('<KeyRelease>', self.update_search)
         self.command_entry.bind('<Control-c>', self.interrupt_process)
+        self.command_entry.bind('<Control-d>', self.close_program_input)
         self.command_entry.focus()
         
         # Stop button
@@ -115,13 +357,11 @@ class KocurDOS:
         
     def show_editor(self):
         # Sprawdź czy zakładka już istnieje
-        for tab_id in self.notebook.tabs():
-            if self.notebook.tab(tab_id, "text") == "Edytor":
-                self.notebook.select(tab_id)
-                return
+        if self.select_existing_tab("Edytor"):
+            return
                 
         editor_frame = ttk.Frame(self.notebook)
-        self.notebook.add(editor_frame, text="Edytor")
+        self.add_tab(editor_frame, "Edytor")
         
         # Toolbar
         toolbar = ttk.Frame(editor_frame)
@@ -130,8 +370,18 @@ class KocurDOS:
         ttk.Button(toolbar, text="Nowy", command=self.new_file).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Otwórz", command=self.open_file).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Zapisz", command=self.save_file).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Zamknij", command=self.close_document).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Uruchom Python", command=self.run_python).pack(side=tk.LEFT, padx=2)
         
+        # Status wczytywania dużych plików
+        self.editor_status = tk.Label(toolbar, text="")
+        self.editor_status.pack(side=tk.LEFT, padx=10)
+        
+        # Zakładki dokumentów (wspólny widget Text pokazuje aktywny dokument)
+        self.doc_tabs = ttk.Notebook(editor_frame)
+        self.doc_tabs.pack(fill=tk.X, padx=5)
+        self.doc_tabs.bind('<<NotebookTabChanged>>', self.on_document_tab_changed)
+        
         # Text area
         self.editor_text = scrolledtext.ScrolledText(
             editor_frame, 
@@ -139,18 +389,38 @@ class KocurDOS:
             wrap=tk.NONE
         )
         self.editor_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.editor_text.bind('<Control-s>', self.save_file)
+        
+        # Śledzenie zmian: podświetlanie składni i dziennik autozapisu
+        self.text_tracker = TextChangeTracker(self.editor_text)
+        self.highlighter = EditorHighlighter(self.editor_text, self.text_tracker)
+        self.highlighter.set_enabled(True)
+        self.text_tracker.add_listener(self.on_editor_changed)
+        self.root.after(self.AUTOSAVE_INTERVAL, self.autosave_tick)
+        
+        self.documents = []
+        self.document = None
+        self.suppress_changes = False
+        self.file_loading = False
+        self.load_generation = 0
+        
+        # Stan zapisu w tle
+        self.save_in_progress = False
+        self.save_pending = []
+        self.save_callbacks = []
         
-        self.current_file = None
+        # Bufory z poprzedniej sesji nie są potrzebne (stan jest w dziennikach)
+        shutil.rmtree(self.buffers_dir, ignore_errors=True)
+        self.new_file()
+        self.restore_documents()
         
     def show_explorer(self):
         # Sprawdź czy zakładka już istnieje
-        for tab_id in self.notebook.tabs():
-            if self.notebook.tab(tab_id, "text") == "Explorer":
-                self.notebook.select(tab_id)
-                return
+        if self.select_existing_tab("Explorer"):
+            return
                 
         explorer_frame = ttk.Frame(self.notebook)
-        self.notebook.add(explorer_frame, text="Explorer")
+        self.add_tab(explorer_frame, "Explorer")
         
         # Toolbar
         toolbar = ttk.Frame(explorer_frame)
@@ -175,25 +445,206 @@ class KocurDOS:
         
         self.refresh_explorer()
         
+    def show_processes(self):
+        """Zakładka Procesy: programy powłoki odświeżane co shell.monitor.interval"""
+        if self.select_existing_tab("Procesy"):
+            self.refresh_processes()
+            return
+                
+        self.process_frame = ttk.Frame(self.notebook)
+        self.add_tab(self.process_frame, "Procesy")
+        self.notebook.select(self.process_frame)
+        
+        self.process_label = tk.Label(self.process_frame, anchor='w')
+        self.process_label.pack(fill=tk.X, padx=5, pady=5)
+        
+        columns = ('PID', 'CPU', 'RSS', 'Read', 'Write', 'Threads', 'Time')
+        self.process_tree = ttk.Treeview(self.process_frame, columns=columns, show='tree headings')
+        self.process_tree.heading('#0', text='Program')
+        for column, title in zip(columns, ('PID', 'CPU%', 'Pamięć', 'Odczyt', 'Zapis', 'Wątki', 'Czas')):
+            self.process_tree.heading(column, text=title)
+            self.process_tree.column(column, width=80, anchor='e')
+        self.process_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.process_refresh = None
+        self.refresh_processes()
+        
+    def refresh_processes(self):
+        if self.process_refresh is not None:
+            self.root.after_cancel(self.process_refresh)
+        interval = self.shell.monitor.interval
+        # Próbki tylko gdy zakładka jest widoczna - w tle żadnego czytania /proc
+        if self.notebook.select() == str(self.process_frame):
+            self.update_process_tree()
+        self.process_label.config(text=f"Odświeżanie co {interval:g} s (top <sekundy> zmienia odstęp)")
+        self.process_refresh = self.root.after(int(interval * 1000), self.refresh_processes)
+        
+    def update_process_tree(self):
+        for item in self.process_tree.get_children():
+            self.process_tree.delete(item)
+        watches = self.shell.process_loop.running()
+        if not PROC_SUPPORTED:
+            for watch in watches:
+                self.process_tree.insert('', 'end', text=watch.name or '?',
+                                         values=(watch.process.pid, '', '', '', '', '', ''))
+            return
+        for row in self.shell.monitor.sample(watches):
+            self.process_tree.insert('', 'end', text=row['name'], values=(
+                row['pid'], f"{row['cpu_percent']:.1f}", format_size(row['rss']),
+                format_size(row['read_bytes']), format_size(row['write_bytes']),
+                row['threads'], f"{row['elapsed']:.0f} s"))
+        
+    def show_metrics(self):
+        """Zakładka Metryki: czasy operacji KocurDOS (kocur_metrics)"""
+        if self.select_existing_tab("Metryki"):
+            return
+                
+        self.metrics_frame = ttk.Frame(self.notebook)
+        self.add_tab(self.metrics_frame, "Metryki")
+        self.notebook.select(self.metrics_frame)
+        
+        toolbar = ttk.Frame(self.metrics_frame)
+        toolbar.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.metrics_enabled = tk.BooleanVar(value=metrics.enabled)
+        ttk.Checkbutton(toolbar, text="Pomiary włączone", variable=self.metrics_enabled,
+                        command=lambda: setattr(metrics, 'enabled', self.metrics_enabled.get())).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Wyczyść", command=metrics.reset).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Eksport JSON", command=lambda: self.export_metrics('json')).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Eksport Prometheus",
+                   command=lambda: self.export_metrics('prometheus')).pack(side=tk.LEFT, padx=2)
+        
+        columns = ('Count', 'Total', 'Mean', 'P50', 'P95', 'Max')
+        self.metrics_tree = ttk.Treeview(self.metrics_frame, columns=columns, show='tree headings')
+        self.metrics_tree.heading('#0', text='Operacja')
+        for column, title in zip(columns, ('Liczba', 'Suma ms', 'Śr. ms', 'P50 ms', 'P95 ms', 'Maks. ms')):
+            self.metrics_tree.heading(column, text=title)
+            self.metrics_tree.column(column, width=90, anchor='e')
+        self.metrics_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.refresh_metrics()
+        
+    def refresh_metrics(self):
+        # Jak zakładka Procesy: odświeżanie tylko, gdy jest widoczna
+        if self.notebook.select() == str(self.metrics_frame):
+            self.metrics_enabled.set(metrics.enabled)
+            for item in self.metrics_tree.get_children():
+                self.metrics_tree.delete(item)
+            for name, count, total, mean, p50, p95, peak in metrics.rows():
+                self.metrics_tree.insert('', 'end', text=name, values=(
+                    count, f"{total * 1000:.1f}", f"{mean * 1000:.3f}", f"{p50 * 1000:.3f}",
+                    f"{p95 * 1000:.3f}", f"{peak * 1000:.3f}"))
+        self.root.after(self.METRICS_REFRESH, self.refresh_metrics)
+        
+    def export_metrics(self, kind):
+        extension = '.json' if kind == 'json' else '.prom'
+        file_path = filedialog.asksaveasfilename(initialdir=self.current_dir, defaultextension=extension)
+        if not file_path:
+            return
+        text = metrics.to_json() + '\n' if kind == 'json' else metrics.to_prometheus()
+        try:
+            atomic_write(file_path, [text])
+        except OSError as e:
+            messagebox.showerror("Błąd", f"Nie można zapisać: {e}")
+        
     def print_to_terminal(self, text):
-        self.terminal_output.config(state='normal')
-        self.terminal_output.insert(tk.END, text + '\n')
-        self.terminal_output.config(state='disabled')
-        self.terminal_output.see(tk.END)
+        self.terminal.write(text)
+        
+    @metrics.timed('terminal_insert')
+    def insert_terminal_text(self, text):
+        widget = self.terminal_output
+        widget.config(state='normal')
+        if (not self.ansi.pending and not any(char in text for char in CONTROL_CHARS)
+                and widget.compare('output', '==', 'end - 1 chars')):
+            # Zwykły tekst na końcu terminala
+            widget.insert('output', text, self.terminal_tags(self.ansi.tags))
+        else:
+            for operation in self.ansi.feed(text):
+                self.apply_terminal_operation(widget, operation)
+        widget.config(state='disabled')
+        widget.see(tk.END)
+        
+    def terminal_tags(self, tags):
+        """Tagi kolorów ANSI (konfigurowane przy pierwszym użyciu)"""
+        for tag in tags:
+            if tag not in self.ansi_tags:
+                self.terminal_output.tag_configure(tag, **tag_style(tag))
+                self.ansi_tags.add(tag)
+        return tags
+        
+    def apply_terminal_operation(self, widget, operation):
+        kind = operation[0]
+        if kind == 'text':
+            tags = self.terminal_tags(operation[2])
+            for i, line in enumerate(operation[1].split('\n')):
+                if i:
+                    widget.mark_set('output', 'output lineend')
+                    if widget.compare('output', '==', 'end - 1 chars'):
+                        widget.insert('output', '\n')
+                    else:
+                        widget.mark_set('output', 'output + 1 chars')
+                if line:
+                    # Nadpisz znaki do końca linii, resztę dopisz
+                    remaining = len(widget.get('output', 'output lineend'))
+                    if remaining:
+                        widget.delete('output', f'output + {min(len(line), remaining)} chars')
+                    widget.insert('output', line, tags)
+        elif kind == 'cr':
+            widget.mark_set('output', 'output linestart')
+        elif kind == 'bs':
+            if widget.compare('output', '>', 'output linestart'):
+                widget.mark_set('output', 'output - 1 chars')
+        elif kind == 'erase':
+            mode = operation[1]
+            if mode == 0:
+                widget.delete('output', 'output lineend')
+            else:
+                before = len(widget.get('output linestart', 'output'))
+                widget.delete('output linestart', 'output')
+                widget.insert('output', ' ' * before)
+                if mode == 2:
+                    widget.delete('output', 'output lineend')
+        
+    def poll_terminal_output(self):
+        """Wyjście wątków roboczych i stan programu na pierwszym planie"""
+        self.terminal.drain()
+        # Zakończony program: jego kod staje się errorlevel, zadanie jest zwalniane
+        job = self.shell.job_thread
+        if job is not None and not job.is_alive():
+            self.shell.errorlevel = self.shell.wait_for_job()
+        program_input = self.shell.accepts_input()
+        if program_input != self.program_input:
+            self.program_input = program_input
+            self.update_prompt()
+        self.root.after(self.OUTPUT_POLL, self.poll_terminal_output)
         
     def update_prompt(self):
         """Aktualizuj prompt w terminalu"""
         if hasattr(self, 'prompt_label'):
-            self.prompt_label.config(text=f"C:\\{self.current_dir.name}>")
+            if self.program_input:
+                # Wpisany tekst trafia na wejście programu
+                self.prompt_label.config(text="▶")
+            else:
+                self.prompt_label.config(text=f"C:\\{self.current_dir.name}>")
         
     def execute_command(self, event):
+        if self.history_search:
+            # Enter w trakcie wyszukiwania wykonuje znalezioną komendę
+            self.finish_search(self.history_search.match or "")
+        if self.shell.accepts_input():
+            # Program na pierwszym planie: linia idzie na jego wejście (także pusta)
+            text = self.command_entry.get()
+            self.command_entry.delete(0, tk.END)
+            self.print_to_terminal(text)
+            self.shell.send_input(text)
+            return
         command = self.command_entry.get().strip()
         if not command:
             return
             
         # Dodaj do historii
-        self.command_history.append(command)
-        self.history_index = len(self.command_history)
+        self.command_history.add(command)
+        self.history_index = 0
         
         # Wyświetl komendę
         self.print_to_terminal(f"C:\\{self.current_dir.name}> {command}")
@@ -205,299 +656,655 @@ class KocurDOS:
         self.process_command(command)
         
     def process_command(self, command):
-        parts = command.split()
-        if not parts:
-            return
-            
-        cmd = parts[0].lower()
-        args = parts[1:] if len(parts) > 1 else []
-        
-        if cmd == 'help':
-            self.show_help()
-        elif cmd == 'dir' or cmd == 'ls':
-            self.list_directory()
-        elif cmd == 'cd':
-            self.change_directory(args)
-        elif cmd == 'mkdir':
-            self.make_directory(args)
-        elif cmd == 'rmdir':
-            self.remove_directory(args)
-        elif cmd == 'del' or cmd == 'rm':
-            self.delete_file(args)
-        elif cmd == 'type' or cmd == 'cat':
-            self.show_file_content(args)
-        elif cmd == 'echo':
-            self.echo_text(args)
-        elif cmd == 'cls' or cmd == 'clear':
-            self.clear_terminal()
-        elif cmd == 'python':
-            self.run_python_command(args)
-        elif cmd == 'exit':
-            self.root.quit()
-        elif cmd == 'ver':
-            self.print_to_terminal(f"KocurDOS v{self.VERSION}")
-        elif cmd == 'stop':
-            self.interrupt_process()
+        self.shell.process_command(command)
+        
+    def clear_terminal(self):
+        self.terminal_output.config(state='normal')
+        self.terminal_output.delete(1.0, tk.END)
+        self.terminal_output.config(state='disabled')
+        
+    def interrupt_process(self, event=None):
+        """Przerwij działający proces Python"""
+        self.shell.interrupt_process()
+        
+    def close_program_input(self, event=None):
+        """Ctrl+D: koniec danych wejściowych programu"""
+        self.shell.close_input()
+        return "break"
+        
+    def set_command_text(self, text):
+        self.command_entry.delete(0, tk.END)
+        self.command_entry.insert(0, text)
+        
+    def history_up(self, event):
+        if self.history_search:
+            self.finish_search(self.history_search.match or self.history_draft)
+        command = self.command_history.entry(self.history_index + 1)
+        if command is not None:
+            if self.history_index == 0:
+                self.history_draft = self.command_entry.get()
+            self.history_index += 1
+            self.set_command_text(command)
+        return "break"
+            
+    def history_down(self, event):
+        if self.history_search:
+            self.finish_search(self.history_search.match or self.history_draft)
+        if self.history_index > 1:
+            self.history_index -= 1
+            self.set_command_text(self.command_history.entry(self.history_index))
+        elif self.history_index == 1:
+            self.history_index = 0
+            self.set_command_text(self.history_draft)
+        return "break"
+        
+    def complete_command(self, event=None):
+        """Tab: uzupełnij słowo przed kursorem; kolejne Tab - następny kandydat"""
+        if self.history_search:
+            self.finish_search(self.history_search.match or self.history_draft)
+        text = self.command_entry.get()
+        cursor = self.command_entry.index(tk.INSERT)
+        before, after = text[:cursor], text[cursor:]
+        
+        completion = self.completion
+        if completion is None or completion.current != before:
+            completion = self.completer.start(before)
+        if completion is None:
+            self.command_entry.bell()
+            return "break"
+        
+        before = completion.next()
+        self.set_command_text(before + after)
+        self.command_entry.icursor(len(before))
+        # Jeden kandydat (np. katalog): następne Tab uzupełnia dalej
+        self.completion = completion if len(completion.candidates) > 1 else None
+        return "break"
+        
+    def reverse_search(self, event=None):
+        """Ctrl+R: pole komendy staje się zapytaniem; kolejne Ctrl+R - starsze wyniki"""
+        if self.history_search is None:
+            self.history_draft = self.command_entry.get()
+            self.history_search = ReverseSearch(self.command_history)
+            self.command_entry.delete(0, tk.END)
         else:
-            self.print_to_terminal(f"Nieznana komenda: {cmd}")
-            
-    def show_help(self):
-        help_text = """
-Dostępne komendy:
-  help          - Pokaż tę pomoc
-  dir, ls       - Wyświetl zawartość katalogu
-  cd <katalog>  - Zmień katalog
-  mkdir <nazwa> - Utwórz katalog
-  rmdir <nazwa> - Usuń katalog
-  del, rm <plik>- Usuń plik
-  type, cat <plik> - Wyświetl zawartość pliku
-  echo <tekst>  - Wyświetl tekst
-  cls, clear    - Wyczyść terminal
-  python <plik> - Uruchom skrypt Python
-  stop          - Przerwij działający program
-  ver           - Pokaż wersję
-  exit          - Wyjście
+            self.history_search.next()
+        self.show_search_state()
+        return "break"
+        
+    def update_search(self, event):
+        search = self.history_search
+        if search is None:
+            return
+        query = self.command_entry.get()
+        if query != search.query:
+            search.search(query)
+            self.show_search_state()
+            
+    def show_search_state(self):
+        search = self.history_search
+        match = search.match or ("" if not search.query else "brak")
+        self.prompt_label.config(text=f"(szukaj wstecz) [{match}]:")
+        
+    def cancel_search(self, event=None):
+        if self.history_search:
+            self.finish_search(self.history_draft)
+        return "break"
+        
+    def finish_search(self, text):
+        """Zakończ wyszukiwanie, zostawiając text w polu komendy"""
+        self.history_search = None
+        self.history_index = 0
+        self.set_command_text(text)
+        self.update_prompt()
+        
 
-💡 Skróty klawiszowe:
-  Ctrl+C        - Przerwij program
-  ↑/↓           - Historia komend
-        """
-        self.print_to_terminal(help_text)
+    # Funkcje edytora
+    def new_file(self):
+        self.add_document(Document(self.journal_dir))
         
-    def list_directory(self):
-        try:
-            items = list(self.current_dir.iterdir())
-            if not items:
-                self.print_to_terminal("Katalog jest pusty")
-                return
-                
-            for item in sorted(items):
-                if item.is_dir():
-                    self.print_to_terminal(f"<DIR>     {item.name}")
-                else:
-                    size = item.stat().st_size
-                    self.print_to_terminal(f"{size:>8} {item.name}")
-        except Exception as e:
-            self.print_to_terminal(f"Błąd: {e}")
+    def add_document(self, doc, activate=True):
+        """Dodaj dokument jako nową zakładkę i przełącz się na niego"""
+        # Nieużywany pusty dokument zastępujemy nowym
+        current = self.document
+        if (current is not None and current.file_path is None and not current.modified
+                and self.editor_text.index('end-1c') == '1.0'):
+            self.close_document(current, activate=False)
+            
+        doc.tab = ttk.Frame(self.doc_tabs, height=0)
+        self.documents.append(doc)
+        self.doc_tabs.add(doc.tab, text=doc.title)
+        if activate:
+            self.activate_document(doc)
             
-    def change_directory(self, args):
-        if not args:
-            self.print_to_terminal(str(self.current_dir))
+    def restore_documents(self):
+        """Pliki z poprzedniej sesji: zakładki od razu, treść wczytywana przy aktywacji"""
+        state = self.session_restore.pop('editor', None)
+        if not isinstance(state, dict):
             return
+        restored = []
+        for entry in state.get('documents', []):
+            file_path = entry.get('path')
+            if not file_path or self.find_document(file_path) is not None:
+                continue
+            try:
+                if file_size(file_path) >= PREVIEW_THRESHOLD:
+                    continue
+            except OSError:
+                continue
+            doc = Document(self.journal_dir, file_path)
+            doc.cursor = entry.get('cursor', '1.0')
+            doc.yview = entry.get('yview', 0.0)
+            self.add_document(doc, activate=False)
+            restored.append(doc)
+        if restored:
+            active = self.find_document(state['active']) if state.get('active') else None
+            self.activate_document(active or restored[-1])
             
-        target = args[0]
-        if target == "..":
-            if self.current_dir != self.disk_c:
-                self.current_dir = self.current_dir.parent
-        else:
-            new_path = self.current_dir / target
-            if new_path.exists() and new_path.is_dir():
-                self.current_dir = new_path
-            else:
-                self.print_to_terminal(f"Katalog nie istnieje: {target}")
+    def find_document(self, file_path):
+        for doc in self.documents:
+            if doc.file_path and Path(doc.file_path).resolve() == Path(file_path).resolve():
+                return doc
+        return None
         
-        # Aktualizuj prompt
-        self.update_prompt()
+    def update_document_title(self, doc):
+        if doc.tab is not None:
+            self.doc_tabs.tab(doc.tab, text=doc.title)
+            
+    def on_document_tab_changed(self, event):
+        selected = self.doc_tabs.select()
+        for doc in self.documents:
+            if str(doc.tab) == selected and doc is not self.document:
+                self.activate_document(doc)
+                break
                 
-    def make_directory(self, args):
-        if not args:
-            self.print_to_terminal("Użycie: mkdir <nazwa>")
+    def deactivate_document(self):
+        """Wyładuj aktywny dokument z widgetu Text do zwartego bufora"""
+        doc = self.document
+        if doc is None:
             return
-            
+        self.document = None
+        
+        if self.file_loading:
+            # Niedokończone wczytywanie - plik zostanie wczytany ponownie
+            self.cancel_file_loading()
+        else:
+            doc.cursor = self.editor_text.index(tk.INSERT)
+            doc.yview = self.editor_text.yview()[0]
+            if doc.modified or not doc.file_path:
+                doc.journal.flush(self.editor_lines)
+                doc.store(''.join(self.snapshot_editor_contents()), self.buffers_dir)
+                
+        self.suppress_changes = True
         try:
-            (self.current_dir / args[0]).mkdir()
-            self.print_to_terminal(f"Utworzono katalog: {args[0]}")
-        except Exception as e:
-            self.print_to_terminal(f"Błąd: {e}")
+            self.editor_text.delete(1.0, tk.END)
+        finally:
+            self.suppress_changes = False
             
-    def remove_directory(self, args):
-        if not args:
-            self.print_to_terminal("Użycie: rmdir <nazwa>")
+    def activate_document(self, doc):
+        """Załaduj dokument do widgetu Text"""
+        if doc is self.document:
+            return
+        self.deactivate_document()
+        self.document = doc
+        if str(self.doc_tabs.select()) != str(doc.tab):
+            self.doc_tabs.select(doc.tab)
+        self.update_highlighting()
+        
+        text = doc.take_text()
+        if text is None and doc.file_path:
+            self.load_file_into_editor(doc.file_path)
             return
             
+        self.suppress_changes = True
         try:
-            (self.current_dir / args[0]).rmdir()
-            self.print_to_terminal(f"Usunięto katalog: {args[0]}")
-        except Exception as e:
-            self.print_to_terminal(f"Błąd: {e}")
+            self.editor_text.insert(1.0, text or "")
+        finally:
+            self.suppress_changes = False
+        if doc.journal.base is None:
+            doc.journal.start_from_text(text or "", doc.file_path)
+        self.editor_text.mark_set(tk.INSERT, doc.cursor)
+        self.editor_text.yview_moveto(doc.yview)
+        
+    def close_document(self, doc=None, activate=True):
+        """Zamknij dokument (domyślnie aktywny)"""
+        doc = doc or self.document
+        if doc.modified and activate:
+            if not messagebox.askyesno("Potwierdzenie",
+                                       f"{doc.title} ma niezapisane zmiany. Zamknąć mimo to?"):
+                return
+                
+        if doc is self.document:
+            self.deactivate_document()
+        doc.close()
+        self.documents.remove(doc)
+        self.doc_tabs.forget(doc.tab)
+        doc.tab.destroy()
+        doc.tab = None
+        
+        if activate and self.document is None:
+            if self.documents:
+                self.activate_document(self.documents[-1])
+            else:
+                self.new_file()
+                
+    def on_editor_changed(self, first, old_count, new_count):
+        """Zmiana w widgecie Text: dziennik i znacznik modyfikacji dokumentu"""
+        doc = self.document
+        if doc is None or self.suppress_changes or self.file_loading:
+            return
+        doc.journal.lines_changed(first, old_count, new_count)
+        was_modified = doc.modified
+        doc.version += 1
+        if not was_modified:
+            self.update_document_title(doc)
+            
+    def update_highlighting(self):
+        """Podświetlaj składnię dla plików Python i nowych plików"""
+        file_path = self.document.file_path if self.document else None
+        enabled = file_path is None or file_path.endswith('.py')
+        if enabled != self.highlighter.enabled:
+            self.highlighter.set_enabled(enabled)
+            
+    def open_file(self):
+        file_path = filedialog.askopenfilename(
+            initialdir=str(self.current_dir),
+            filetypes=[("Wszystkie pliki", "*.*"), ("Python", "*.py"), ("Tekst", "*.txt")]
+        )
+        if file_path:
+            self.open_document_file(file_path)
             
-    def delete_file(self, args):
-        if not args:
-            self.print_to_terminal("Użycie: del <plik>")
+    def open_document_file(self, file_path):
+        """Otwórz plik w nowej zakładce edytora (lub przełącz na już otwarty)"""
+        self.show_editor()
+        doc = self.find_document(file_path)
+        if doc is not None:
+            self.activate_document(doc)
             return
             
         try:
-            (self.current_dir / args[0]).unlink()
-            self.print_to_terminal(f"Usunięto plik: {args[0]}")
-        except Exception as e:
-            self.print_to_terminal(f"Błąd: {e}")
+            size = file_size(file_path)
+        except OSError as e:
+            messagebox.showerror("Błąd", f"Nie można otworzyć pliku: {e}")
+            return
             
-    def show_file_content(self, args):
-        if not args:
-            self.print_to_terminal("Użycie: type <plik>")
+        # Bardzo duże pliki tylko w podglądzie
+        if size >= PREVIEW_THRESHOLD:
+            self.show_preview_window(file_path)
             return
             
+        self.add_document(Document(self.journal_dir, file_path))
+        
+    def load_file_into_editor(self, file_path):
+        """Wczytaj plik aktywnego dokumentu (duże pliki kawałkami, w tle)"""
+        doc = self.document
         try:
-            content = (self.current_dir / args[0]).read_text(encoding='utf-8')
-            self.print_to_terminal(content)
-        except Exception as e:
-            self.print_to_terminal(f"Błąd: {e}")
+            size = file_size(file_path)
+        except OSError as e:
+            messagebox.showerror("Błąd", f"Nie można otworzyć pliku: {e}")
+            return
             
-    def echo_text(self, args):
-        self.print_to_terminal(" ".join(args))
-        
-    def clear_terminal(self):
-        self.terminal_output.config(state='normal')
-        self.terminal_output.delete(1.0, tk.END)
-        self.terminal_output.config(state='disabled')
+        self.cancel_file_loading()
+        doc.journal.stop()
         
-    def interrupt_process(self, event=None):
-        """Przerwij działający proces Python"""
-        if self.current_process and self.current_process.poll() is None:
+        if size < LARGE_FILE_THRESHOLD:
             try:
-                self.current_process.terminate()
-                self.print_to_terminal("\n⚠️  Program przerwany przez użytkownika")
-                self.current_process = None
-            except:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                self.suppress_changes = True
                 try:
-                    self.current_process.kill()
-                    self.print_to_terminal("\n⚠️  Program wymuszenie zakończony")
-                    self.current_process = None
-                except:
-                    self.print_to_terminal("\n❌ Nie można przerwać programu")
-        else:
-            self.print_to_terminal("Brak działającego programu do przerwania")
-        
-    def run_python_command(self, args):
-        if not args:
-            self.print_to_terminal("Użycie: python <plik.py>")
+                    self.editor_text.insert(1.0, content)
+                finally:
+                    self.suppress_changes = False
+                doc.journal.start_from_file(file_path)
+                self.editor_text.mark_set(tk.INSERT, doc.cursor)
+                self.editor_text.yview_moveto(doc.yview)
+            except Exception as e:
+                doc.file_path = None
+                doc.journal.start_from_text("")
+                self.update_document_title(doc)
+                messagebox.showerror("Błąd", f"Nie można otworzyć pliku: {e}")
             return
+            
+        # Duży plik - czytaj w wątku, wstawiaj porcjami z pętli Tk
+        self.file_loading = True
+        self.editor_text.config(state='disabled')
+        generation = self.load_generation
+        chunks = queue.Queue(maxsize=16)
         
-        script_path = self.current_dir / args[0]
-        if not script_path.exists():
-            self.print_to_terminal(f"Plik nie istnieje: {args[0]}")
-            return
+        def reader():
+            try:
+                for chunk in iter_text_chunks(file_path):
+                    while generation == self.load_generation:
+                        try:
+                            chunks.put(chunk, timeout=0.5)
+                            break
+                        except queue.Full:
+                            continue
+                    else:
+                        return
+                chunks.put(None)
+            except Exception as e:
+                chunks.put(e)
+                
+        threading.Thread(target=reader, daemon=True).start()
+        self.root.after(1, self.insert_loaded_chunks, chunks, generation, size, 0)
         
+    def insert_loaded_chunks(self, chunks, generation, size, loaded):
+        """Wstaw do edytora kawałki wczytane przez wątek (ograniczony czas na tick)"""
+        if generation != self.load_generation:
+            return
+            
+        doc = self.document
+        deadline = time.perf_counter() + 0.02
+        self.editor_text.config(state='normal')
         try:
-            self.print_to_terminal(f"🐍 Uruchamiam {args[0]}... (Ctrl+C lub STOP aby przerwać)")
-            
-            # Uruchom proces w tle
-            self.current_process = subprocess.Popen(
-                [sys.executable, script_path.name], 
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=str(script_path.parent),
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            # Uruchom w osobnym wątku żeby nie blokować GUI
-            def run_process():
+            while time.perf_counter() < deadline:
                 try:
-                    stdout, stderr = self.current_process.communicate(timeout=30)  # 30 sekund timeout
+                    chunk = chunks.get_nowait()
+                except queue.Empty:
+                    break
                     
-                    if stdout:
-                        self.print_to_terminal(stdout)
-                    if stderr:
-                        self.print_to_terminal(f"Błąd: {stderr}")
+                if chunk is None:
+                    self.file_loading = False
+                    self.editor_status.config(text="")
+                    doc.journal.start_from_file(doc.file_path)
+                    self.editor_text.mark_set(tk.INSERT, doc.cursor)
+                    self.editor_text.yview_moveto(doc.yview)
+                    return
+                if isinstance(chunk, Exception):
+                    self.cancel_file_loading()
+                    doc.file_path = None
+                    doc.version += 1
+                    doc.journal.start_from_text(''.join(self.snapshot_editor_contents()))
+                    self.update_document_title(doc)
+                    messagebox.showerror("Błąd", f"Nie można otworzyć pliku: {chunk}")
+                    return
                     
-                    if self.current_process.returncode != 0:
-                        self.print_to_terminal(f"Program zakończony z kodem: {self.current_process.returncode}")
-                    else:
-                        self.print_to_terminal("✅ Program zakończony pomyślnie")
-                        
-                except subprocess.TimeoutExpired:
-                    self.current_process.kill()
-                    self.print_to_terminal("⏰ Program przerwany - przekroczono limit czasu (30s)")
-                except Exception as e:
-                    self.print_to_terminal(f"❌ Błąd wykonania: {e}")
-                finally:
-                    self.current_process = None
-            
-            # Uruchom w wątku
-            thread = threading.Thread(target=run_process, daemon=True)
-            thread.start()
-            
-        except Exception as e:
-            self.print_to_terminal(f"Błąd uruchamiania: {e}")
-            
-    def history_up(self, event):
-        if self.command_history and self.history_index > 0:
-            self.history_index -= 1
-            self.command_entry.delete(0, tk.END)
-            self.command_entry.insert(0, self.command_history[self.history_index])
-            
-    def history_down(self, event):
-        if self.command_history and self.history_index < len(self.command_history) - 1:
-            self.history_index += 1
-            self.command_entry.delete(0, tk.END)
-            self.command_entry.insert(0, self.command_history[self.history_index])
-        elif self.history_index >= len(self.command_history) - 1:
-            self.command_entry.delete(0, tk.END)
-            self.history_index = len(self.command_history)
+                self.editor_text.insert('end-1c', chunk)
+                loaded += len(chunk)
+        finally:
+            if self.file_loading and generation == self.load_generation:
+                self.editor_text.config(state='disabled')
+                
+        percent = min(100, loaded * 100 // max(size, 1))
+        self.editor_status.config(text=f"Wczytywanie... {percent}%")
+        self.root.after(1, self.insert_loaded_chunks, chunks, generation, size, loaded)
+        
+    def cancel_file_loading(self):
+        """Przerwij trwające wczytywanie dużego pliku"""
+        self.load_generation += 1
+        self.file_loading = False
+        self.editor_text.config(state='normal')
+        self.editor_status.config(text="")
+        
+    def show_preview_window(self, file_path):
+        """Pokaż bardzo duży plik w oknie podglądu (tylko do odczytu)"""
+        try:
+            reader = ChunkReader(file_path)
+        except OSError as e:
+            messagebox.showerror("Błąd", f"Nie można otworzyć pliku: {e}")
+            return
             
-    # Funkcje edytora
-    def new_file(self):
-        self.editor_text.delete(1.0, tk.END)
-        self.current_file = None
+        window = tk.Toplevel(self.root)
+        window.title(f"Podgląd: {Path(file_path).name}")
+        window.geometry("900x600")
         
-    def open_file(self):
-        file_path = filedialog.askopenfilename(
-            initialdir=str(self.current_dir),
-            filetypes=[("Wszystkie pliki", "*.*"), ("Python", "*.py"), ("Tekst", "*.txt")]
-        )
-        if file_path:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                self.editor_text.delete(1.0, tk.END)
-                self.editor_text.insert(1.0, content)
-                self.current_file = file_path
-            except Exception as e:
-                messagebox.showerror("Błąd", f"Nie można otworzyć pliku: {e}")
+        toolbar = ttk.Frame(window)
+        toolbar.pack(fill=tk.X, padx=5, pady=5)
+        info_label = tk.Label(toolbar, text="")
+        info_label.pack(side=tk.LEFT)
+        
+        preview_text = scrolledtext.ScrolledText(window, font=('Courier', 10), wrap=tk.NONE)
+        preview_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        pending = [False]
+        
+        def load_more():
+            pending[0] = False
+            if reader.finished:
+                return
+            preview_text.config(state='normal')
+            preview_text.insert(tk.END, reader.read_next())
+            preview_text.config(state='disabled')
+            mb = 1024 * 1024
+            info_label.config(text=f"Pokazano {reader.offset // mb} MB z {reader.size // mb} MB "
+                                   f"(tylko do odczytu)")
+            if reader.finished:
+                more_button.config(state='disabled')
                 
-    def save_file(self):
-        if self.current_file:
-            try:
-                content = self.editor_text.get(1.0, tk.END + '-1c')
-                with open(self.current_file, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                messagebox.showinfo("Sukces", "Plik zapisany!")
-            except Exception as e:
-                messagebox.showerror("Błąd", f"Nie można zapisać pliku: {e}")
+        def on_scroll(first, last):
+            # Doczytuj kolejny kawałek po przewinięciu do końca
+            preview_text.vbar.set(first, last)
+            if float(last) >= 1.0 and not reader.finished and not pending[0]:
+                pending[0] = True
+                window.after_idle(load_more)
+                
+        more_button = ttk.Button(toolbar, text="Wczytaj więcej", command=load_more)
+        more_button.pack(side=tk.RIGHT)
+        preview_text.config(yscrollcommand=on_scroll)
+        load_more()
+        
+    def snapshot_editor_contents(self):
+        """Pobierz zawartość edytora jako listę porcji linii"""
+        last_line = int(self.editor_text.index('end-1c').split('.')[0])
+        chunks = []
+        for start in range(1, last_line + 1, SLICE_LINES):
+            end = start + SLICE_LINES
+            end_index = f"{end}.0" if end <= last_line else 'end-1c'
+            chunks.append(self.editor_text.get(f"{start}.0", end_index))
+        return chunks
+        
+    def document_contents(self, doc):
+        """Treść dokumentu do zapisu (z widgetu lub z bufora nieaktywnego dokumentu)"""
+        if doc is self.document:
+            return self.snapshot_editor_contents()
+        if doc.buffer is not None:
+            return [doc.buffer.text()]
+        return None
+        
+    def save_file(self, event=None, on_saved=None):
+        if self.file_loading:
+            messagebox.showwarning("Uwaga", "Poczekaj na wczytanie pliku")
+            return 'break'
+            
+        doc = self.document
+        if doc.file_path:
+            self.start_save(doc, on_saved)
         else:
-            self.save_file_as()
+            self.save_file_as(on_saved=on_saved)
+        return 'break'
             
-    def save_file_as(self):
+    def save_file_as(self, on_saved=None):
         file_path = filedialog.asksaveasfilename(
             initialdir=str(self.current_dir),
             defaultextension=".txt",
             filetypes=[("Wszystkie pliki", "*.*"), ("Python", "*.py"), ("Tekst", "*.txt")]
         )
         if file_path:
+            # Dokument dostaje nową ścieżkę dopiero po udanym zapisie (finish_save)
+            self.start_save(self.document, on_saved, file_path)
+            
+    def start_save(self, doc, on_saved=None, file_path=None):
+        """Zapisz dokument w tle (kolejne Ctrl+S w trakcie zapisu są łączone w jeden)
+        
+        file_path - zapis pod nową nazwą (Zapisz jako); dokument przejmuje
+        ją w finish_save, dopiero gdy zapis się udał.
+        """
+        if on_saved:
+            self.save_callbacks.append(on_saved)
+        if self.save_in_progress:
+            pending = [pending_doc for pending_doc, _ in self.save_pending]
+            if doc in pending:
+                index = pending.index(doc)
+                self.save_pending[index] = (doc, file_path or self.save_pending[index][1])
+            else:
+                self.save_pending.append((doc, file_path))
+            return
+            
+        if doc is self.document:
+            doc.journal.mark(self.editor_lines)
+        else:
+            doc.journal.mark(None)
+        chunks = self.document_contents(doc)
+        if chunks is None:
+            # Niezmieniony, niewczytany dokument - nie ma czego zapisywać
+            doc.journal.cancel_mark()
+            self.finish_pending_saves()
+            return
+            
+        self.save_in_progress = True
+        self.editor_status.config(text="Zapisywanie…")
+        file_path = file_path or doc.file_path
+        version = doc.version
+        results = queue.Queue()
+        
+        def writer():
             try:
-                content = self.editor_text.get(1.0, tk.END + '-1c')
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                self.current_file = file_path
-                messagebox.showinfo("Sukces", "Plik zapisany!")
+                atomic_write(file_path, chunks)
+                results.put(None)
             except Exception as e:
-                messagebox.showerror("Błąd", f"Nie można zapisać pliku: {e}")
+                results.put(e)
                 
+        threading.Thread(target=writer, daemon=True).start()
+        self.root.after(20, self.finish_save, results, doc, file_path, version)
+        
+    def finish_save(self, results, doc, file_path, version):
+        """Odbierz wynik zapisu z wątku roboczego"""
+        try:
+            error = results.get_nowait()
+        except queue.Empty:
+            self.root.after(20, self.finish_save, results, doc, file_path, version)
+            return
+            
+        self.save_in_progress = False
+        if error is not None:
+            doc.journal.cancel_mark()
+            self.save_callbacks = []
+            self.save_pending = []
+            self.editor_status.config(text="")
+            messagebox.showerror("Błąd", f"Nie można zapisać pliku: {error}")
+            return
+            
+        # Zapisz jako: nowa ścieżka dopiero teraz, gdy plik istnieje
+        if doc.file_path != file_path:
+            doc.file_path = file_path
+            if doc is self.document:
+                self.update_highlighting()
+                
+        # Dziennik zaczyna się teraz od zapisanego pliku
+        doc.saved_version = version
+        if doc in self.documents:
+            doc.journal.rebase_on_file(file_path)
+        else:
+            doc.journal.cancel_mark()
+        self.update_document_title(doc)
+        if str(file_path).endswith('.py'):
+            # Kod bajtowy gotowy, zanim użytkownik wpisze python
+            self.shell.bytecode.submit(file_path)
+        self.finish_pending_saves()
+        
+    def heartbeat(self):
+        """Zgłoszenie dla strażnika; opóźnienie after() trafia do pomiarów (stats)"""
+        lag = self.watchdog.beat()
+        if metrics.enabled:
+            metrics.record('tk_after_lag', lag)
+        self.root.after(int(HEARTBEAT_INTERVAL * 1000), self.heartbeat)
+        
+    def scan_scripts(self):
+        """Skompiluj w tle skrypty zmienione na dysku w bieżącym katalogu"""
+        self.shell.bytecode.scan(self.current_dir)
+        self.root.after(self.BYTECODE_SCAN_INTERVAL, self.scan_scripts)
+        
+    def finish_pending_saves(self):
+        """Zapisz dokumenty, o które poproszono w trakcie poprzedniego zapisu"""
+        # Ctrl+S naciśnięte w trakcie zapisu - zapisz jeszcze raz aktualną treść
+        if self.save_pending:
+            self.start_save(*self.save_pending.pop(0))
+            return
+            
+        self.editor_status.config(text=f"Zapisano {time.strftime('%H:%M:%S')}")
+        callbacks = self.save_callbacks
+        self.save_callbacks = []
+        for callback in callbacks:
+            callback()
+                
+    def editor_lines(self, lo, hi):
+        """Linie edytora [lo, hi) (numeracja od 0) - dla dziennika autozapisu"""
+        return self.editor_text.get(f"{lo + 1}.0", f"{hi}.end").split('\n')
+        
+    def autosave_tick(self):
+        """Co sekundę dopisz do dziennika zmienione linie aktywnego dokumentu"""
+        doc = self.document
+        if doc is not None and not self.file_loading and doc.journal.dirty:
+            try:
+                doc.journal.flush(self.editor_lines)
+            except OSError as e:
+                self.editor_status.config(text=f"Błąd autozapisu: {e}")
+        self.root.after(self.AUTOSAVE_INTERVAL, self.autosave_tick)
+        
+    def recover_editor_journals(self):
+        """Zaproponuj odzyskanie niezapisanych zmian z dzienników"""
+        recovered = []
+        for journal_path in sorted(self.journal_dir.glob("*.journal")):
+            try:
+                file_path, text = replay_journal(str(journal_path))
+            except (OSError, ValueError) as e:
+                self.print_to_terminal(f"ℹ️  Nie można odtworzyć dziennika edytora: {e}")
+                journal_path.unlink()
+                continue
+            if journal_matches_file(file_path, text):
+                # Nic do odzyskania - treść jest już w pliku
+                journal_path.unlink()
+            else:
+                recovered.append((journal_path, file_path, text))
+                
+        if not recovered:
+            return
+            
+        names = ", ".join(Path(file_path).name if file_path else "nowy plik"
+                          for journal_path, file_path, text in recovered)
+        if not messagebox.askyesno("Odzyskiwanie",
+                                   f"Znaleziono niezapisane zmiany ({names}).\n\n"
+                                   "Czy chcesz je odzyskać?"):
+            for journal_path, file_path, text in recovered:
+                journal_path.unlink()
+            return
+            
+        # Odzyskane dokumenty trafiają do zwartych buforów (dziennik od razu z tą treścią)
+        self.show_editor()
+        # Stary dziennik znika dopiero, gdy dokument ma już nowy (awaria po drodze
+        # zostawia go do odzyskania przy następnym starcie)
+        for journal_path, file_path, text in recovered:
+            # Plik otwarty z migawki sesji zastępujemy odzyskaną treścią
+            existing = self.find_document(file_path) if file_path else None
+            if existing is not None and not existing.modified:
+                self.close_document(existing, activate=False)
+            doc = Document(self.journal_dir, file_path)
+            doc.journal.start_from_text(text, file_path)
+            doc.journal.compact(None)
+            doc.store(text, self.buffers_dir)
+            doc.version = 1
+            self.add_document(doc)
+            journal_path.unlink()
+        self.editor_status.config(text="Odzyskano niezapisane zmiany")
+        
     def run_python(self):
-        if not self.current_file or not self.current_file.endswith('.py'):
+        file_path = self.document.file_path
+        if not file_path or not file_path.endswith('.py'):
             messagebox.showwarning("Uwaga", "Zapisz plik jako .py przed uruchomieniem")
             return
             
-        # Zapisz plik przed uruchomieniem
-        self.save_file()
+        script_name = Path(file_path).name
         
-        # Uruchom w terminalu
-        self.show_terminal()
-        self.process_command(f"python {Path(self.current_file).name}")
+        # Uruchom w terminalu po zakończeniu zapisu
+        def run_saved():
+            self.show_terminal()
+            self.process_command(f"python {script_name}")
+            
+        self.save_file(on_saved=run_saved)
         
     # Funkcje explorera
+    @metrics.timed('refresh_explorer')
     def refresh_explorer(self):
         # Wyczyść drzewo
         for item in self.file_tree.get_children():
@@ -562,23 +1369,17 @@ Dostępne komendy:
             self.refresh_explorer()
         else:
             # Otwórz plik w edytorze
-            self.show_editor()
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                self.editor_text.delete(1.0, tk.END)
-                self.editor_text.insert(1.0, content)
-                self.current_file = str(path)
-            except Exception as e:
-                messagebox.showerror("Błąd", f"Nie można otworzyć pliku: {e}")
+            self.open_document_file(path)
                 
     def check_for_updates(self):
         def check_updates_thread():
             try:
                 # Sprawdź wersję na GitHub
                 response = requests.get(f"{self.GITHUB_REPO}/releases/latest", timeout=5)
+                log_event('update_check', status=response.status_code, version=self.VERSION)
                 if response.status_code == 200:
                     latest_version = response.json().get('tag_name', '').replace('v', '')
+                    log_event('update_available', version=self.VERSION, latest=latest_version)
                     if latest_version and latest_version != self.VERSION:
                         if messagebox.askyesno("Aktualizacja", 
                                              f"Dostępna nowa wersja: {latest_version}\n"
@@ -592,11 +1393,13 @@ Dostępne komendy:
                     print("ℹ️  Brak dostępnych releases na GitHub")
                 else:
                     messagebox.showwarning("Aktualizacja", "Nie można sprawdzić aktualizacji")
-            except requests.exceptions.RequestException:
+            except requests.exceptions.RequestException as e:
                 # Błąd połączenia - nie pokazuj komunikatu
                 print("ℹ️  Nie można połączyć z GitHub")
+                log_event('update_check_failed', logging.WARNING, error=str(e))
             except Exception as e:
                 print(f"ℹ️  Błąd sprawdzania aktualizacji: {e}")
+                log_event('update_check_failed', logging.WARNING, error=str(e))
             
         threading.Thread(target=check_updates_thread, daemon=True).start()
         
@@ -604,7 +1407,10 @@ Dostępne komendy:
         try:
             # Pobierz updater
             updater_url = f"https://github.com/kocurowy96/KocurDOS-py/releases/download/v{version}/updater.py"
+            start = time.monotonic()
             response = requests.get(updater_url)
+            log_event('update_download', url=updater_url, version=version, status=response.status_code,
+                      bytes=len(response.content), duration_ms=round((time.monotonic() - start) * 1000, 1))
         
             if response.status_code == 200:
                 with open("updater.py", "wb") as f:
@@ -616,13 +1422,26 @@ Dostępne komendy:
             else:
                 messagebox.showerror("Błąd", "Nie można pobrać aktualizacji")
         except Exception as e:
+            log_event('update_download_failed', logging.ERROR, version=version, error=str(e))
             messagebox.showerror("Błąd", f"Błąd pobierania aktualizacji: {e}")
             
     def run(self):
         self.root.mainloop()
+        # Ostatnia migawka od razu (okno zamknięte krzyżykiem już nie istnieje -
+        # wtedy zostaje stan z ostatniego save_session)
+        try:
+            self.snapshot_session()
+        except tk.TclError:
+            pass
+        self.session.flush(wait=True)
+        self.watchdog.stop()
+        log_event('session_end')
+        self.log_listener.stop()
 
 if __name__ == "__main__":
     # Sprawdź czy system został zaktualizowany
+    if "--metrics" in sys.argv:
+        metrics.enabled = True
     if len(sys.argv) > 1 and sys.argv[1] == "--updated":
         messagebox.showinfo("Aktualizacja", "KocurDOS został pomyślnie zaktualizowany!")
         
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - operacje na plikach
+Wczytywanie dużych plików kawałkami i atomowy zapis (bez tkinter)
+"""
+
+import codecs
+import os
+import shutil
+import uuid
+
+# Pliki większe niż ten próg wczytujemy w tle, kawałek po kawałku
+LARGE_FILE_THRESHOLD = 2 * 1024 * 1024
+# Pliki większe niż ten próg otwieramy tylko w oknie podglądu (tylko do odczytu)
+PREVIEW_THRESHOLD = 64 * 1024 * 1024
+# Rozmiar jednego kawałka (w bajtach)
+CHUNK_SIZE = 256 * 1024
+# Liczba linii pobieranych naraz z widgetu Text przy zapisie
+SLICE_LINES = 4096
+
+def file_size(path):
+    """Zwróć rozmiar pliku w bajtach"""
+    return os.stat(path).st_size
+
+
+def iter_text_chunks(path, chunk_size=CHUNK_SIZE, encoding='utf-8', errors='strict'):
+    """Czytaj plik tekstowy kawałkami (z normalizacją końców linii)"""
+    with open(path, 'r', encoding=encoding, errors=errors) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+class ChunkReader:
+    """Czytnik stron pliku od zadanego offsetu (dla okna podglądu)"""
+
+    def __init__(self, path, encoding='utf-8', chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.size = file_size(path)
+        self.offset = 0
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._carry = ""
+
+    @property
+    def finished(self):
+        return self.offset >= self.size
+
+    def read_next(self):
+        """Przeczytaj następny kawałek i zwróć go jako tekst"""
+        if self.finished:
+            return ""
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(self.chunk_size)
+        self.offset += len(data)
+        text = self._carry + self.decoder.decode(data, final=self.finished)
+        self._carry = ""
+        # '\r' na końcu kawałka może być początkiem '\r\n' z następnego
+        if text.endswith('\r') and not self.finished:
+            self._carry = '\r'
+            text = text[:-1]
+        return text.replace('\r\n', '\n')
+
+
+def fsync_directory(directory):
+    """Utrwal wpis katalogu po zmianie nazwy (tylko POSIX)"""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def create_temp_file(path):
+    """Nowy plik tymczasowy obok path; zwraca (deskryptor, ścieżka)
+
+    Tworzony z prawami 0666, które system ogranicza umask - jak zwykły
+    nowy plik (mkstemp dałby 0600, a odczyt umask wymaga jej zmiany
+    dla całego procesu).
+    """
+    directory, name = os.path.split(path)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        temp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            return os.open(temp_path, flags, 0o666), temp_path
+        except FileExistsError:
+            continue
+
+
+def atomic_write(path, chunks, encoding='utf-8'):
+    """Zapisz plik atomowo: plik tymczasowy, fsync, zamiana nazwy"""
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    fd, temp_path = create_temp_file(path)
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding) as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        # Zachowaj uprawnienia nadpisywanego pliku (nowy ma już prawa według umask)
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    fsync_directory(directory)
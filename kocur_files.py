@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - pliki systemu
+Jedna lista dla aktualizatora, skryptów wydania i sprawdzania projektu.
+Moduł niczego nie importuje, więc deploy.py i project_status.py nie
+potrzebują tkinter ani requests.
+"""
+
+# Pliki systemu pobierane przy aktualizacji (razem z tym modułem)
+SYSTEM_FILES = [
+    "kocur_dos.py",
+    "kocur_fileio.py",
+    "kocur_highlight.py",
+    "kocur_textwatch.py",
+    "kocur_journal.py",
+    "kocur_documents.py",
+    "kocur_core.py",
+    "kocur_batch.py",
+    "kocur_pipeline.py",
+    "kocur_cmdline.py",
+    "kocur_fsops.py",
+    "kocur_history.py",
+    "kocur_complete.py",
+    "kocur_pty.py",
+    "kocur_ansi.py",
+    "kocur_ioloop.py",
+    "kocur_workers.py",
+    "kocur_bytecode.py",
+    "kocur_runcode.py",
+    "kocur_procstat.py",
+    "kocur_profile.py",
+    "kocur_metrics.py",
+    "kocur_watchdog.py",
+    "kocur_log.py",
+    "kocur_session.py",
+    "kocur_files.py",
+]
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - operacje na wielu plikach
+Wzorce DOS (*.log, dane?.txt) dopasowywane jednym skanem katalogu,
+kopiowanie w jądrze (copy_file_range / sendfile) i masowe operacje
+wykonywane porcjami na puli wątków
+"""
+
+import errno
+import fnmatch
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Liczba wątków i wielkość porcji dla operacji masowych (sztuki i bajty)
+BULK_WORKERS = min(16, (os.cpu_count() or 2) * 2)
+BULK_BATCH = 256
+BULK_BATCH_BYTES = 32 * 1024 * 1024
+
+# Co ile elementów raportować postęp
+PROGRESS_EVERY = 1000
+
+# Od tylu elementów (albo bajtów) operacja działa w tle i raportuje postęp
+BACKGROUND_THRESHOLD = 500
+BACKGROUND_BYTES = 256 * 1024 * 1024
+MAX_REPORTED_ERRORS = 20
+
+# Kopiowanie: porcja dla wywołań jądra i bufor pętli readinto
+KERNEL_CHUNK = 64 * 1024 * 1024
+COPY_BUFFER = 1024 * 1024
+
+# Błędy oznaczające, że dany sposób kopiowania nie jest obsługiwany
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                errno.ENOTSUP, errno.EBADF, errno.ETXTBSY, errno.EPERM}
+
+
+def has_wildcards(name):
+    return '*' in name or '?' in name
+
+
+def compile_pattern(pattern):
+    """Wzorzec DOS jako wyrażenie regularne (bez rozróżniania wielkości liter)"""
+    # Jak w DOS: *.* pasuje także do nazw bez rozszerzenia
+    if pattern in ('*.*', '*'):
+        return None
+    return re.compile(fnmatch.translate(pattern), re.IGNORECASE)
+
+
+def match_entries(directory, pattern):
+    """Wpisy katalogu pasujące do wzorca (jeden skan, posortowane po nazwie)"""
+    regex = compile_pattern(pattern)
+    with os.scandir(directory) as entries:
+        matched = [entry for entry in entries if regex is None or regex.match(entry.name)]
+    matched.sort(key=lambda entry: entry.name.lower())
+    return matched
+
+
+def walk_tree(root, pattern='*', include_dirs=True):
+    """Pliki drzewa pasujące do wzorca oraz wszystkie podkatalogi
+
+    Zwraca (pliki, katalogi) jako ścieżki względne; każdy katalog jest
+    skanowany dokładnie raz. Dowiązania do katalogów traktowane są jak pliki.
+    """
+    regex = compile_pattern(pattern)
+    files = []
+    dirs = []
+    stack = ['']
+    while stack:
+        relative = stack.pop()
+        with os.scandir(os.path.join(root, relative)) as entries:
+            for entry in entries:
+                path = os.path.join(relative, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    if include_dirs:
+                        dirs.append(path)
+                        stack.append(path)
+                elif regex is None or regex.match(entry.name):
+                    files.append(path)
+    dirs.sort()
+    files.sort()
+    return files, dirs
+
+
+def _kernel_copy(infd, outfd, offset, size):
+    """copy_file_range, a gdy niedostępne - sendfile; zwraca skopiowaną liczbę bajtów"""
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while offset < size:
+                copied = os.copy_file_range(infd, outfd, min(KERNEL_CHUNK, size - offset), offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+            return offset
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+
+    if hasattr(os, 'sendfile') and os.name == 'posix':
+        try:
+            os.lseek(outfd, offset, os.SEEK_SET)
+            while offset < size:
+                copied = os.sendfile(outfd, infd, offset, min(KERNEL_CHUNK, size - offset))
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+    return offset
+
+
+def same_file(source, destination):
+    """Czy obie ścieżki wskazują ten sam plik (cel nie musi istnieć)"""
+    try:
+        return os.path.samefile(source, destination)
+    except OSError:
+        return False
+
+
+def copy_file(source, destination, verify=False):
+    """Kopiuj plik z atrybutami; dane przechodzą przez jądro, gdy to możliwe"""
+    # Otwarcie celu ('wb') obcięłoby źródło do zera
+    if same_file(source, destination):
+        raise shutil.SameFileError(f"Nie można skopiować pliku na samego siebie: {source}")
+    with open(source, 'rb') as fsrc, open(destination, 'wb') as fdst:
+        infd = fsrc.fileno()
+        outfd = fdst.fileno()
+        size = os.fstat(infd).st_size
+        offset = _kernel_copy(infd, outfd, 0, size) if size else 0
+
+        # Reszta (albo całość) w pętli readinto z dużym buforem
+        if offset < size:
+            os.lseek(infd, offset, os.SEEK_SET)
+            os.lseek(outfd, offset, os.SEEK_SET)
+            buffer = bytearray(min(COPY_BUFFER, size - offset))
+            view = memoryview(buffer)
+            while True:
+                count = fsrc.readinto(buffer)
+                if not count:
+                    break
+                fdst.write(view[:count])
+    shutil.copystat(source, destination)
+    if verify:
+        verify_copy(source, destination)
+
+
+def verify_copy(source, destination):
+    """Porównaj kopię z oryginałem bajt po bajcie (OSError przy różnicy)"""
+    with open(source, 'rb', buffering=0) as fsrc, open(destination, 'rb', buffering=0) as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        if size != os.fstat(fdst.fileno()).st_size:
+            raise OSError(errno.EIO, "Weryfikacja nie powiodła się (rozmiar)", str(destination))
+        chunk_size = max(1, min(COPY_BUFFER, size))
+        while True:
+            chunk = fsrc.read(chunk_size)
+            if chunk != fdst.read(chunk_size):
+                raise OSError(errno.EIO, "Weryfikacja nie powiodła się (treść)", str(destination))
+            if not chunk:
+                return
+
+
+def plan_copies(pairs, resume=False):
+    """Rozmiary plików do skopiowania; przy resume pomija pliki już skopiowane
+
+    Plik jest skopiowany, gdy cel ma ten sam rozmiar i czas modyfikacji
+    (copystat ustawia go dopiero po zapisaniu wszystkich danych, więc
+    przerwana kopia się nie zgadza). Zwraca (pary, rozmiary, pominięte).
+    """
+    pending = []
+    sizes = []
+    skipped = 0
+    for source, destination in pairs:
+        st = os.stat(source)
+        if resume:
+            try:
+                done = os.stat(destination)
+            except OSError:
+                done = None
+            if (done is not None and done.st_size == st.st_size
+                    and abs(done.st_mtime - st.st_mtime) < 1):
+                skipped += 1
+                continue
+        pending.append((source, destination))
+        sizes.append(st.st_size)
+    return pending, sizes, skipped
+
+
+def move_path(source, destination):
+    """Przenieś plik lub katalog (rename, a między dyskami kopia i usunięcie)"""
+    if same_file(source, destination):
+        raise shutil.SameFileError(f"Nie można przenieść pliku na samego siebie: {source}")
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(source, destination, copy_function=copy_file)
+
+
+def remove_path(path):
+    """Usuń plik albo dowiązanie"""
+    os.unlink(path)
+
+
+def make_batches(items, sizes=None, batch=BULK_BATCH, batch_bytes=BULK_BATCH_BYTES):
+    """Porcje po batch sztuk; z rozmiarami także po batch_bytes bajtów"""
+    if sizes is None:
+        return [items[i:i + batch] for i in range(0, len(items), batch)]
+
+    batches = []
+    current = []
+    current_bytes = 0
+    for item, size in zip(items, sizes):
+        current.append(item)
+        current_bytes += size
+        if len(current) >= batch or current_bytes >= batch_bytes:
+            batches.append((current_bytes, current))
+            current = []
+            current_bytes = 0
+    if current:
+        batches.append((current_bytes, current))
+    # Największe porcje najpierw: duże pliki nie zostają na koniec
+    batches.sort(key=lambda pair: pair[0], reverse=True)
+    return [chunk for _, chunk in batches]
+
+
+def run_bulk(items, action, progress=None, sizes=None, workers=BULK_WORKERS):
+    """Wykonaj action(element) dla wszystkich elementów na puli wątków
+
+    Elementy trafiają do wątków porcjami (make_batches), więc przy podanych
+    rozmiarach duże pliki kopiowane są równolegle. progress(zrobione, razem)
+    wołane jest co PROGRESS_EVERY elementów. Zwraca listę par
+    (element, wyjątek) dla nieudanych operacji.
+    """
+    def run_batch(chunk):
+        failed = []
+        for item in chunk:
+            try:
+                action(item)
+            except Exception as e:
+                failed.append((item, e))
+        return len(chunk), failed
+
+    errors = []
+    total = len(items)
+    batches = make_batches(items, sizes)
+    if len(batches) <= 1:
+        return run_batch(items)[1]
+
+    done = 0
+    reported = 0
+    with ThreadPoolExecutor(workers) as pool:
+        futures = [pool.submit(run_batch, chunk) for chunk in batches]
+        for future in as_completed(futures):
+            count, failed = future.result()
+            errors.extend(failed)
+            done += count
+            if progress and done - reported >= PROGRESS_EVERY:
+                reported = done
+                progress(done, total)
+    return errors
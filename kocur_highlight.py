@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - podświetlanie składni w edytorze
+Przyrostowy lekser Pythona: po edycji przetwarzane są tylko zmienione linie
+"""
+
+import builtins
+import keyword
+import re
+import time
+
+# Kolory tagów w edytorze
+TAG_STYLES = {
+    'keyword': {'foreground': '#0000cc'},
+    'builtin': {'foreground': '#7a2ea0'},
+    'string': {'foreground': '#008000'},
+    'comment': {'foreground': '#808080'},
+    'number': {'foreground': '#b35900'},
+    'definition': {'foreground': '#005f87'},
+    'decorator': {'foreground': '#aa5500'},
+}
+
+# Czas pracy podświetlania na jeden krok pętli Tk (sekundy)
+IDLE_BUDGET = 0.005
+
+KEYWORDS = frozenset(keyword.kwlist)
+BUILTINS = frozenset(name for name in dir(builtins) if not name.startswith('_'))
+
+TOKEN_RE = re.compile(r"""
+    (?P<comment>\#.*)
+  | (?P<string>(?:[rRbBuUfF]{1,2})?(?:'''|\"\"\"|'(?:\\.|[^'\\])*'?|"(?:\\.|[^"\\])*"?))
+  | (?P<decorator>@[\w.]+)
+  | (?P<number>\b(?:0[xXoObB][0-9a-fA-F_]+|\d[\d_]*(?:\.[\d_]*)?(?:[eE][+-]?\d+)?[jJ]?)\b)
+  | (?P<name>[A-Za-z_]\w*)
+""", re.VERBOSE)
+
+
+class PythonLexer:
+    """Lekser linia po linii; stan to otwarty potrójny cudzysłów lub ''"""
+
+    def lex_line(self, line, state=''):
+        """Zwróć (lista (tag, początek, koniec), stan na końcu linii)"""
+        tokens = []
+        pos = 0
+
+        # Kontynuacja wieloliniowego napisu
+        if state:
+            end = line.find(state)
+            if end < 0:
+                return [('string', 0, len(line))], state
+            pos = end + 3
+            tokens.append(('string', 0, pos))
+            state = ''
+
+        previous_name = None
+        for match in TOKEN_RE.finditer(line, pos):
+            kind = match.lastgroup
+            start, end = match.span()
+
+            if kind == 'string':
+                text = match.group()
+                quote = text.lstrip('rRbBuUfF')[:3]
+                if quote in ("'''", '"""'):
+                    close = line.find(quote, end)
+                    if close < 0:
+                        tokens.append(('string', start, len(line)))
+                        return tokens, quote
+                    end = close + 3
+                    tokens.append(('string', start, end))
+                    # Pomiń dopasowania wewnątrz napisu
+                    return self._continue(line, end, tokens)
+                tokens.append(('string', start, end))
+            elif kind == 'name':
+                text = match.group()
+                if previous_name in ('def', 'class'):
+                    tokens.append(('definition', start, end))
+                elif text in KEYWORDS:
+                    tokens.append(('keyword', start, end))
+                elif text in BUILTINS:
+                    tokens.append(('builtin', start, end))
+                previous_name = text
+                continue
+            else:
+                tokens.append((kind, start, end))
+            previous_name = None
+
+        return tokens, state
+
+    def _continue(self, line, pos, tokens):
+        """Dokończ linię po zamkniętym potrójnym napisie"""
+        rest, state = self.lex_line(line[pos:])
+        tokens.extend((tag, start + pos, end + pos) for tag, start, end in rest)
+        return tokens, state
+
+
+class EditorHighlighter:
+    """Podświetlanie w widgecie Text z pamięcią stanu leksera dla każdej linii
+
+    Zmiany bufora przychodzą z TextChangeTracker, więc po edycji jako brudne
+    oznaczane są tylko dotknięte linie. Leksowanie odbywa się w czasie
+    bezczynności pętli Tk, porcjami ograniczonymi przez IDLE_BUDGET.
+    """
+
+    def __init__(self, widget, tracker, lexer=None):
+        self.widget = widget
+        self.tracker = tracker
+        self.lexer = lexer or PythonLexer()
+        self.enabled = False
+        self.states = []
+        self.dirty = []
+        self.scan_from = 0
+        self.scheduled = None
+
+        for tag, style in TAG_STYLES.items():
+            widget.tag_configure(tag, **style)
+        tracker.add_listener(self.lines_changed)
+
+    def lines_changed(self, first, old_count, new_count):
+        """Oznacz zmienione linie jako brudne (wywoływane przez tracker)"""
+        if not self.enabled:
+            return
+        index = first - 1
+        self.states[index:index + old_count] = [None] * new_count
+        self.dirty[index:index + old_count] = [True] * new_count
+        self.scan_from = min(self.scan_from, index)
+        self._schedule()
+
+    def set_enabled(self, enabled):
+        """Włącz lub wyłącz podświetlanie (wyłączenie czyści tagi)"""
+        self.enabled = enabled
+        if enabled:
+            self.reset()
+        else:
+            self._cancel()
+            self.states = []
+            self.dirty = []
+            for tag in TAG_STYLES:
+                self.widget.tag_remove(tag, '1.0', 'end')
+
+    def reset(self):
+        """Oznacz cały bufor do ponownego podświetlenia"""
+        count = self.tracker.line_count
+        self.states = [None] * count
+        self.dirty = [True] * count
+        self.scan_from = 0
+        self._schedule()
+
+    def _cancel(self):
+        if self.scheduled is not None:
+            self.widget.after_cancel(self.scheduled)
+            self.scheduled = None
+
+    def _schedule(self):
+        if self.scheduled is None:
+            self.scheduled = self.widget.after_idle(self._run)
+
+    def _run(self):
+        self.scheduled = None
+        if not self.enabled:
+            return
+        deadline = time.perf_counter() + IDLE_BUDGET
+        index = self.scan_from
+        while True:
+            try:
+                index = self.dirty.index(True, index)
+            except ValueError:
+                self.scan_from = len(self.dirty)
+                return
+            self._lex_line(index)
+            index += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.scan_from = index
+        self.scheduled = self.widget.after(1, self._run)
+
+    def _lex_line(self, index):
+        call = self.tracker.call
+        line_no = index + 1
+        start_state = self.states[index - 1] if index > 0 else ''
+        text = call('get', f"{line_no}.0", f"{line_no}.end")
+        tokens, end_state = self.lexer.lex_line(text, start_state or '')
+
+        for tag in TAG_STYLES:
+            call('tag', 'remove', tag, f"{line_no}.0", f"{line_no}.end")
+        for tag, start, end in tokens:
+            call('tag', 'add', tag, f"{line_no}.{start}", f"{line_no}.{end}")
+
+        self.dirty[index] = False
+        if end_state != self.states[index]:
+            self.states[index] = end_state
+            # Zmiana stanu (np. otwarty napis) przechodzi na następną linię
+            if index + 1 < len(self.dirty):
+                self.dirty[index + 1] = True
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - historia komend
+Plik dopisywany po każdej komendzie. Przy starcie jest tylko mapowany
+(mmap); strzałka w górę czyta go od końca linia po linii, a indeks do
+wyszukiwania wstecz (Ctrl+R) powstaje przy pierwszym wyszukiwaniu.
+Plik większy niż COMPACT_BYTES jest kompaktowany przy starcie albo
+przy dopisywaniu, gdy ma ponad 2 * HISTORY_LIMIT wpisów.
+"""
+
+import mmap
+import os
+from bisect import bisect_right
+from itertools import accumulate
+
+from kocur_fileio import atomic_write
+
+# Ile różnych komend zostaje po kompaktowaniu pliku
+HISTORY_LIMIT = 100_000
+
+# Od tego rozmiaru pliku (bajty) sprawdzamy, czy trzeba go kompaktować
+COMPACT_BYTES = 8 * 1024 * 1024
+
+
+class SearchIndex:
+    """Wszystkie wpisy w jednym napisie (małe litery) i początki wpisów
+
+    Wyszukiwanie to rfind w napisie i bisect po początkach, więc nawet
+    przy 100 tys. wpisów odbywa się w kodzie C, bez pętli po wpisach.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        lengths = [len(entry) for entry in entries]
+        self.text = '\n'.join(entries).lower()
+        if len(self.text) != sum(lengths) + max(0, len(entries) - 1):
+            # Niektóre znaki zmieniają długość po lower() (np. İ)
+            lowered = [entry.lower() for entry in entries]
+            lengths = [len(entry) for entry in lowered]
+            self.text = '\n'.join(lowered)
+        self.starts = list(accumulate((length + 1 for length in lengths), initial=0))[:-1]
+
+    def add(self, entry):
+        if self.entries:
+            self.text += '\n'
+        self.starts.append(len(self.text))
+        self.text += entry.lower()
+        self.entries.append(entry)
+
+    def find(self, query, before):
+        """Numer najnowszego wpisu < before zawierającego query (lub -1)"""
+        if before <= 0:
+            return -1
+        end = self.starts[before] - 1 if before < len(self.starts) else len(self.text)
+        position = self.text.rfind(query.lower(), 0, end)
+        if position < 0:
+            return -1
+        return bisect_right(self.starts, position) - 1
+
+
+class CommandHistory:
+    """Historia komend zapisywana w pliku (bez kolejnych powtórzeń)"""
+
+    def __init__(self, path, limit=HISTORY_LIMIT):
+        self.path = str(path)
+        self.limit = limit
+        self.map = None
+        self.map_end = 0
+        self.older = []     # wpisy z pliku czytane od końca (najnowszy pierwszy)
+        self.session = []   # wpisy z tej sesji (najstarszy pierwszy)
+        self.index = None
+        self.last = None
+        self.size = 0
+        self.compact_at = COMPACT_BYTES
+
+        try:
+            with open(self.path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self.map_end = len(self.map)
+                    self.size = self.map_end
+        except OSError:
+            pass
+        self.check_size()
+        self.last = self.entry(1)
+
+    def add(self, command):
+        """Dopisz komendę (powtórzenie poprzedniej jest pomijane)"""
+        command = command.strip()
+        if not command or '\n' in command or command == self.last:
+            return
+        self.last = command
+        self.session.append(command)
+        if self.index is not None:
+            self.index.add(command)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(command + '\n')
+        except OSError:
+            return
+        self.size += len(command.encode('utf-8')) + 1
+        self.check_size()
+
+    def entry(self, number):
+        """Wpis numer number licząc od najnowszego (1); None za najstarszym"""
+        if number < 1:
+            return None
+        if self.index is not None:
+            entries = self.index.entries
+            return entries[-number] if number <= len(entries) else None
+        if number <= len(self.session):
+            return self.session[-number]
+        number -= len(self.session)
+        while len(self.older) < number and self._read_older():
+            pass
+        return self.older[number - 1] if number <= len(self.older) else None
+
+    def _read_older(self):
+        """Przeczytaj z mapy jeden starszy wpis; False gdy plik się skończył"""
+        while self.map_end > 0:
+            end = self.map_end
+            if self.map[end - 1] == 0x0a:
+                end -= 1
+            start = self.map.rfind(b'\n', 0, end) + 1
+            self.map_end = start
+            line = self.map[start:end].decode('utf-8', 'replace').strip()
+            if line and (not self.older or self.older[-1] != line):
+                self.older.append(line)
+                return True
+        return False
+
+    def search_index(self):
+        """Indeks wyszukiwania (cała historia); buduje go przy pierwszym użyciu"""
+        if self.index is None:
+            entries = []
+            if self.map is not None:
+                text = self.map[:].decode('utf-8', 'replace')
+                entries = [line for line in text.split('\n') if line.strip()]
+                self.map.close()
+                self.map = None
+            entries.extend(self.session)
+            if len(entries) > 2 * self.limit:
+                entries = self._compact(entries)
+            self.index = SearchIndex(entries)
+        return self.index
+
+    def check_size(self):
+        """Kompaktuj plik, który urósł - także gdy nikt nie używa Ctrl+R"""
+        if self.size <= self.compact_at:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+                entries = [line.strip() for line in f if line.strip()]
+        except OSError:
+            return
+        if len(entries) > 2 * self.limit:
+            entries = self._compact(entries)
+            self.size = sum(len(entry.encode('utf-8')) + 1 for entry in entries)
+            # Wpisy są już w pamięci: od teraz historia to indeks
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            self.older = []
+            self.index = SearchIndex(entries)
+        # Następne sprawdzenie dopiero, gdy plik znowu się podwoi
+        self.compact_at = max(COMPACT_BYTES, 2 * self.size)
+
+    def _compact(self, entries):
+        """Zostaw ostatnie użycie każdej komendy (najwyżej limit wpisów)"""
+        seen = set()
+        kept = []
+        for entry in reversed(entries):
+            if entry not in seen:
+                seen.add(entry)
+                kept.append(entry)
+                if len(kept) >= self.limit:
+                    break
+        kept.reverse()
+        try:
+            atomic_write(self.path, (entry + '\n' for entry in kept))
+        except OSError:
+            pass
+        return kept
+
+
+class ReverseSearch:
+    """Wyszukiwanie wstecz (Ctrl+R): kolejne, coraz starsze, różne dopasowania"""
+
+    def __init__(self, history):
+        self.index = history.search_index()
+        self.query = ''
+        self.position = len(self.index.entries)
+        self.seen = set()
+        self.match = None
+
+    def search(self, query):
+        """Nowe zapytanie: szukaj od najnowszego wpisu"""
+        self.query = query
+        self.position = len(self.index.entries)
+        self.seen = set()
+        self.match = None
+        return self.next() if query else None
+
+    def next(self):
+        """Następne starsze dopasowanie (None gdy brak - bieżące zostaje)"""
+        if not self.query:
+            return None
+        position = self.position
+        while True:
+            position = self.index.find(self.query, position)
+            if position < 0:
+                return None
+            entry = self.index.entries[position]
+            if entry not in self.seen:
+                self.seen.add(entry)
+                self.position = position
+                self.match = entry
+                return entry
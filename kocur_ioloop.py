@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - jeden wątek wejścia/wyjścia dla wszystkich procesów
+Wyjście programów (potoki i pseudoterminale) czyta pętla selektora;
+zakończenie procesu sygnalizuje pidfd (Linux), a gdzie go brak -
+okresowe poll(). Dziesiątki działających programów to nadal jeden wątek.
+Zakończony proces odbiera wait4 - z kodem wyjścia przychodzi zużycie zasobów.
+W Windows selektor obsługuje tylko gniazda: tam (i dla procesu, którego
+pętla nie umiała obsłużyć) wyjście czytają osobne wątki, jak dawniej.
+"""
+
+import codecs
+import os
+import selectors
+import subprocess
+import threading
+import time
+
+from kocur_procstat import usage_from_rusage
+
+# Ile bajtów z jednego strumienia na obrót pętli (sprawiedliwy podział)
+READ_CHUNK = 65536
+
+# Co ile sekund sprawdzać procesy bez pidfd i limity czasu
+POLL_INTERVAL = 0.1
+
+# Potoki w selektorze (Windows: tylko gniazda, os.set_blocking bez potoków)
+SELECT_PIPES = os.name != 'nt'
+
+
+class ProcessWatch:
+    """Proces obsługiwany przez pętlę; join() czeka jak Thread.join()"""
+
+    def __init__(self, process, outputs, finished, timeout, name=None):
+        self.process = process
+        self.name = name
+        self.started = time.monotonic()
+        # Liczniki /proc z chwili startu (proces z puli działał już wcześniej)
+        self.baseline = None
+        # deskryptor -> (strumień, funkcja zapisu, dekoder)
+        self.streams = {
+            stream.fileno(): (stream, write, codecs.getincrementaldecoder('utf-8')('replace'))
+            for stream, write in outputs
+        }
+        self.finished = finished
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.pidfd = None
+        self.exited = False
+        self.timed_out = False
+        self.returncode = None
+        # Zużycie zasobów po końcu (kocur_procstat.usage_from_rusage) albo None
+        self.usage = None
+        self.done = threading.Event()
+
+    def join(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def is_alive(self):
+        return not self.done.is_set()
+
+
+class ProcessLoop:
+    """Pętla selektora z własnym wątkiem (uruchamianym przy pierwszym procesie)"""
+
+    def __init__(self):
+        self.selector = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.incoming = []
+        self.watches = []
+        # Procesy obsługiwane wątkami (bez selektora)
+        self.threaded = []
+        self.wake_read = self.wake_write = None
+
+    def watch(self, process, outputs, finished=None, timeout=None, name=None):
+        """Obsługuj proces: outputs to pary (strumień, write(tekst))
+
+        write i finished(watch) wołane są w wątku pętli; finished po
+        zakończeniu procesu i przeczytaniu całego wyjścia. Po timeout
+        sekundach proces jest zabijany (watch.timed_out). name - nazwa w ps.
+        """
+        watch = ProcessWatch(process, outputs, finished, timeout, name)
+        if not SELECT_PIPES:
+            self.start_threads(watch)
+            return watch
+        with self.lock:
+            if self.thread is None:
+                self.selector = selectors.DefaultSelector()
+                self.wake_read, self.wake_write = os.pipe()
+                os.set_blocking(self.wake_read, False)
+                os.set_blocking(self.wake_write, False)
+                self.selector.register(self.wake_read, selectors.EVENT_READ, ('wake', None))
+                self.thread = threading.Thread(target=self.run, name='kocur-io', daemon=True)
+                self.thread.start()
+            self.incoming.append(watch)
+        self.wake()
+        return watch
+
+    def running(self):
+        """Obsługiwane procesy (dla ps/top)"""
+        with self.lock:
+            return self.incoming + list(self.watches) + list(self.threaded)
+
+    def wake(self):
+        try:
+            os.write(self.wake_write, b'\0')
+        except BlockingIOError:
+            pass
+
+    def run(self):
+        while True:
+            for key, _ in self.selector.select(self.select_timeout()):
+                kind, watch = key.data
+                if kind == 'wake':
+                    self.accept_new()
+                    continue
+                # Błąd jednego procesu nie może zatrzymać pętli pozostałych
+                try:
+                    if kind == 'exit':
+                        self.selector.unregister(key.fd)
+                        os.close(key.fd)
+                        watch.pidfd = None
+                        watch.exited = True
+                    else:
+                        self.read(watch, key.fd)
+                except Exception:
+                    self.abandon(watch)
+            self.check_processes()
+
+    def select_timeout(self):
+        if any(watch.pidfd is None or watch.deadline for watch in self.watches):
+            return POLL_INTERVAL
+        return None
+
+    def accept_new(self):
+        try:
+            while os.read(self.wake_read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        with self.lock:
+            incoming, self.incoming = self.incoming, []
+        for watch in incoming:
+            try:
+                self.register(watch)
+            except Exception:
+                # Strumień, którego selektor nie obsłuży - proces dostaje własne wątki
+                self.unregister(watch)
+                self.start_threads(watch)
+                continue
+            self.watches.append(watch)
+
+    def register(self, watch):
+        for fd in watch.streams:
+            os.set_blocking(fd, False)
+            self.selector.register(fd, selectors.EVENT_READ, ('output', watch))
+        # pidfd tylko dla własnych procesów (skrypt z puli działa w cudzym)
+        if hasattr(os, 'pidfd_open') and isinstance(watch.process, subprocess.Popen):
+            try:
+                watch.pidfd = os.pidfd_open(watch.process.pid)
+                self.selector.register(watch.pidfd, selectors.EVENT_READ, ('exit', watch))
+            except OSError:
+                # Starsze jądro albo proces już zakończony - zostaje poll()
+                watch.pidfd = None
+
+    def unregister(self, watch):
+        """Odłącz proces od selektora (strumienie zostają otwarte)"""
+        for fd in list(watch.streams):
+            try:
+                self.selector.unregister(fd)
+            except (KeyError, ValueError):
+                pass
+        if watch.pidfd is not None:
+            try:
+                self.selector.unregister(watch.pidfd)
+            except (KeyError, ValueError):
+                pass
+            os.close(watch.pidfd)
+            watch.pidfd = None
+
+    def abandon(self, watch):
+        """Proces, którego obsługa w pętli zawiodła: dalej obsługują go wątki"""
+        if watch not in self.watches:
+            return
+        self.watches.remove(watch)
+        self.unregister(watch)
+        self.start_threads(watch)
+
+    def read(self, watch, fd):
+        """Jedna porcja ze strumienia; False gdy nic nie czeka albo koniec"""
+        stream, write, decoder = watch.streams[fd]
+        try:
+            data = os.read(fd, READ_CHUNK)
+        except BlockingIOError:
+            return False
+        except OSError:
+            # Pseudoterminal zgłasza EIO po zamknięciu ostatniej kopii końca programu
+            data = b''
+        text = decoder.decode(data, final=not data)
+        if text:
+            self.call(write, text)
+        if not data:
+            self.close_stream(watch, fd)
+            return False
+        return True
+
+    def close_stream(self, watch, fd):
+        stream = watch.streams.pop(fd)[0]
+        self.selector.unregister(fd)
+        try:
+            stream.close()
+        except OSError:
+            pass
+
+    def check_processes(self):
+        now = time.monotonic()
+        for watch in list(self.watches):
+            process = watch.process
+            try:
+                if not watch.exited:
+                    if watch.deadline and now >= watch.deadline:
+                        watch.timed_out = True
+                        watch.deadline = None
+                        process.kill()
+                    if watch.pidfd is None and self.has_exited(process):
+                        watch.exited = True
+                if watch.exited:
+                    self.finish(watch)
+            except Exception:
+                if watch in self.watches:
+                    self.abandon(watch)
+                elif not watch.done.is_set():
+                    # Błąd po odebraniu procesu w finish(): kod już jest, czekający nie mogą wisieć
+                    if watch.finished:
+                        self.call(watch.finished, watch)
+                    watch.done.set()
+
+    def has_exited(self, process):
+        if isinstance(process, subprocess.Popen) and process.returncode is None and hasattr(os, 'waitid'):
+            # WNOWAIT: proces zostaje do odebrania przez wait4 w finish()
+            try:
+                return os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
+            except ChildProcessError:
+                pass
+        return process.poll() is not None
+
+    def reap(self, process):
+        """Kod wyjścia i zużycie zasobów zakończonego procesu"""
+        if isinstance(process, subprocess.Popen) and process.returncode is None and hasattr(os, 'wait4'):
+            try:
+                _, status, rusage = os.wait4(process.pid, 0)
+            except ChildProcessError:
+                # Proces odebrał już ktoś inny (np. poll() w stop)
+                pass
+            else:
+                process.returncode = os.waitstatus_to_exitcode(status)
+                return process.returncode, usage_from_rusage(rusage)
+        return process.wait(), getattr(process, 'usage', None)
+
+    def finish(self, watch):
+        process = watch.process
+        watch.returncode, watch.usage = self.reap(process)
+        # Dopiero po odebraniu: błąd reap() zostawia proces do abandon() (wątki i done)
+        self.watches.remove(watch)
+        # Wejście najpierw: w pseudoterminalu to ten sam deskryptor co wyjście
+        if process.stdin:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+        # Proces już nic nie dopisze: reszta danych czeka w buforach
+        for fd in list(watch.streams):
+            while self.read(watch, fd):
+                pass
+            if fd in watch.streams:
+                self.close_stream(watch, fd)
+        if watch.finished:
+            self.call(watch.finished, watch)
+        watch.done.set()
+
+    def start_threads(self, watch):
+        """Obsługa procesu wątkami: czytelnik na strumień i wątek czekający na koniec"""
+        with self.lock:
+            self.threaded.append(watch)
+        readers = [threading.Thread(target=self.pump, args=(watch, fd), daemon=True)
+                   for fd in list(watch.streams)]
+        for reader in readers:
+            reader.start()
+        threading.Thread(target=self.wait_process, args=(watch, readers), daemon=True).start()
+
+    def pump(self, watch, fd):
+        stream, write, decoder = watch.streams[fd]
+        try:
+            # Strumień mógł być już w selektorze (abandon)
+            os.set_blocking(fd, True)
+        except OSError:
+            pass
+        while True:
+            try:
+                data = os.read(fd, READ_CHUNK)
+            except OSError:
+                data = b''
+            text = decoder.decode(data, final=not data)
+            if text:
+                self.call(write, text)
+            if not data:
+                break
+        try:
+            stream.close()
+        except OSError:
+            pass
+
+    def wait_process(self, watch, readers):
+        process = watch.process
+        try:
+            if not watch.exited:
+                timeout = max(0.0, watch.deadline - time.monotonic()) if watch.deadline else None
+                try:
+                    process.wait(timeout)
+                except subprocess.TimeoutExpired:
+                    watch.timed_out = True
+                    process.kill()
+            watch.exited = True
+            watch.returncode, watch.usage = self.reap(process)
+        except Exception:
+            watch.returncode = process.poll()
+        # Całe wyjście przed zamknięciem wejścia (w pseudoterminalu to ten sam deskryptor)
+        for reader in readers:
+            reader.join()
+        if process.stdin:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+        with self.lock:
+            self.threaded.remove(watch)
+        if watch.finished:
+            self.call(watch.finished, watch)
+        watch.done.set()
+
+    def call(self, function, *args):
+        # Błąd w funkcji zapisu nie może zatrzymać pętli innych procesów
+        try:
+            function(*args)
+        except Exception:
+            pass
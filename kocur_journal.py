@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - dziennik autozapisu edytora
+Dopisywany dziennik zmian (JSON lines) do odzyskiwania niezapisanej pracy
+"""
+
+import json
+import os
+
+from kocur_fileio import atomic_write
+
+# Po tylu wpisach dziennik jest kompaktowany do jednego wpisu zmiany
+COMPACT_RECORDS = 200
+
+
+class DirtyRegion:
+    """Zakres linii różniący bufor od stanu zapisanego w dzienniku
+
+    Linie [lo, old_end) zapisanego stanu odpowiadają liniom [lo, new_end)
+    bufora (numeracja od 0); poza zakresem oba stany są identyczne.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.lo = None
+        self.old_end = None
+        self.new_end = None
+
+    @property
+    def clean(self):
+        return self.lo is None
+
+    def update(self, first, old_count, new_count):
+        """Linie bufora [first, first + old_count) zastąpiono new_count liniami"""
+        end = first + old_count
+        if self.lo is None:
+            self.lo, self.old_end, self.new_end = first, end, end
+        self.old_end += max(0, end - self.new_end)
+        self.new_end = max(self.new_end, end) + new_count - old_count
+        self.lo = min(self.lo, first)
+
+
+class EditJournal:
+    """Dziennik zmian jednego dokumentu
+
+    Pierwszy wpis ('base') to stan wyjściowy: odwołanie do pliku na dysku
+    (rozmiar i mtime) albo pełny tekst nowego dokumentu. Kolejne wpisy
+    ('splice') zastępują zakres linii nowymi liniami.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file_path = None
+        self.base = None
+        self.pending = DirtyRegion()
+        self.total = DirtyRegion()
+        self.records = 0
+        self.marked = None
+
+    # Stan wyjściowy
+    def start_from_file(self, file_path):
+        """Rozpocznij dziennik dla bufora równego plikowi na dysku"""
+        st = os.stat(file_path)
+        self._start({'op': 'base', 'file': str(file_path),
+                     'size': st.st_size, 'mtime_ns': st.st_mtime_ns})
+
+    def start_from_text(self, text, file_path=None):
+        """Rozpocznij dziennik dla bufora o podanej treści"""
+        self._start({'op': 'base', 'file': file_path and str(file_path), 'text': text})
+
+    def stop(self):
+        """Zakończ dziennik (np. przy wczytywaniu innego pliku)"""
+        self.base = None
+        self.file_path = None
+        self.marked = None
+        self.discard()
+
+    def _start(self, base):
+        self.base = base
+        self.file_path = base['file']
+        self.pending.clear()
+        self.total.clear()
+        self.records = 0
+        self.marked = None
+        self.discard()
+
+    # Zmiany
+    def lines_changed(self, first, old_count, new_count):
+        """Słuchacz TextChangeTracker (numeracja linii od 1)"""
+        if self.base is None:
+            return
+        self.pending.update(first - 1, old_count, new_count)
+        self.total.update(first - 1, old_count, new_count)
+
+    @property
+    def dirty(self):
+        return not self.pending.clean
+
+    def flush(self, get_lines):
+        """Dopisz zmieniony zakres; get_lines(lo, hi) zwraca linie bufora"""
+        if self.base is None or self.pending.clean:
+            return
+        region = self.pending
+        record = {'op': 'splice', 'start': region.lo, 'end': region.old_end,
+                  'lines': get_lines(region.lo, region.new_end)}
+        if self.marked is not None:
+            self.marked.append(record)
+        self.pending.clear()
+
+        if not os.path.exists(self.path):
+            self._rewrite([self.base, record])
+            self.records = 1
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+        self.records += 1
+        if self.records >= COMPACT_RECORDS:
+            self.compact(get_lines)
+
+    def compact(self, get_lines):
+        """Zastąp wszystkie wpisy jednym zakresem zmian od stanu wyjściowego"""
+        region = self.total
+        records = [self.base]
+        if not region.clean:
+            records.append({'op': 'splice', 'start': region.lo, 'end': region.old_end,
+                            'lines': get_lines(region.lo, region.new_end)})
+        self._rewrite(records)
+        self.records = len(records) - 1
+
+    def _rewrite(self, records):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        atomic_write(self.path, (json.dumps(record) + '\n' for record in records))
+
+    # Zapis pliku przez edytor
+    def mark(self, get_lines):
+        """Zapamiętaj stan przed zapisem pliku (wołane przy migawce bufora)"""
+        self.flush(get_lines)
+        self.marked = []
+
+    def cancel_mark(self):
+        """Zapis pliku nie powiódł się"""
+        self.marked = None
+
+    def rebase_on_file(self, file_path):
+        """Plik zapisany: nowy stan wyjściowy to plik + zmiany od migawki"""
+        marked = self.marked or []
+        pending = self.pending
+        self.start_from_file(file_path)
+
+        # Zmiany dopisane po migawce odnoszą się już do zapisanego pliku
+        for record in marked:
+            self.total.update(record['start'], record['end'] - record['start'],
+                              len(record['lines']))
+        if marked:
+            self._rewrite([self.base] + marked)
+            self.records = len(marked)
+
+        # Zmiany jeszcze niedopisane czekają na następny flush
+        self.pending = pending
+        if not pending.clean:
+            self.total.update(pending.lo, pending.old_end - pending.lo,
+                              pending.new_end - pending.lo)
+
+    def discard(self):
+        """Usuń plik dziennika"""
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def replay_journal(path):
+    """Odtwórz dokument z dziennika; zwraca (ścieżka pliku, tekst)
+
+    Rzuca ValueError, gdy stan wyjściowy nie zgadza się z plikiem na dysku.
+    """
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # Niedokończony ostatni wpis (awaria w trakcie dopisywania)
+                break
+    if not records or records[0].get('op') != 'base':
+        raise ValueError("Uszkodzony dziennik")
+
+    base = records[0]
+    if 'text' in base:
+        text = base['text']
+    else:
+        st = os.stat(base['file'])
+        if st.st_size != base['size'] or st.st_mtime_ns != base['mtime_ns']:
+            raise ValueError(f"Plik zmienił się od początku dziennika: {base['file']}")
+        with open(base['file'], 'r', encoding='utf-8') as f:
+            text = f.read()
+
+    lines = text.split('\n')
+    for record in records[1:]:
+        lines[record['start']:record['end']] = record['lines']
+    return base['file'], '\n'.join(lines)
+
+
+def journal_matches_file(file_path, text):
+    """Czy odtworzony tekst jest taki sam jak plik na dysku"""
+    if not file_path or not os.path.exists(file_path):
+        return False
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read() == text
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - dziennik sesji (JSON lines)
+Zdarzenia: komendy, start i koniec programów, sprawdzanie i pobieranie
+aktualizacji. Wywołujący tylko wkłada rekord do kolejki; plik zapisuje
+wątek QueueListener, który też obraca dziennik po LOG_MAX_BYTES
+i pakuje stare części gzipem - wątek Tk nigdy nie czeka na dysk.
+"""
+
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+
+LOGGER_NAME = "kocurdos"
+
+# Rozmiar części dziennika i liczba starych części (.1.gz, .2.gz, ...)
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 5
+
+logger = logging.getLogger(LOGGER_NAME)
+# Przed start_logging zdarzenia (także ostrzeżenia) nie trafiają na stderr przez lastResort
+logger.addHandler(logging.NullHandler())
+
+
+class JsonFormatter(logging.Formatter):
+    """Jedna linia JSON na zdarzenie: czas, poziom, nazwa zdarzenia i pola"""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created))
+                  + f".{int(record.msecs):03d}",
+            'level': record.levelname.lower(),
+            'event': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['error'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class GzipRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler ze starymi częściami spakowanymi gzipem"""
+
+    def __init__(self, filename, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True)
+        self.namer = lambda name: name + '.gz'
+        self.rotator = self.compress
+
+    @staticmethod
+    def compress(source, destination):
+        with open(source, 'rb') as src, gzip.open(destination, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+
+def start_logging(directory, filename="session.log"):
+    """Włącz dziennik w katalogu; zwraca QueueListener (stop() przy wyjściu)"""
+    os.makedirs(directory, exist_ok=True)
+    file_handler = GzipRotatingFileHandler(os.path.join(directory, filename))
+    file_handler.setFormatter(JsonFormatter())
+    # SimpleQueue bez limitu: put() nigdy nie czeka
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, file_handler)
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener.start()
+    return listener
+
+
+def log_enabled(level=logging.INFO):
+    """Czy dziennik przyjmie zdarzenie (przed liczeniem jego pól)"""
+    return logger.isEnabledFor(level)
+
+
+def log_event(event, level=logging.INFO, **fields):
+    """Zapisz zdarzenie (bez włączonego dziennika - jedno sprawdzenie poziomu)"""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={'fields': fields})
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - pomiary czasu własnych operacji powłoki i GUI
+Liczniki i histogramy wokół gorących miejsc (komendy, wstawianie tekstu
+do terminala, odświeżanie explorera). Domyślnie wyłączone: wtedy pomiar
+to jedno sprawdzenie flagi. Włączanie: KOCURDOS_METRICS=1, --metrics
+albo komenda stats on. Eksport jako JSON albo tekst Prometheusa.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+
+# Granice koszyków histogramu (sekundy), jak domyślne w klientach Prometheusa
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+METRIC_NAME = "kocurdos_operation_duration_seconds"
+
+
+class Histogram:
+    """Czasy jednej operacji: liczba, suma, maksimum i koszyki"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Ostatni koszyk: ponad BUCKETS[-1] (+Inf)
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def quantile(self, q):
+        """Przybliżony kwantyl: górna granica koszyka (dla ostatniego - maksimum)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """Rejestr histogramów operacji (wspólny dla powłoki i GUI)"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def timed(self, name):
+        """Dekorator: czas każdego wywołania funkcji (gdy pomiary są włączone)"""
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+    def rows(self):
+        """Wiersze dla stats i zakładki Metryki: (nazwa, liczba, suma, średnia, p50, p95, maks.)"""
+        with self.lock:
+            items = sorted(self.histograms.items())
+            return [(name, h.count, h.total, h.total / h.count, h.quantile(0.5), h.quantile(0.95), h.max)
+                    for name, h in items]
+
+    def to_json(self):
+        with self.lock:
+            data = {
+                name: {
+                    'count': h.count,
+                    'sum': h.total,
+                    'max': h.max,
+                    'buckets': {str(bound): count for bound, count in zip(BUCKETS + ('+Inf',), h.buckets)},
+                }
+                for name, h in sorted(self.histograms.items())
+            }
+        return json.dumps({'enabled': self.enabled, 'operations': data}, indent=2)
+
+    def to_prometheus(self):
+        """Format tekstowy Prometheusa (koszyki narastająco, jak wymaga format)"""
+        lines = [f"# HELP {METRIC_NAME} Czas operacji KocurDOS",
+                 f"# TYPE {METRIC_NAME} histogram"]
+        with self.lock:
+            for name, h in sorted(self.histograms.items()):
+                label = f'operation="{name}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ('+Inf',), h.buckets):
+                    cumulative += count
+                    lines.append(f'{METRIC_NAME}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f"{METRIC_NAME}_sum{{{label}}} {h.total}")
+                lines.append(f"{METRIC_NAME}_count{{{label}}} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(enabled=os.environ.get('KOCURDOS_METRICS', '') not in ('', '0'))
+
+
+def format_rows(rows):
+    """Tabela stats (czasy w ms)"""
+    lines = [f"{'OPERACJA':<20} {'LICZBA':>8} {'SUMA ms':>10} {'ŚR. ms':>8} {'P50 ms':>8} "
+             f"{'P95 ms':>8} {'MAKS. ms':>9}"]
+    for name, count, total, mean, p50, p95, peak in rows:
+        lines.append(f"{name:<20} {count:>8} {total * 1000:>10.1f} {mean * 1000:>8.3f} {p50 * 1000:>8.3f} "
+                     f"{p95 * 1000:>8.3f} {peak * 1000:>9.3f}")
+    return lines
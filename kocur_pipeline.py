@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - potoki i przekierowania (|, >, >>, <)
+Etapy połączone są prawdziwymi potokami systemowymi i działają
+równolegle, więc dane płyną strumieniowo między komendami
+"""
+
+import os
+import subprocess
+import threading
+
+
+class PipelineError(Exception):
+    """Błąd uruchomienia potoku"""
+
+
+class StreamOutput:
+    """Wyjście powłoki zapisujące linie do strumienia (potok lub plik)"""
+
+    exit_requested = False
+
+    def __init__(self, stream, parent):
+        self.stream = stream
+        self.parent = parent
+
+    def write(self, text):
+        self.stream.write(text + '\n')
+
+    def write_raw(self, text):
+        self.stream.write(text)
+
+    def clear(self):
+        pass
+
+    def exit(self):
+        self.parent.exit()
+
+    def directory_changed(self, path):
+        self.parent.directory_changed(path)
+
+
+class LineWriter:
+    """Wyjście procesu z pętli procesów jako całe linie (według szablonu)"""
+
+    def __init__(self, output, template):
+        self.output = output
+        self.template = template
+        self.partial = ''
+
+    def __call__(self, text):
+        *lines, self.partial = (self.partial + text).split('\n')
+        for line in lines:
+            self.output.write(self.template.format(line))
+
+    def flush(self):
+        if self.partial:
+            self.output.write(self.template.format(self.partial))
+            self.partial = ''
+
+
+class Pipeline:
+    """Uruchomienie etapów: wbudowane komendy w wątkach, Python w procesach"""
+
+    def __init__(self, shell, stages):
+        self.shell = shell
+        self.stages = stages
+        # Etapy piszą z własnych wątków - wyjście powłoki musi to przyjąć (TerminalOutput)
+        self.terminal = shell.output
+        self.threads = []
+        self.processes = []
+        self.watches = []
+        self.codes = [0] * len(stages)
+
+    def start(self):
+        """Otwórz pliki i potoki, uruchom wszystkie etapy"""
+        shell = self.shell
+        count = len(self.stages)
+        opened = []
+        try:
+            # Końce potoków: wejście etapu i to wyjście etapu i - 1
+            inputs = [None] * count
+            outputs = [None] * count
+            for i in range(1, count):
+                read_fd, write_fd = os.pipe()
+                inputs[i] = read_fd
+                outputs[i - 1] = write_fd
+                opened.extend((read_fd, write_fd))
+
+            for i, stage in enumerate(self.stages):
+                if stage.stdin_path:
+                    fd = os.open(str(shell.resolve_path(stage.stdin_path)), os.O_RDONLY)
+                    opened.append(fd)
+                    self._replace(inputs, i, fd, opened)
+                if stage.stdout_path:
+                    flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if stage.append else os.O_TRUNC)
+                    fd = os.open(str(shell.resolve_path(stage.stdout_path)), flags, 0o666)
+                    opened.append(fd)
+                    self._replace(outputs, i, fd, opened)
+        except OSError as e:
+            for fd in opened:
+                os.close(fd)
+            raise PipelineError(f"{e.strerror}: {e.filename}")
+
+        for i, stage in enumerate(self.stages):
+            if stage.is_python:
+                self._start_python(i, stage, inputs[i], outputs[i])
+            else:
+                self._start_builtin(i, stage, inputs[i], outputs[i])
+
+    def _replace(self, ends, index, fd, opened):
+        # Plik ma pierwszeństwo przed potokiem (dir > a.txt | find x)
+        if ends[index] is not None:
+            os.close(ends[index])
+            opened.remove(ends[index])
+        ends[index] = fd
+
+    def _start_builtin(self, index, stage, stdin_fd, stdout_fd):
+        # Strumienie przejmują deskryptory i zamykają je po zakończeniu etapu
+        stdin = os.fdopen(stdin_fd, 'r', encoding='utf-8', errors='replace') if stdin_fd is not None else None
+        stdout = os.fdopen(stdout_fd, 'w', encoding='utf-8') if stdout_fd is not None else None
+
+        def run():
+            shell = self.shell
+            output = StreamOutput(stdout, self.terminal) if stdout else self.terminal
+            with shell.redirected(output, stdin):
+                try:
+                    self.codes[index] = shell.run_handler(stage.name, shell.commands.get(stage.name), stage.args)
+                except BrokenPipeError:
+                    # Następny etap zakończył się wcześniej
+                    self.codes[index] = 0
+                finally:
+                    for stream in (stdin, stdout):
+                        if stream is not None:
+                            try:
+                                stream.close()
+                            except BrokenPipeError:
+                                pass
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def _start_python(self, index, stage, stdin_fd, stdout_fd):
+        shell = self.shell
+        args = stage.words[1:]
+        try:
+            if not args:
+                raise PipelineError("Użycie: python <plik.py>")
+            script_path = shell.resolve_path(args[0])
+            if not script_path.exists():
+                raise PipelineError(f"Plik nie istnieje: {args[0]}")
+            # Jak komenda python (pula, kod bajtowy), ale bez pseudoterminala:
+            # wejście i wyjście etapu to potoki albo pliki
+            process = shell.spawn_python(script_path, args[1:],
+                                         stdin_fd if stdin_fd is not None else subprocess.DEVNULL,
+                                         stdout=stdout_fd)
+        except (PipelineError, OSError) as e:
+            self.terminal.write(f"Błąd: {e}")
+            self.codes[index] = 1
+            process = None
+        finally:
+            # Proces ma już własne kopie deskryptorów
+            for fd in (stdin_fd, stdout_fd):
+                if fd is not None:
+                    os.close(fd)
+        if process is None:
+            return
+
+        self.processes.append((index, process))
+        shell.current_process = process
+        # Linie procesu trafiają do terminala na bieżąco (wspólny wątek pętli procesów)
+        writers = []
+        if stdout_fd is None:
+            writers.append((process.stdout, LineWriter(self.terminal, "{}")))
+        writers.append((process.stderr, LineWriter(self.terminal, "Błąd: {}")))
+
+        # Limit czasu jak dla komendy python (bez limitu, gdy użytkownik może odpowiedzieć)
+        timeout = shell.program_timeout()
+
+        def finished(watch):
+            for _, writer in writers:
+                writer.flush()
+            if watch.timed_out:
+                self.terminal.write(f"⏰ {args[0]} przerwany - przekroczono limit czasu ({timeout}s)")
+
+        self.watches.append(shell.watch_program(process, self.terminal, finished, timeout, args[0], writers))
+
+    def wait(self):
+        """Poczekaj na wszystkie etapy; zwraca kod ostatniego etapu"""
+        # Procesy odbiera pętla procesów (wait4) - tu tylko czekanie na jej wynik
+        for (index, process), watch in zip(self.processes, self.watches):
+            watch.join()
+            self.codes[index] = 1 if watch.timed_out else watch.returncode
+        for thread in self.threads:
+            thread.join()
+        if self.shell.current_process in [process for _, process in self.processes]:
+            self.shell.current_process = None
+        return self.codes[-1]
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - zużycie zasobów przez programy (ps, top)
+Próbki z /proc/<pid> (Linux): czas procesora, pamięć, bajty czytane
+i zapisywane, wątki. Po końcu programu - podsumowanie z wait4.
+"""
+
+import os
+import sys
+import threading
+import time
+
+PROC_SUPPORTED = os.path.isdir('/proc/self')
+
+# Domyślny odstęp próbek zakładki Procesy / komendy top (sekundy)
+SAMPLE_INTERVAL = 2.0
+
+# Krótszy odstęp między próbkami daje przypadkowy CPU% - wtedy średnia od startu
+MIN_DELTA = 0.2
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+class ProcessSample:
+    """Liczniki procesu w jednej chwili"""
+
+    def __init__(self, cpu, rss, threads, read_bytes, write_bytes):
+        self.time = time.monotonic()
+        self.cpu = cpu  # sekundy procesora (użytkownika + systemu)
+        self.rss = rss
+        self.threads = threads
+        self.read_bytes = read_bytes
+        self.write_bytes = write_bytes
+
+
+def read_process(pid):
+    """Próbka z /proc/<pid>; None gdy procesu już nie ma (albo brak /proc)"""
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            stat = f.read().decode('ascii', 'replace')
+    except OSError:
+        return None
+    # Nazwa w nawiasach może mieć spacje - pola liczone od ostatniego ')'
+    fields = stat[stat.rfind(')') + 2:].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    threads = int(fields[17])
+    rss = int(fields[21]) * PAGE_SIZE
+
+    counters = {}
+    try:
+        with open(f'/proc/{pid}/io', 'rb') as f:
+            for line in f:
+                name, _, value = line.partition(b':')
+                counters[name] = int(value)
+    except (OSError, ValueError):
+        # /proc/<pid>/io bywa niedostępne (uprawnienia, jądro bez statystyk zadań)
+        pass
+    # rchar/wchar: wszystkie odczyty i zapisy (także potoki i pliki z pamięci podręcznej)
+    return ProcessSample(cpu, rss, threads, counters.get(b'rchar', 0), counters.get(b'wchar', 0))
+
+
+def usage_from_rusage(rusage, before=None):
+    """Podsumowanie zużycia z wait4/getrusage (before - odjęcie wcześniejszego stanu)"""
+    # ru_maxrss: kilobajty w Linuksie, bajty w macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    usage = {
+        'user': rusage.ru_utime,
+        'system': rusage.ru_stime,
+        'maxrss': rusage.ru_maxrss * scale,
+        'read_blocks': rusage.ru_inblock,
+        'write_blocks': rusage.ru_oublock,
+    }
+    if before is not None:
+        for name in ('user', 'system', 'read_blocks', 'write_blocks'):
+            usage[name] -= before[name]
+    return usage
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_usage(usage):
+    """Linia podsumowania wypisywana po końcu programu"""
+    return (f"⏱  CPU: {usage['user']:.2f} s użytkownika, {usage['system']:.2f} s systemu; "
+            f"pamięć maks. {format_size(usage['maxrss'])}; "
+            f"bloki odczyt/zapis: {usage['read_blocks']}/{usage['write_blocks']}")
+
+
+class ProcessMonitor:
+    """CPU% i liczniki programów obsługiwanych przez pętlę procesów"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        # pid -> poprzednia próbka (CPU% z różnicy)
+        self.previous = {}
+        self.lock = threading.Lock()
+
+    def sample(self, watches):
+        """Wiersze dla ps/top: słowniki z pid, name, cpu_percent, rss, ..."""
+        rows = []
+        seen = {}
+        for watch in watches:
+            pid = watch.process.pid
+            current = read_process(pid)
+            if current is None:
+                continue
+            # Proces z puli liczy od początku skryptu, nie od startu procesu
+            base = watch.baseline
+            cpu = current.cpu - (base.cpu if base else 0)
+            with self.lock:
+                previous = self.previous.get(pid)
+            if previous is not None and current.time - previous.time >= MIN_DELTA:
+                percent = (current.cpu - previous.cpu) / (current.time - previous.time) * 100
+            else:
+                percent = cpu / max(current.time - watch.started, MIN_DELTA) * 100
+            rows.append({
+                'pid': pid,
+                'name': watch.name or ' '.join(map(str, getattr(watch.process, 'args', ['?']))),
+                'cpu_percent': percent,
+                'cpu': cpu,
+                'rss': current.rss,
+                'read_bytes': current.read_bytes - (base.read_bytes if base else 0),
+                'write_bytes': current.write_bytes - (base.write_bytes if base else 0),
+                'threads': current.threads,
+                'elapsed': current.time - watch.started,
+            })
+            if previous is None or current.time - previous.time >= MIN_DELTA:
+                seen[pid] = current
+            else:
+                seen[pid] = previous
+        with self.lock:
+            self.previous = seen
+        return rows
+
+
+def format_table(rows):
+    """Tabela ps: jedna linia na program"""
+    lines = [f"{'PID':>7}  {'NAZWA':<24} {'CPU%':>6} {'PAMIĘĆ':>10} {'ODCZYT':>10} {'ZAPIS':>10} "
+             f"{'WĄTKI':>5} {'CZAS':>8}"]
+    for row in rows:
+        lines.append(f"{row['pid']:>7}  {row['name'][:24]:<24} {row['cpu_percent']:>6.1f} "
+                     f"{format_size(row['rss']):>10} {format_size(row['read_bytes']):>10} "
+                     f"{format_size(row['write_bytes']):>10} {row['threads']:>5} {row['elapsed']:>7.1f}s")
+    return lines
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - profilowanie skryptów (komenda profile)
+Moduł startowy procesu potomnego: skrypt działa pod cProfile albo
+z próbkowaniem stosu co SAMPLE_INTERVAL. Po końcu skryptu na wyjście
+trafia tabela najgorętszych funkcji, a profil do pliku: .pstats
+(python -m pstats, snakeviz) albo stosy collapsed (flamegraph.pl, speedscope).
+"""
+
+import os
+import sys
+import threading
+from collections import Counter
+
+from kocur_runcode import run_code, script_traceback
+
+# Ile funkcji pokazuje tabela po końcu skryptu
+TOP_FUNCTIONS = 15
+
+# Odstęp próbek stosu (sekundy) w trybie /s
+SAMPLE_INTERVAL = 0.005
+
+# Ramki KocurDOS pod kodem skryptu nie trafiają do profilu
+OWN_FILES = {os.path.abspath(__file__), os.path.abspath(sys.modules[run_code.__module__].__file__)}
+
+
+def function_label(filename, line, name):
+    """nazwa (plik:linia); funkcje wbudowane bez pliku"""
+    if filename == '~':
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class FunctionProfiler:
+    """cProfile: liczba wywołań i czasy każdej funkcji"""
+
+    def __init__(self):
+        import cProfile
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def save(self, path):
+        self.profile.dump_stats(path)
+
+    def table(self, top):
+        import pstats
+        stats = pstats.Stats(self.profile).stats
+        rows = [(key, value) for key, value in stats.items()
+                if os.path.abspath(key[0]) not in OWN_FILES and 'of \'_lsprof.Profiler\'' not in key[2]]
+        # Najgorętsze: czas własny funkcji (bez wywoływanych)
+        rows.sort(key=lambda item: item[1][2], reverse=True)
+        lines = [f"{'wywołań':>10} {'własny s':>9} {'łączny s':>9}  funkcja"]
+        for (filename, line, name), (_, calls, own, total, _) in rows[:top]:
+            lines.append(f"{calls:>10} {own:>9.3f} {total:>9.3f}  {function_label(filename, line, name)}")
+        return lines
+
+
+class StackSampler:
+    """Próbki stosu głównego wątku: mały narzut, stosy dla wykresu płomieniowego"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.target = None
+
+    def start(self):
+        self.target = threading.get_ident()
+        self.thread = threading.Thread(target=self._run, name='kocur-sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if os.path.abspath(code.co_filename) in OWN_FILES:
+                    break
+                stack.append(function_label(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def save(self, path):
+        # Format collapsed: ramki od korzenia rozdzielone ';' i liczba próbek
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+    def table(self, top):
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+        samples = sum(self.stacks.values()) or 1
+        lines = [f"{'próbek':>8} {'własny %':>9} {'łączny %':>9}  funkcja"]
+        for label, count in own.most_common(top):
+            lines.append(f"{count:>8} {count * 100 / samples:>9.1f} {total[label] * 100 / samples:>9.1f}  {label}")
+        return lines
+
+
+def profile_script(mode, output_path, top, script, args):
+    """Uruchom skrypt pod profilerem; kod wyjścia skryptu"""
+    sys.argv = [script] + list(args)
+    sys.path[0] = os.getcwd()
+    try:
+        with open(script, 'rb') as f:
+            code = compile(f.read(), script, 'exec', dont_inherit=True)
+    except (OSError, SyntaxError) as e:
+        # Sam błąd (jak w python skrypt.py), bez ramek KocurDOS
+        e.with_traceback(None)
+        sys.excepthook(type(e), e, None)
+        return 1
+
+    profiler = StackSampler() if mode == '--sample' else FunctionProfiler()
+    status = 0
+    profiler.start()
+    try:
+        run_code(code, script)
+    except SystemExit as e:
+        status = e.code
+    except BaseException as e:
+        profiler.stop()
+        e.with_traceback(script_traceback(e, script))
+        sys.excepthook(type(e), e, e.__traceback__)
+        status = 1
+    finally:
+        profiler.stop()
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    profiler.save(output_path)
+    print()
+    for line in profiler.table(top):
+        print(line)
+    return status
+
+
+if __name__ == "__main__" and sys.argv[1:2] in (['--profile'], ['--sample']):
+    sys.exit(profile_script(sys.argv[1], sys.argv[2], int(sys.argv[3]), sys.argv[4], sys.argv[5:]))
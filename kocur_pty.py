@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - uruchamianie programów w pseudoterminalu (Linux)
+Program widzi terminal (isatty() == True), więc nie buforuje wyjścia
+i pokazuje paski postępu; wyjście czyta pętla procesów (kocur_ioloop)
+jak zwykły potok
+"""
+
+import os
+import struct
+import subprocess
+import sys
+
+try:
+    import fcntl
+    import pty
+    import termios
+except ImportError:
+    pty = None
+
+PTY_SUPPORTED = pty is not None and sys.platform.startswith('linux')
+
+# Rozmiar terminala zgłaszany programom (kolumny, wiersze)
+PTY_COLUMNS = 100
+PTY_ROWS = 30
+
+EOF_CHAR = b'\x04'
+
+
+class PtyInput:
+    """Wejście programu (jak process.stdin): close() wysyła koniec danych (Ctrl+D)"""
+
+    def __init__(self, master_fd):
+        self.master_fd = master_fd
+        self.closed = False
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("Wejście programu jest zamknięte")
+        while data:
+            written = os.write(self.master_fd, data)
+            data = data[written:]
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                os.write(self.master_fd, EOF_CHAR)
+            except OSError:
+                pass
+
+
+def open_terminal(columns=PTY_COLUMNS, rows=PTY_ROWS):
+    """Nowy pseudoterminal: (strona nadrzędna, strona programu)
+
+    Bez echa (terminal KocurDOS sam pokazuje wpisaną linię) i bez
+    zamiany \\n na \\r\\n na wyjściu.
+    """
+    master_fd, slave_fd = pty.openpty()
+    try:
+        attrs = termios.tcgetattr(slave_fd)
+        attrs[3] &= ~termios.ECHO
+        attrs[1] &= ~termios.ONLCR
+        termios.tcsetattr(slave_fd, termios.TCSANOW, attrs)
+        fcntl.ioctl(slave_fd, termios.TIOCSWINSZ, struct.pack('HHHH', rows, columns, 0, 0))
+    except BaseException:
+        os.close(master_fd)
+        os.close(slave_fd)
+        raise
+    return master_fd, slave_fd
+
+
+def terminal_variables(env=None, columns=PTY_COLUMNS, rows=PTY_ROWS):
+    """Zmienne środowiska do ustawienia programowi w pseudoterminalu"""
+    variables = {'COLUMNS': str(columns), 'LINES': str(rows)}
+    if 'TERM' not in (os.environ if env is None else env):
+        variables['TERM'] = 'xterm'
+    return variables
+
+
+class PtyProcess(subprocess.Popen):
+    """Proces z stdin/stdout/stderr podłączonymi do pseudoterminala
+
+    Dla reszty powłoki to zwykły Popen (poll, wait, terminate); stdin
+    to PtyInput, a stdout - strona nadrzędna terminala (stdout i stderr
+    programu razem).
+    """
+
+    def __init__(self, args, columns=PTY_COLUMNS, rows=PTY_ROWS, **kwargs):
+        master_fd, slave_fd = open_terminal(columns, rows)
+        try:
+            env = dict(kwargs.pop('env', None) or os.environ)
+            env.update(terminal_variables(env, columns, rows))
+            super().__init__(args, stdin=slave_fd, stdout=slave_fd, stderr=slave_fd,
+                             env=env, start_new_session=True, **kwargs)
+        except BaseException:
+            os.close(master_fd)
+            raise
+        finally:
+            # Po zamknięciu ostatniej kopii końca programu odczyt daje EIO (koniec)
+            os.close(slave_fd)
+        self.stdin = PtyInput(master_fd)
+        self.stdout = os.fdopen(master_fd, 'rb', buffering=0)
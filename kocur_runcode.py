@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - uruchamianie skryptu ze skompilowanego kodu
+Moduł startowy procesu potomnego (python kocur_runcode.py --run ...),
+dlatego importuje tylko to, co Python i tak ma już wczytane
+"""
+
+import builtins
+import marshal
+import os
+import sys
+import types
+
+# Nagłówek pliku z kodem: marshal jest zgodny tylko w obrębie wersji Pythona
+CODE_HEADER = f"KocurDOS {sys.version}\n".encode('utf-8')
+
+
+def load_code(cache_path):
+    """Kod z pliku pamięci podręcznej (None gdy go brak albo jest z innej wersji Pythona)"""
+    try:
+        with open(cache_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if not data.startswith(CODE_HEADER):
+        return None
+    return marshal.loads(data[len(CODE_HEADER):])
+
+
+def run_code(code, script):
+    """Wykonaj kod skryptu jako __main__ (jak python skrypt.py)"""
+    main = types.ModuleType('__main__')
+    main.__file__ = script
+    main.__cached__ = None
+    main.__builtins__ = builtins
+    sys.modules['__main__'] = main
+    exec(code, main.__dict__)
+
+
+def script_traceback(error, script):
+    """Ślad błędu od pierwszej ramki skryptu (bez ramek KocurDOS i runpy)"""
+    tb = error.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != script:
+        tb = tb.tb_next
+    return tb
+
+
+def run_cached(cache_path, script, args):
+    """Uruchom skrypt z kodu w pamięci podręcznej (proces potomny powłoki)"""
+    code = load_code(cache_path)
+    sys.argv = [script] + list(args)
+    sys.path[0] = os.getcwd()
+    try:
+        if code is None:
+            # Plik z innej wersji Pythona - zwykłe uruchomienie
+            import runpy
+            runpy.run_path(script, run_name='__main__')
+        else:
+            run_code(code, script)
+    except SystemExit:
+        raise
+    except BaseException as e:
+        e.with_traceback(script_traceback(e, script))
+        sys.excepthook(type(e), e, e.__traceback__)
+        sys.exit(1)
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ['--run']:
+    run_cached(sys.argv[2], sys.argv[3], sys.argv[4:])
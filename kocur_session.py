@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - migawka sesji
+Bieżący katalog, zakładki, otwarte pliki edytora z kursorem i ostatnie
+linie terminala w jednym pliku JSON. Plik jest zapisywany atomowo w tle
+i tylko wtedy, gdy stan się zmienił; niezapisana treść dokumentów
+zostaje w dziennikach edytora (kocur_journal).
+"""
+
+import json
+import os
+import threading
+
+from kocur_fileio import atomic_write
+
+SESSION_VERSION = 1
+
+# Ile ostatnich linii terminala trafia do migawki
+SCROLLBACK_LINES = 500
+
+
+class SessionStore:
+    """Stan sesji (słownik sekcji) i jego plik"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.state = {}
+        self.written = None
+        self.pending = None
+        self.lock = threading.Lock()
+        self.writer = None
+
+    def load(self):
+        """Stan z poprzedniej sesji ({} gdy go brak albo jest nieczytelny)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.pop('version', None) != SESSION_VERSION:
+            return {}
+        self.state = dict(data)
+        return data
+
+    def update(self, **sections):
+        self.state.update(sections)
+
+    def flush(self, wait=False):
+        """Zapisz stan, jeśli się zmienił (w tle; wait - od razu, np. przy wyjściu)"""
+        text = json.dumps(dict(self.state, version=SESSION_VERSION), ensure_ascii=False, separators=(',', ':'))
+        with self.lock:
+            # Bez zmian - ale przy wait zapis w tle mógł jeszcze nie dojść do pliku
+            if text == self.written and (not wait or self.writer is None):
+                return
+            self.written = text
+            if wait:
+                self.pending = None
+            else:
+                self.pending = text
+                if self.writer is None:
+                    self.writer = threading.Thread(target=self._write_pending, name='kocur-session', daemon=True)
+                    self.writer.start()
+                return
+        # Czekamy na zapis w tle, żeby nie nadpisał nowszego stanu
+        writer = self.writer
+        if writer is not None:
+            writer.join()
+        self._write(text)
+
+    def _write_pending(self):
+        while True:
+            with self.lock:
+                text, self.pending = self.pending, None
+                if text is None:
+                    self.writer = None
+                    return
+            self._write(text)
+
+    def _write(self, text):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            atomic_write(self.path, [text])
+        except OSError:
+            # Migawka jest tylko wygodą - jej błąd nie przerywa pracy
+            self.written = None
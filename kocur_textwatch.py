@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - śledzenie zmian w widgecie Text
+Informuje słuchaczy, które linie bufora zostały zmienione
+"""
+
+
+class TextChangeTracker:
+    """Proxy komendy Tcl widgetu Text zgłaszające zmienione zakresy linii
+
+    Każdy słuchacz dostaje wywołanie listener(first, old_count, new_count):
+    linie [first, first + old_count) (numeracja od 1) zostały zastąpione
+    przez new_count linii. Gdy zmiany nie da się opisać dokładnie (undo,
+    rozjazd liczby linii), zgłaszana jest zamiana całego bufora.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.listeners = []
+        self.orig = widget._w + "_orig"
+        widget.tk.call("rename", widget._w, self.orig)
+        widget.tk.createcommand(widget._w, self._proxy)
+        self.line_count = self._line_count()
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def call(self, *args):
+        """Wywołaj oryginalną komendę widgetu (bez powiadamiania)"""
+        return self.widget.tk.call((self.orig,) + args)
+
+    def _line_of(self, index):
+        return int(str(self.call('index', index)).split('.')[0])
+
+    def _line_count(self):
+        return self._line_of('end-1c')
+
+    def _notify(self, first, old_count, new_count):
+        for listener in self.listeners:
+            listener(first, old_count, new_count)
+
+    def _proxy(self, *args):
+        if not args or args[0] not in ('insert', 'delete', 'replace', 'edit'):
+            return self.call(*args)
+
+        op = args[0]
+        before = self.line_count
+        if op == 'insert' and len(args) >= 3:
+            first = min(self._line_of(args[1]), before)
+            result = self.call(*args)
+            added = sum(text.count('\n') for text in args[2::2])
+            change = (first, 1, added + 1)
+        elif op == 'delete' and len(args) > 3:
+            # Usuwanie kilku zakresów naraz
+            result = self.call(*args)
+            change = None
+        elif op in ('delete', 'replace') and len(args) >= 2:
+            first = self._line_of(args[1])
+            last = self._line_of(args[2] if len(args) >= 3 else f"{args[1]}+1c")
+            last = max(first, min(last, before))
+            result = self.call(*args)
+            added = sum(text.count('\n') for text in args[3::2]) if op == 'replace' else 0
+            change = (first, last - first + 1, added + 1)
+        elif op == 'edit' and len(args) >= 2 and args[1] in ('undo', 'redo'):
+            result = self.call(*args)
+            change = None
+        else:
+            return self.call(*args)
+
+        self.line_count = self._line_count()
+        # Zmiana nieopisana dokładnie lub rozjazd liczby linii -> cały bufor
+        if change is None or before - change[1] + change[2] != self.line_count:
+            change = (1, before, self.line_count)
+        self._notify(*change)
+        return result
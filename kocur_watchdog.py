@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - strażnik pętli zdarzeń Tk
+Pętla Tk co chwilę woła beat(); wątek strażnika sprawdza, czy nie
+przestała. Gdy cisza trwa ponad próg, zapisuje stos głównego wątku
+(sys._current_frames) - po końcu przestoju raport trafia do dziennika,
+z najczęstszym stosem na początku: to funkcja, która blokowała okno.
+"""
+
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+# Co ile sekund pętla Tk zgłasza się strażnikowi
+HEARTBEAT_INTERVAL = 0.05
+
+# Przestój dłuższy niż próg (sekundy) jest zapisywany w dzienniku
+STALL_THRESHOLD = 0.2
+
+# Ile ostatnich ramek stosu w raporcie i ile próbek na jeden przestój
+MAX_FRAMES = 25
+MAX_SAMPLES = 200
+
+# Dziennik większy niż limit jest przenoszony do <nazwa>.1
+LOG_LIMIT = 1024 * 1024
+
+
+class LoopWatchdog:
+    """Wykrywanie przestojów wątku, który woła beat() (tworzony w tym wątku)"""
+
+    def __init__(self, log_path, threshold=STALL_THRESHOLD, interval=HEARTBEAT_INTERVAL):
+        self.log_path = str(log_path)
+        self.threshold = threshold
+        self.interval = interval
+        self.main_ident = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stalls = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.last_beat = time.monotonic()
+        self.thread = threading.Thread(target=self._run, name='kocur-watchdog', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def beat(self):
+        """Zgłoszenie pętli; zwraca opóźnienie względem planowanego czasu (sekundy)"""
+        now = time.monotonic()
+        lag = max(0.0, now - self.last_beat - self.interval)
+        self.last_beat = now
+        return lag
+
+    def _run(self):
+        samples = Counter()
+        stall_begin = None
+        while not self.stopped.wait(self.interval):
+            last_beat = self.last_beat
+            if time.monotonic() - last_beat >= self.threshold:
+                if stall_begin is None:
+                    stall_begin = last_beat
+                if sum(samples.values()) < MAX_SAMPLES:
+                    frame = sys._current_frames().get(self.main_ident)
+                    if frame is not None:
+                        samples[tuple(traceback.format_stack(frame)[-MAX_FRAMES:])] += 1
+            elif stall_begin is not None:
+                # Pętla znów działa: przestój od ostatniego zgłoszenia przed nim
+                self.stalls += 1
+                self.report(last_beat - stall_begin - self.interval, samples)
+                samples = Counter()
+                stall_begin = None
+
+    def report(self, duration, samples):
+        lines = [f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} przestój pętli Tk: "
+                 f"{duration * 1000:.0f} ms (próbek stosu: {sum(samples.values())})\n"]
+        for stack, count in samples.most_common():
+            lines.append(f"--- {count} x\n")
+            lines.extend(stack)
+        lines.append("\n")
+        try:
+            if os.path.getsize(self.log_path) > LOG_LIMIT:
+                os.replace(self.log_path, self.log_path + '.1')
+        except OSError:
+            pass
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+        except OSError:
+            # Dziennik jest pomocą diagnostyczną - jego błąd nie przerywa pracy
+            pass
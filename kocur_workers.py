@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+KocurDOS - pula rozgrzanych interpreterów Python
+Procesy z już zaimportowaną biblioteką standardową czekają na skrypty;
+skrypt dostaje deskryptory wejścia/wyjścia przez gniazdo (SCM_RIGHTS)
+i działa przez runpy w czystej przestrzeni nazw. Po MAX_RUNS skryptach,
+wzroście pamięci, pozostawionych wątkach albo imporcie modułów spoza
+zaimportowanych zawczasu proces jest wymieniany (rozszerzeń w C nie da
+się bezpiecznie zaimportować drugi raz).
+"""
+
+import array
+import json
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+
+from kocur_procstat import usage_from_rusage
+from kocur_runcode import load_code, run_code, script_traceback
+from kocur_pty import PtyInput
+
+WORKERS_SUPPORTED = os.name == 'posix' and hasattr(socket, 'AF_UNIX') and hasattr(socket.socket, 'sendmsg')
+
+# Domyślna liczba czekających procesów i limity przed wymianą procesu
+POOL_SIZE = 2
+MAX_RUNS = 50
+MAX_GROWTH = 64 * 1024 * 1024
+
+# Moduły importowane zawczasu (typowe dla krótkich skryptów)
+PRELOAD_MODULES = (
+    'argparse', 'collections', 'csv', 'datetime', 'functools', 'itertools', 'json',
+    'math', 'pathlib', 'random', 're', 'shutil', 'string', 'subprocess', 'textwrap',
+    'threading', 'time', 'traceback', 'typing',
+)
+
+MESSAGE_SIZE = 65536
+MAX_FDS = 3
+
+
+def send_message(sock, data, fds=()):
+    """Wyślij wiadomość JSON (z deskryptorami jako dane pomocnicze)"""
+    payload = json.dumps(data).encode('utf-8')
+    ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds))] if fds else []
+    sock.sendmsg([payload], ancillary)
+
+
+def receive_message(sock):
+    """(dane, deskryptory); (None, []) gdy druga strona zamknęła gniazdo"""
+    fds = array.array('i')
+    payload, ancillary, _, _ = sock.recvmsg(MESSAGE_SIZE, socket.CMSG_SPACE(MAX_FDS * fds.itemsize))
+    for level, kind, data in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(data[:len(data) - len(data) % fds.itemsize])
+    if not payload:
+        for fd in fds:
+            os.close(fd)
+        return None, []
+    return json.loads(payload.decode('utf-8')), list(fds)
+
+
+class WorkerProcess:
+    """Skrypt wykonywany w procesie z puli - dla powłoki jak Popen
+
+    Koniec skryptu to wiadomość z kodem wyjścia na gnieździe procesu,
+    wysyłana przed zamknięciem strumieni skryptu - koniec wyjścia budzi
+    pętlę procesów, a poll() już widzi kod. terminate/kill kończą cały
+    proces puli.
+    """
+
+    def __init__(self, pool, worker, stdin, stdout, stderr):
+        self.pool = pool
+        self.worker = worker
+        self.pid = worker.pid
+        self.args = worker.args
+        self.stdin = stdin
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode = None
+        # Zużycie zasobów przez skrypt (różnica getrusage w procesie puli)
+        self.usage = None
+        self.lock = threading.Lock()
+
+    def poll(self):
+        return self._collect(0)
+
+    def wait(self, timeout=None):
+        if self._collect(timeout) is None:
+            raise subprocess.TimeoutExpired(self.args, timeout)
+        return self.returncode
+
+    def _collect(self, timeout):
+        with self.lock:
+            if self.returncode is None:
+                ready, _, _ = select.select([self.worker.sock], [], [], timeout)
+                if ready:
+                    try:
+                        result, _ = receive_message(self.worker.sock)
+                    except OSError:
+                        result = None
+                    if result is None:
+                        # Proces puli zakończony w trakcie skryptu (kill, os._exit)
+                        self.returncode = self.worker.process.wait()
+                        self.pool.discard(self.worker)
+                    else:
+                        self.returncode = result['code']
+                        self.usage = result.get('usage')
+                        self.pool.release(self.worker, result)
+            return self.returncode
+
+    def send_signal(self, signum):
+        if self.returncode is None:
+            self.worker.process.send_signal(signum)
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+class Worker:
+    """Jeden rozgrzany interpreter i jego gniazdo sterujące"""
+
+    def __init__(self):
+        parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, '-u', os.path.abspath(__file__), '--worker', str(child.fileno())],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=(child.fileno(),),
+            )
+        except BaseException:
+            parent.close()
+            raise
+        finally:
+            child.close()
+        self.sock = parent
+        self.pid = self.process.pid
+        self.args = self.process.args
+        self.runs = 0
+        self.base_rss = None
+
+    def wait_ready(self):
+        """Czekaj na zgłoszenie gotowości (moduły zaimportowane)"""
+        try:
+            message, _ = receive_message(self.sock)
+        except OSError:
+            return False
+        return message is not None
+
+    def close(self):
+        # Koniec gniazda kończy pętlę procesu
+        self.sock.close()
+        try:
+            self.process.wait(1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool:
+    """Czekające interpretery; run() zwraca WorkerProcess albo None (brak wolnego)"""
+
+    def __init__(self, size=POOL_SIZE, max_runs=MAX_RUNS, max_growth=MAX_GROWTH):
+        self.size = size
+        self.max_runs = max_runs
+        self.max_growth = max_growth
+        self.idle = []
+        self.busy = 0
+        self.starting = 0
+        self.lock = threading.Lock()
+        self.closed = False
+        self.started = 0
+        self.recycled = 0
+        self.runs = 0
+        self.refill()
+
+    def refill(self):
+        """Uzupełnij pulę w tle (start interpretera trwa dziesiątki ms)"""
+        with self.lock:
+            missing = self.size - len(self.idle) - self.busy - self.starting
+            if self.closed or missing <= 0:
+                return
+            self.starting += missing
+
+        def start():
+            for _ in range(missing):
+                try:
+                    worker = Worker()
+                    # Do puli dopiero po imporcie modułów
+                    if not worker.wait_ready():
+                        worker.close()
+                        worker = None
+                except OSError:
+                    worker = None
+                with self.lock:
+                    self.starting -= 1
+                    if worker is None:
+                        continue
+                    self.started += 1
+                    if not self.closed:
+                        self.idle.append(worker)
+                        continue
+                worker.close()
+
+        threading.Thread(target=start, daemon=True).start()
+
+    def acquire(self):
+        with self.lock:
+            worker = None
+            while self.idle:
+                # Najdłużej czekający - nowy może jeszcze importować moduły
+                worker = self.idle.pop(0)
+                if worker.process.poll() is None:
+                    self.busy += 1
+                    break
+                worker.sock.close()
+                worker = None
+        self.refill()
+        return worker
+
+    def run(self, script_path, args, stdin=None, terminal=None, env=None, code_path=None, stdout=None):
+        """Uruchom skrypt w procesie z puli (None gdy żaden nie czeka)
+
+        stdin jak w Popen (PIPE, DEVNULL, deskryptor, None - wejście powłoki);
+        terminal to (strona nadrzędna, strona programu) pseudoterminala,
+        env - zmienne środowiska ustawione tylko na czas skryptu,
+        code_path - skompilowany kod skryptu (kocur_bytecode),
+        stdout - deskryptor wyjścia skryptu (etap potoku) zamiast potoku do powłoki.
+        """
+        worker = self.acquire()
+        if worker is None:
+            return None
+
+        opened = []     # końce procesu: wysłane i zamknięte u nas
+        try:
+            if terminal is not None:
+                master_fd, slave_fd = terminal
+                opened.append(slave_fd)
+                fds = [slave_fd] * 3
+                process_stdin = PtyInput(master_fd)
+                stdout = os.fdopen(master_fd, 'rb', buffering=0)
+                stderr = None
+            else:
+                if stdin == subprocess.PIPE:
+                    read_fd, write_fd = os.pipe()
+                    opened.append(read_fd)
+                    input_fd = read_fd
+                    process_stdin = os.fdopen(write_fd, 'wb', buffering=0)
+                elif isinstance(stdin, int) and stdin >= 0:
+                    input_fd = stdin
+                    process_stdin = None
+                else:
+                    if stdin is None and sys.stdin is not None and not sys.stdin.closed:
+                        input_fd = sys.stdin.fileno()
+                    else:
+                        input_fd = os.open(os.devnull, os.O_RDONLY)
+                        opened.append(input_fd)
+                    process_stdin = None
+                if stdout is None:
+                    out_read, out_write = os.pipe()
+                    opened.append(out_write)
+                    stdout = os.fdopen(out_read, 'rb', buffering=0)
+                else:
+                    # Deskryptor wywołującego - on go zamyka
+                    out_write, stdout = stdout, None
+                err_read, err_write = os.pipe()
+                opened.append(err_write)
+                fds = [input_fd, out_write, err_write]
+                stderr = os.fdopen(err_read, 'rb', buffering=0)
+
+            job = {'script': script_path.name, 'cwd': str(script_path.parent), 'args': list(args),
+                   'env': env or {}, 'code': str(code_path) if code_path else None}
+            send_message(worker.sock, job, fds)
+        except OSError:
+            self.discard(worker)
+            raise
+        finally:
+            for fd in opened:
+                os.close(fd)
+        with self.lock:
+            self.runs += 1
+        return WorkerProcess(self, worker, process_stdin, stdout, stderr)
+
+    def release(self, worker, result):
+        """Skrypt zakończony: proces wraca do puli albo jest wymieniany"""
+        worker.runs += 1
+        if worker.base_rss is None:
+            worker.base_rss = result['rss']
+        grown = result['rss'] - worker.base_rss > self.max_growth
+        if worker.runs >= self.max_runs or grown or result['threads'] > 1 or result.get('modules'):
+            with self.lock:
+                self.recycled += 1
+            self.discard(worker)
+            return
+        with self.lock:
+            if not self.closed:
+                self.busy -= 1
+                self.idle.append(worker)
+                return
+        self.discard(worker)
+
+    def discard(self, worker):
+        """Zamknij proces, który wykonywał skrypt, i uruchom następny"""
+        with self.lock:
+            self.busy -= 1
+        threading.Thread(target=worker.close, daemon=True).start()
+        self.refill()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for worker in idle:
+            worker.close()
+
+
+def worker_main(fd):
+    """Pętla procesu puli: czekaj na skrypt, wykonaj, odeślij kod wyjścia"""
+    import io
+    import resource
+    import runpy
+    import traceback
+
+    for name in PRELOAD_MODULES:
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+    # run_path importuje je przy pierwszym skrypcie - nie mogą się liczyć jako moduły skryptu
+    import pkgutil
+    import weakref
+
+    sock = socket.socket(fileno=fd)
+    send_message(sock, {'ready': True})
+    base_modules = set(sys.modules)
+    base_path = list(sys.path)
+    base_environ = dict(os.environ)
+    base_cwd = os.getcwd()
+    saved = [os.dup(target) for target in (0, 1, 2)]
+
+    while True:
+        try:
+            job, fds = receive_message(sock)
+        except OSError:
+            break
+        if job is None:
+            break
+
+        for target, job_fd in zip((0, 1, 2), fds):
+            os.dup2(job_fd, target)
+        for job_fd in set(fds):
+            os.close(job_fd)
+        sys.stdin = io.TextIOWrapper(io.FileIO(0, 'r', closefd=False), encoding='utf-8', errors='replace')
+        sys.stdout = io.TextIOWrapper(io.FileIO(1, 'w', closefd=False), encoding='utf-8',
+                                      errors='backslashreplace', write_through=True)
+        sys.stderr = io.TextIOWrapper(io.FileIO(2, 'w', closefd=False), encoding='utf-8',
+                                      errors='backslashreplace', write_through=True)
+
+        code = 0
+        before = usage_from_rusage(resource.getrusage(resource.RUSAGE_SELF))
+        try:
+            os.environ.update(job['env'])
+            os.chdir(job['cwd'])
+            sys.argv = [job['script']] + job['args']
+            sys.path[0] = os.getcwd()
+            script_code = load_code(job['code']) if job.get('code') else None
+            if script_code is None:
+                runpy.run_path(job['script'], run_name='__main__')
+            else:
+                # Kod z pamięci podręcznej KocurDOS - bez kompilacji
+                run_code(script_code, job['script'])
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException as e:
+            # Ślad błędu od kodu skryptu, bez ramek puli i runpy (jak w zwykłym python)
+            traceback.print_exception(type(e), e, script_traceback(e, job['script']))
+            code = 1
+        finally:
+            for stream in (sys.stdout, sys.stderr):
+                try:
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass
+
+        # Kod wyjścia przed końcem strumieni: powłoka widzi go razem z końcem wyjścia
+        usage = usage_from_rusage(resource.getrusage(resource.RUSAGE_SELF), before)
+        imported = len(set(sys.modules) - base_modules)
+        try:
+            send_message(sock, {'code': code, 'rss': usage['maxrss'], 'usage': usage,
+                                'threads': threading.active_count(), 'modules': imported})
+        except OSError:
+            break
+        for target, own_fd in zip((0, 1, 2), saved):
+            os.dup2(own_fd, target)
+        sys.stdin, sys.stdout, sys.stderr = sys.__stdin__, sys.__stdout__, sys.__stderr__
+
+        # Moduły skryptu zostałyby w sys.modules dla następnego, a usunięte
+        # (zwłaszcza rozszerzenia w C) nie importują się ponownie - pula wymienia proces
+        if imported:
+            break
+        sys.path[:] = base_path
+        os.environ.clear()
+        os.environ.update(base_environ)
+        os.chdir(base_cwd)
+    # Wątki pozostawione przez skrypty nie wstrzymują końca procesu
+    os._exit(0)
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ['--worker']:
+    worker_main(int(sys.argv[2]))
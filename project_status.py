@@ -10,6 +10,8 @@ from pathlib import Path
 from datetime import datetime
 import requests
 
+from kocur_files import SYSTEM_FILES
+
 def run_command(command, capture_output=True):
     """Uruchom komendę i zwróć wynik"""
     try:
@@ -28,8 +30,7 @@ def run_command(command, capture_output=True):
 
 def check_files():
     """Sprawdź obecność wymaganych plików"""
-    required_files = [
-        "kocur_dos.py",
+    required_files = SYSTEM_FILES + [
         "updater.py",
         "install.py",
         "version.json",
@@ -8,12 +8,101 @@ import sys
 import os
 import time
 import requests
+import runpy
 import subprocess
 import shutil
+import tempfile
 from pathlib import Path
 import tkinter as tk
 from tkinter import messagebox
 
+try:
+    from kocur_log import log_event, start_logging
+except ImportError:
+    # Aktualizacja ze starszej wersji: kocur_log.py pojawia się dopiero po pobraniu
+    log_event = start_logging = None
+
+# Lista plików systemu w wydaniu (updater czyta ją z nowej wersji, nie z dysku)
+FILES_MODULE = "kocur_files.py"
+
+# Katalog z poprzednią wersją plików systemu (kopia przed podmianą)
+BACKUP_DIR = "kocur-old"
+
+
+def log(event, **fields):
+    if log_event is not None:
+        log_event(event, **fields)
+
+
+def download_file(url, filename):
+    """Pobierz plik strumieniowo; False gdy serwer go nie ma albo brak połączenia"""
+    start = time.monotonic()
+    try:
+        response = requests.get(url, stream=True)
+        size = 0
+        if response.status_code == 200:
+            with open(filename, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
+                    size += len(chunk)
+        log('download', url=url, status=response.status_code, bytes=size,
+            duration_ms=round((time.monotonic() - start) * 1000, 1))
+        return response.status_code == 200
+    except Exception as e:
+        log('download_failed', url=url, error=str(e))
+        return False
+
+
+def download_release(base_url, files=None, target_dir="."):
+    """Pobierz pliki systemu z base_url/<plik> i podmień je w target_dir
+
+    Wszystkie pliki trafiają najpierw do katalogu tymczasowego: gdy
+    któregoś nie da się pobrać, nic nie jest zmieniane. Przed podmianą
+    poprzednie wersje wszystkich plików są kopiowane do BACKUP_DIR,
+    a nieudana podmiana przywraca je z tej kopii. Bez files lista
+    pochodzi z FILES_MODULE pobranego z wydania - kocur_files.py na
+    dysku należy do starej wersji.
+    """
+    staging = tempfile.mkdtemp(prefix=".kocur-update-", dir=target_dir)
+    try:
+        if files is None:
+            listing = os.path.join(staging, FILES_MODULE)
+            print(f"Pobieranie z: {base_url}/{FILES_MODULE}")
+            if not download_file(f"{base_url}/{FILES_MODULE}", listing):
+                raise Exception("Nie można pobrać aktualizacji")
+            files = runpy.run_path(listing)['SYSTEM_FILES']
+        for filename in files:
+            if os.path.exists(os.path.join(staging, filename)):
+                continue
+            download_url = f"{base_url}/{filename}"
+
+            print(f"Pobieranie z: {download_url}")
+            if not download_file(download_url, os.path.join(staging, filename)):
+                raise Exception("Nie można pobrać aktualizacji")
+
+        backup_dir = os.path.join(target_dir, BACKUP_DIR)
+        os.makedirs(backup_dir, exist_ok=True)
+        existing = [filename for filename in files if os.path.exists(os.path.join(target_dir, filename))]
+        for filename in existing:
+            shutil.copy2(os.path.join(target_dir, filename), os.path.join(backup_dir, filename))
+
+        replaced = []
+        try:
+            for filename in files:
+                os.replace(os.path.join(staging, filename), os.path.join(target_dir, filename))
+                replaced.append(filename)
+        except OSError:
+            # Stara wersja w całości - nowy kocur_dos.py bez swoich modułów nie ruszy
+            for filename in replaced:
+                if filename in existing:
+                    shutil.copy2(os.path.join(backup_dir, filename), os.path.join(target_dir, filename))
+                else:
+                    os.remove(os.path.join(target_dir, filename))
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
 class KocurDOSUpdater:
     def __init__(self, version):
         self.version = version
@@ -30,19 +119,12 @@ class KocurDOSUpdater:
             # Krok 1: Wyłącz KocurDOS (już wyłączony przez wywołanie)
             messagebox.showinfo("Updater", "Rozpoczynam aktualizację...")
             
-            # Krok 2: Zrób kopię poprzedniej wersji
-            if Path("kocur_dos.py").exists():
-                shutil.copy2("kocur_dos.py", "kocur_dos-old.py")
-                print("Utworzono kopię zapasową: kocur_dos-old.py")
-                
-            # Krok 3: Pobierz nową wersję
-            download_url = f"{self.github_repo}/releases/download/v{self.version}/kocur_dos.py"
-            
-            print(f"Pobieranie z: {download_url}")
-            if not self.download_file(download_url, "kocur_dos.py"):
-                raise Exception("Nie można pobrać aktualizacji")
+            # Krok 2 i 3: Pobierz nową wersję, zrób kopię poprzedniej i podmień pliki
+            download_release(f"{self.github_repo}/releases/download/v{self.version}")
             
+            print(f"Utworzono kopię zapasową: {BACKUP_DIR}")
             print("Aktualizacja pobrana pomyślnie!")
+            log('update_installed', version=self.version)
             
             # Krok 4: Uruchom nową wersję
             time.sleep(1)  # Krótka pauza
@@ -53,20 +135,9 @@ class KocurDOSUpdater:
             self.self_destruct()
             
         except Exception as e:
+            log('update_failed', version=self.version, error=str(e))
             messagebox.showerror("Błąd aktualizacji", f"Błąd podczas aktualizacji: {e}")
             
-    def download_file(self, url, filename):
-        try:
-            response = requests.get(url, stream=True)
-            if response.status_code == 200:
-                with open(filename, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                return True
-            return False
-        except:
-            return False
-            
     def self_destruct(self):
         # Utwórz skrypt do usunięcia siebie
         cleanup_script = """
@@ -102,4 +173,11 @@ if __name__ == "__main__":
         print("Użycie: updater.py <wersja>")
         sys.exit(1)
         
+    listener = None
+    if start_logging is not None:
+        # Osobny plik: session.log należy do KocurDOS
+        listener = start_logging(os.path.join("KocurDOS-diskC", ".kocurdos", "logs"), "updater.log")
+    log('update_start', version=sys.argv[1])
     updater = KocurDOSUpdater(sys.argv[1])
+    if listener is not None:
+        listener.stop()